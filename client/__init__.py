@@ -1,10 +1,12 @@
 __version__ = '0.1'
 __author__ = 'Nick Bayard'
 
-__all__ = ['StorageObject', 'MonitorData', 'StorageMonitor', 'StorageHeartbeat',
-           'StorageConsumer', 'MonitorResponseError']
+__all__ = ['StorageObject', 'MonitorData', 'MonitorBatch', 'StorageMonitor', 'StorageHeartbeat',
+           'StorageConsumer', 'MonitorResponseError', 'StorageReader', 'StorageMetadata']
 
 from process import StorageObject
-from monitor import MonitorData, StorageMonitor, MonitorResponseError
+from monitor import MonitorData, MonitorBatch, StorageMonitor, MonitorResponseError
 from heartbeat import StorageHeartbeat
 from consumer import StorageConsumer
+from reader import StorageReader
+from metadata import StorageMetadata
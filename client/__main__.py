@@ -10,6 +10,7 @@ import argparse
 import multiprocessing
 import socket
 import time
+from multiprocessing.pool import ThreadPool
 
 try:
     import yaml
@@ -19,11 +20,111 @@ except ImportError:
 from . import __version__
 from .config import ClientConfig
 from consumer import StorageConsumer
+from reader import StorageReader
+from metadata import StorageMetadata
 from monitor import StorageMonitor
 from heartbeat import StorageHeartbeat
+from liveness import LivenessBoard
+from ratelimit import TokenBucket
 from shared import ProcessData, init_dir_path
 
 
+def validate_runtimes(consumers, config):
+    """Calibrates all consumers concurrently and exits if any of them can't
+       rollover twice within the runtime.
+
+       Running the calibrations side by side reproduces the contention the
+       consumers will see once they are all writing, and keeps startup time
+       from growing with the number of consumers.
+
+       Only write consumers roll over files, so read and metadata consumers
+       aren't calibrated.
+
+        Args:
+            consumers: A list of ProcessData objects for the StorageConsumers.
+            config: The ClientConfig instance.
+    """
+    if config.workload != 'write' or not consumers:
+        return
+
+    def test_runtime(consumer):
+        return consumer.process.test_runtime(config.runtime,
+                                             samples=config.calibration_samples,
+                                             warmup=config.calibration_warmup,
+                                             ttl=config.calibration_ttl)
+
+    pool = ThreadPool(len(consumers))
+    try:
+        results = pool.map(test_runtime, consumers)
+    finally:
+        pool.close()
+        pool.join()
+
+    for consumer, result in zip(consumers, results):
+        if not result:
+            format_message = 'Runtime {} and chunk size {} for Consumer {}'.format(
+                config.runtime, consumer.process.chunk_size, consumer.process.id)
+            sys.exit('{} not sufficient for 2x rollover.'.format(format_message))
+
+def create_consumer(id, config, heartbeat, report, client_limiter):
+    """Creates the storage consumer process for the configured workload.
+
+        Args:
+            id: The index of the storage consumer.
+            config: The ClientConfig instance.
+            heartbeat: The consumer end of the heartbeat Pipe.
+            report: The queue for sending status messages to the heartbeat.
+            client_limiter: A TokenBucket shared by all consumers, or None.
+
+        Returns:
+            A StorageConsumer or StorageMetadata instance.
+    """
+    if config.workload == 'metadata':
+        return StorageMetadata(id=id,
+                               heartbeat=heartbeat,
+                               report=report,
+                               name='Consumer',
+                               path=config.storage_path,
+                               files=config.metadata_files,
+                               dirs=config.metadata_dirs,
+                               file_size=config.metadata_file_size)
+
+    kwargs = dict(id=id,
+                  chunk_size=config.chunk_sizes[id],
+                  file_size=config.file_sizes[id],
+                  heartbeat=heartbeat,
+                  report=report,
+                  name='Consumer',
+                  path=config.storage_path,
+                  paths=config.storage_paths,
+                  placement=config.placement,
+                  fanout=config.fanout,
+                  iodepth=config.iodepth,
+                  rate_limit=config.rate_limits[id],
+                  client_limiter=client_limiter,
+                  max_files=config.retention_files,
+                  max_size=config.retention_size,
+                  block_size=config.block_size,
+                  write_pattern=config.write_pattern,
+                  random_block_size=config.random_block_size,
+                  random_span=config.random_span,
+                  random_seed=config.random_seed,
+                  verify=config.verify,
+                  verify_checksum=config.verify_checksum,
+                  streams=config.streams,
+                  stream_weights=config.stream_weights,
+                  preallocate=config.preallocate,
+                  data_compressibility=config.data_compressibility,
+                  data_dedupe=config.data_dedupe)
+
+    if config.workload == 'read':
+        return StorageReader(pattern=config.read_pattern,
+                             read_block_size=config.read_block_size,
+                             evict=config.read_evict,
+                             **kwargs)
+
+    return StorageConsumer(**kwargs)
+
 def main(config):
     """The main entry point when running a Client instance."""
 
@@ -34,6 +135,11 @@ def main(config):
     slave_queue = manager.Queue()
     consumers = []
 
+    # A single token bucket shared by every consumer caps the throughput of
+    # the client as a whole.
+    client_limiter = TokenBucket(config.client_rate_limit * 1000000) \
+        if config.client_rate_limit else None
+
     # We create a socket first so that we can poll if the server is ready.
     # This way the client doesn't start running with no available server.
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -44,30 +150,31 @@ def main(config):
         except socket.error:
             time.sleep(5)
 
+    # A slot for each consumer, then one for the monitor
+    liveness = LivenessBoard(config.storage_count + 1) \
+        if config.heartbeat_liveness == 'board' else None
+
     for id in xrange(config.storage_count):
         # Each storage consumer process will have its own pipe, which the
         # heartbeat instance will use to poll if the consumer is alive. The
         # consumer will then respond on the other end of the pipe.
         master, slave = multiprocessing.Pipe()
 
-        consumer = ProcessData(
-                        process=StorageConsumer(id=id,
-                                                chunk_size=config.chunk_sizes[id],
-                                                file_size=config.file_sizes[id],
-                                                heartbeat=slave,
-                                                report=slave_queue,
-                                                name='Consumer',
-                                                path=config.storage_path),
-                        pipe=master)
-
-        # We need to test the chunk_size/runtime limits before starting up
-        if not consumer.process.test_runtime(config.runtime):
-            format_message = 'Runtime {} and chunk size {} for Consumer {}'.format(
-                config.runtime, consumer.process.chunk_size, id)
-            sys.exit('{} not sufficient for 2x rollover.'.format(format_message))
+        consumer = ProcessData(process=create_consumer(id=id,
+                                                       config=config,
+                                                       heartbeat=slave,
+                                                       report=slave_queue,
+                                                       client_limiter=client_limiter),
+                               pipe=master)
+
+        if liveness is not None:
+            consumer.process.attach_liveness(liveness, id)
 
         consumers.append(consumer)
 
+    # We need to test the chunk_size/runtime limits before starting up.
+    validate_runtimes(consumers, config)
+
     # Don't start any processes running until all chunk_sizes can be validated
     for consumer in consumers:
         consumer.process.start()
@@ -76,15 +183,37 @@ def main(config):
     # to commuicate with the heartbeat instance to indicate that it is alive.
     master, slave = multiprocessing.Pipe()
 
+    # The only other child process so far is the one serving the manager's
+    # queue
+    consumer_pids = set(c.process.pid for c in consumers)
+    labels = {p.pid: 'Manager' for p in multiprocessing.active_children()
+              if p.pid not in consumer_pids}
+
+    # The monitor samples the block devices that these paths are on
+    device_paths = None
+    if config.monitor_devices:
+        device_paths = config.storage_paths or [config.storage_path]
+
     monitor = ProcessData(
                 process=StorageMonitor(processes=[c.process for c in consumers],
                                        id=0,  # Only one monitor instance
                                        heartbeat=slave,
                                        report=slave_queue,
                                        poll_period=config.monitor_poll_period,
+                                       sampler=config.monitor_sampler,
+                                       batch=config.monitor_batch,
+                                       storage_paths=device_paths,
+                                       sample_rate=config.monitor_sample_rate,
+                                       process_tree=config.monitor_process_tree,
+                                       labels=labels,
+                                       workers=config.monitor_workers,
+                                       budget=config.monitor_sweep_budget,
                                        name='Monitor'),
                 pipe=master)
 
+    if liveness is not None:
+        monitor.process.attach_liveness(liveness, config.storage_count)
+
     monitor.process.start()
 
     # Storage consumers and the storage monitor are seperate processes, but
@@ -95,13 +224,33 @@ def main(config):
                                  runtime=config.runtime,
                                  poll_period=config.heartbeat_poll_period,
                                  client_socket=client_socket,
-                                 log_level=config.log_level)
+                                 log_level=config.log_level,
+                                 liveness=liveness,
+                                 liveness_timeout=config.liveness_timeout)
     heartbeat.run()
 
     monitor.process.join()
     for consumer in consumers:
         consumer.process.join()
 
+def fit_to_count(values, default, count):
+    """Truncate or backfill a list of per-consumer values to count entries.
+
+        Args:
+            values: A list of per-consumer values.
+            default: The value used to backfill missing entries.
+            count: The number of storage consumers.
+
+        Returns:
+            A list of exactly count values.
+    """
+    if len(values) > count:
+        # There were extra values specified.
+        return values[:count]
+
+    # Not enough values.  Backfill with default
+    return values + [default] * (count - len(values))
+
 def update_config(config, args):
     """Override ClientConfig with command line arguments when provided.
 
@@ -121,23 +270,47 @@ def update_config(config, args):
     config.default_file_size = args.default_file_size if \
         args.default_file_size is not None  else config.default_file_size
 
-    # Chunk sizes for each storage consumer are individually configurable.
-    if len(config.chunk_sizes) > config.storage_count:
-        # There were extra chunk sizes specified.
-        config.chunk_sizes = config.chunk_sizes[:config.storage_count]
-    elif len(config.chunk_sizes) < config.storage_count:
-        # Not enough chunk sizes.  Backfill with default
-        config.chunk_sizes.extend([config.default_chunk_size] *
-            (config.storage_count - len(config.chunk_sizes)))
-
-    # File sizes for each storage consumer are individually configurable.
-    if len(config.file_sizes) > config.storage_count:
-        # There were extra file sizes specified.
-        config.file_sizes = config.file_sizes[:config.storage_count]
-    elif len(config.file_sizes) < config.storage_count:
-        # Not enough file sizes.  Backfill with default
-        config.file_sizes.extend([config.default_file_size] *
-            (config.storage_count - len(config.file_sizes)))
+    config.default_rate_limit = args.default_rate_limit if \
+        args.default_rate_limit is not None else config.default_rate_limit
+
+    # Chunk sizes, file sizes and rate limits for each storage consumer are
+    # individually configurable.
+    config.chunk_sizes = fit_to_count(config.chunk_sizes,
+                                      config.default_chunk_size,
+                                      config.storage_count)
+
+    config.file_sizes = fit_to_count(config.file_sizes,
+                                     config.default_file_size,
+                                     config.storage_count)
+
+    config.rate_limits = fit_to_count(config.rate_limits,
+                                      config.default_rate_limit,
+                                      config.storage_count)
+
+    config.streams = args.streams if args.streams is not None \
+        else config.streams
+
+    # Streams without a weight get an equal share
+    config.stream_weights = fit_to_count(config.stream_weights, 1,
+                                         config.streams)
+
+    config.client_rate_limit = args.client_rate_limit if \
+        args.client_rate_limit is not None else config.client_rate_limit
+
+    config.iodepth = args.iodepth if args.iodepth is not None \
+        else config.iodepth
+
+    config.workload = args.workload if args.workload is not None \
+        else config.workload
+
+    config.write_pattern = args.write_pattern if args.write_pattern is not None \
+        else config.write_pattern
+
+    config.preallocate = args.preallocate if args.preallocate is not None \
+        else config.preallocate
+
+    config.verify = args.verify if args.verify is not None \
+        else config.verify
 
     config.runtime = args.runtime if args.runtime is not None \
         else config.runtime
@@ -164,6 +337,19 @@ def get_config(args):
     # Command line arguments should override configuration file
     update_config(config, args)
 
+    # Streams write a chunk at a time, so they can't keep iodepth in flight
+    if config.workload == 'write' and config.write_pattern == 'sequential' \
+        and config.streams > 1 and config.iodepth > 1:
+        sys.exit('iodepth {} is not supported with {} streams'.format(
+            config.iodepth, config.streams))
+
+    # Without high rate sampling the monitor only records progress once a
+    # poll, so it would always look stalled on the liveness board
+    if config.heartbeat_liveness == 'board' and not config.monitor_sample_rate \
+        and config.monitor_poll_period >= config.liveness_timeout:
+        sys.exit('monitor_poll_period {} must be less than liveness_timeout {}'.format(
+            config.monitor_poll_period, config.liveness_timeout))
+
     return config
 
 def get_command_line_args():
@@ -192,6 +378,35 @@ def get_command_line_args():
         help="""File size in MB for storage consumers if sizes for all
                 consumers are not specificed in --config-file.""")
 
+    parser.add_argument('--default-rate-limit', type=float,
+        dest='default_rate_limit', metavar='MB_PER_SEC',
+        help="""Target throughput in MB/s for storage consumers if rate limits
+                for all consumers are not specified in --config-file.
+                0 means unlimited.""")
+
+    parser.add_argument('--client-rate-limit', type=float,
+        dest='client_rate_limit', metavar='MB_PER_SEC',
+        help='Combined target throughput in MB/s for all storage consumers.')
+
+    parser.add_argument('-w', '--workload', choices=['write', 'read', 'metadata'],
+        help='Type of work that storage consumers do.')
+
+    parser.add_argument('--write-pattern', choices=['sequential', 'random'],
+        dest='write_pattern',
+        help='Order in which write consumers write their files.')
+
+    parser.add_argument('--preallocate', choices=['none', 'fallocate', 'sparse'],
+        help='How write consumers allocate each new file before writing it.')
+
+    parser.add_argument('--verify', action='store_true', default=None,
+        help='Read back and check every file that write consumers write.')
+
+    parser.add_argument('--streams', type=int, metavar='COUNT',
+        help='Number of files each write consumer writes concurrently.')
+
+    parser.add_argument('--iodepth', type=int, metavar='COUNT',
+        help='Number of chunk writes each storage consumer keeps in flight.')
+
     parser.add_argument('-t', '--runtime', metavar= 'SECS', type=int,
         help='Time (sec) that client should run for.')
 
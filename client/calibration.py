@@ -0,0 +1,124 @@
+"""Contains the definitions for the Calibration and CalibrationCache classes."""
+
+import os
+import os.path
+import math
+import time
+import json
+import fcntl
+
+
+class Calibration(object):
+    """The Calibration class holds the chunk write times measured for a
+       storage path and chunk size.
+    """
+
+    def __init__(self, samples, timestamp=None):
+        """Initializes a Calibration with:
+
+            Args:
+                samples: A list of chunk write times (s).
+                timestamp: Time (s since epoch) that the samples were taken.
+                    Defaults to now.
+        """
+        self.samples = sorted(samples)
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    @property
+    def median(self):
+        """The median chunk write time (s)."""
+        count = len(self.samples)
+        middle = count // 2
+
+        if count % 2:
+            return self.samples[middle]
+
+        return (self.samples[middle - 1] + self.samples[middle]) / 2.0
+
+    @property
+    def p90(self):
+        """The 90th percentile (nearest rank) chunk write time (s)."""
+        rank = int(math.ceil(0.9 * len(self.samples)))
+        return self.samples[max(rank, 1) - 1]
+
+    def __repr__(self):
+        """Provides a repr() implementation for Calibration.
+
+            Returns:
+                A repr string for Calibration.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'samples={}, '.format(len(self.samples))
+        repr_string += 'median={}, '.format(self.median)
+        repr_string += 'p90={}, '.format(self.p90)
+        repr_string += 'timestamp={}'.format(self.timestamp)
+        repr_string += ')'
+        return repr_string
+
+
+class CalibrationCache(object):
+    """The CalibrationCache stores Calibrations on disk in the storage
+       directory they were measured in, keyed by the settings the chunks
+       were written with.  Entries older than the ttl are ignored so that a
+       changed device is re-measured.
+
+       Several consumers may share a storage path, so updates are made
+       under an exclusive lock and written with an atomic rename.
+    """
+
+    FILENAME = '.calibration'
+
+    def __init__(self, path, ttl):
+        """Initializes a CalibrationCache with:
+
+            Args:
+                path: The storage directory that the cache describes.
+                ttl: Time (s) that a cached Calibration remains valid.
+        """
+        self.filepath = os.path.join(path, self.FILENAME)
+        self.ttl = ttl
+
+    def _load(self):
+        """Returns the dict of cached entries, empty if unreadable."""
+        try:
+            with open(self.filepath, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def get(self, key):
+        """Look up a Calibration for key.
+
+            Args:
+                key: The settings that were calibrated, such as the chunk
+                    size (bytes).
+
+            Returns:
+                A Calibration or None if there is no fresh entry.
+        """
+        entry = self._load().get(str(key))
+        if entry is None or time.time() - entry['timestamp'] > self.ttl:
+            return None
+
+        return Calibration(samples=entry['samples'],
+                           timestamp=entry['timestamp'])
+
+    def put(self, key, calibration):
+        """Store a Calibration for key.
+
+            Args:
+                key: The settings that were calibrated, such as the chunk
+                    size (bytes).
+                calibration: The Calibration to store.
+        """
+        with open(self.filepath + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            entries = self._load()
+            entries[str(key)] = {'samples': calibration.samples,
+                                 'timestamp': calibration.timestamp}
+
+            temppath = '{}.{}'.format(self.filepath, os.getpid())
+            with open(temppath, 'w') as f:
+                json.dump(entries, f)
+            os.rename(temppath, self.filepath)
@@ -12,12 +12,52 @@ class ClientConfig(yaml.YAMLObject):
                  host,
                  host_port,
                  storage_path,
+                 storage_paths,
+                 placement,
+                 fanout,
                  storage_count,
                  default_chunk_size,
                  default_file_size,
                  chunk_sizes,
                  file_sizes,
+                 default_rate_limit,
+                 rate_limits,
+                 client_rate_limit,
+                 workload,
+                 read_pattern,
+                 read_block_size,
+                 read_evict,
+                 metadata_files,
+                 metadata_dirs,
+                 metadata_file_size,
+                 write_pattern,
+                 random_block_size,
+                 random_span,
+                 random_seed,
+                 verify,
+                 verify_checksum,
+                 streams,
+                 stream_weights,
+                 preallocate,
+                 data_compressibility,
+                 data_dedupe,
+                 iodepth,
+                 block_size,
+                 calibration_samples,
+                 calibration_warmup,
+                 calibration_ttl,
+                 retention_files,
+                 retention_size,
                  monitor_poll_period,
+                 monitor_sampler,
+                 monitor_batch,
+                 monitor_devices,
+                 monitor_sample_rate,
+                 monitor_process_tree,
+                 monitor_workers,
+                 monitor_sweep_budget,
+                 heartbeat_liveness,
+                 liveness_timeout,
                  runtime,
                  log_level):
         """Initializes a ClientConfig with:
@@ -26,12 +66,54 @@ class ClientConfig(yaml.YAMLObject):
                 host: The server ip.
                 host_port: The server port.
                 storage_path: Path to save consumer files.
+                storage_paths: List of paths to spread consumer files over.
+                placement: 'pinned', 'round-robin' or 'least-used' choice of path.
+                fanout: Number of hashed sub-directories in each path.
                 storage_count: Number of consumer instances.
                 default_chunk_size: Size of chunks to write to file.
                 default_file_size: Total size of file before rolling over.
                 chunk_sizes: List of chunk sizes for each storage consumer instance.
                 file_sizes: List of file sizes for each storage consumer instance.
+                default_rate_limit: Target MB/s of each consumer (0 is unlimited).
+                rate_limits: List of target MB/s for each storage consumer instance.
+                client_rate_limit: Combined target MB/s of all consumers.
+                workload: 'write', 'read' or 'metadata'.
+                read_pattern: 'sequential' or 'random' read offsets.
+                read_block_size: Size (KB) of each read.
+                read_evict: Drop files from the page cache before reading them.
+                metadata_files: Number of files per metadata pass.
+                metadata_dirs: Number of directories metadata files are spread over.
+                metadata_file_size: Size (KB) of each metadata file.
+                write_pattern: 'sequential' appends or 'random' overwrites.
+                random_block_size: Size (KB) of each random write.
+                random_span: Size (MB) of the file random writes are made in.
+                random_seed: Seed for the random write offsets.
+                verify: Read back and check each sequentially written file.
+                verify_checksum: 'crc32' or 'adler32'.
+                streams: Number of files each consumer writes concurrently.
+                stream_weights: List of relative chunk write shares of each stream.
+                preallocate: 'none', 'fallocate' or 'sparse' file allocation.
+                data_compressibility: Fraction (0-1) of written data that compresses.
+                data_dedupe: Fraction (0-1) of written data that is duplicated.
+                iodepth: Number of chunk writes each consumer keeps in flight.
+                block_size: Size (MB) of each write that chunks are split into.
+                calibration_samples: Number of timed chunk writes to calibrate with.
+                calibration_warmup: Number of untimed chunk writes before calibrating.
+                calibration_ttl: Time (s) that a cached calibration remains valid.
+                retention_files: Number of completed files each consumer keeps.
+                retention_size: Total size (MB) of completed files each consumer keeps.
                 monitor_poll_period: Period for monitor to poll consumer process info.
+                monitor_sampler: 'proc' to read process info from /proc, or 'ps'.
+                monitor_batch: Send all process info from a poll in one message.
+                monitor_devices: Sample the block devices of the storage paths.
+                monitor_sample_rate: Rate (Hz) to sample processes between polls.
+                monitor_process_tree: Also monitor the client's own processes.
+                monitor_workers: Number of threads that sample processes each poll.
+                monitor_sweep_budget: Time (s) each poll's sampling must finish in.
+                heartbeat_liveness: 'pipe' to poll children over their pipes,
+                    or 'board' to read their progress from shared memory.
+                liveness_timeout: Time (s) a child may make no progress on
+                    the board before its heartbeat is missing.
                 runtime: Client runtime before shutting down.
                 log_level: A string matching the logging level.
                     (e.g. DEBUG, INFO, WARNING)
@@ -39,12 +121,52 @@ class ClientConfig(yaml.YAMLObject):
         self.host = host
         self.host_port = host_port
         self.storage_path = storage_path
+        self.storage_paths = storage_paths
+        self.placement = placement
+        self.fanout = fanout
         self.storage_count = storage_count
         self.default_chunk_size = default_size
         self.default_file_size = default_file_size
         self.chunk_sizes = chunk_sizes
         self.file_sizes = file_sizes
+        self.default_rate_limit = default_rate_limit
+        self.rate_limits = rate_limits
+        self.client_rate_limit = client_rate_limit
+        self.workload = workload
+        self.read_pattern = read_pattern
+        self.read_block_size = read_block_size
+        self.read_evict = read_evict
+        self.metadata_files = metadata_files
+        self.metadata_dirs = metadata_dirs
+        self.metadata_file_size = metadata_file_size
+        self.write_pattern = write_pattern
+        self.random_block_size = random_block_size
+        self.random_span = random_span
+        self.random_seed = random_seed
+        self.verify = verify
+        self.verify_checksum = verify_checksum
+        self.streams = streams
+        self.stream_weights = stream_weights
+        self.preallocate = preallocate
+        self.data_compressibility = data_compressibility
+        self.data_dedupe = data_dedupe
+        self.iodepth = iodepth
+        self.block_size = block_size
+        self.calibration_samples = calibration_samples
+        self.calibration_warmup = calibration_warmup
+        self.calibration_ttl = calibration_ttl
+        self.retention_files = retention_files
+        self.retention_size = retention_size
         self.monitor_poll_period = monitor_poll_period
+        self.monitor_sampler = monitor_sampler
+        self.monitor_batch = monitor_batch
+        self.monitor_devices = monitor_devices
+        self.monitor_sample_rate = monitor_sample_rate
+        self.monitor_process_tree = monitor_process_tree
+        self.monitor_workers = monitor_workers
+        self.monitor_sweep_budget = monitor_sweep_budget
+        self.heartbeat_liveness = heartbeat_liveness
+        self.liveness_timeout = liveness_timeout
         self.heartbeat_poll_period = heartbeat_poll_period
         self.runtime = runtime
         self.log_level = log_level
@@ -60,13 +182,53 @@ class ClientConfig(yaml.YAMLObject):
         repr_string += 'host=%r, ' % (self.host)
         repr_string += 'host_port=%r, ' % (self.host_port)
         repr_string += 'storage_path=%r, ' % (self.storage_path)
+        repr_string += 'storage_paths=%r, ' % (self.storage_paths)
+        repr_string += 'placement=%r, ' % (self.placement)
+        repr_string += 'fanout=%r, ' % (self.fanout)
         repr_string += 'storage_count=%r, ' % (self.storage_count)
         repr_string += 'default_chunk_size=%r, ' % (self.default_chunk_size)
         repr_string += 'default_file_size=%r, ' % (self.default_file_size)
         repr_string += 'chunk_sizes=%r, ' % (self.chunk_sizes)
         repr_string += 'file_sizes=%r, ' % (self.file_sizes)
+        repr_string += 'default_rate_limit=%r, ' % (self.default_rate_limit)
+        repr_string += 'rate_limits=%r, ' % (self.rate_limits)
+        repr_string += 'client_rate_limit=%r, ' % (self.client_rate_limit)
+        repr_string += 'workload=%r, ' % (self.workload)
+        repr_string += 'read_pattern=%r, ' % (self.read_pattern)
+        repr_string += 'read_block_size=%r, ' % (self.read_block_size)
+        repr_string += 'read_evict=%r, ' % (self.read_evict)
+        repr_string += 'metadata_files=%r, ' % (self.metadata_files)
+        repr_string += 'metadata_dirs=%r, ' % (self.metadata_dirs)
+        repr_string += 'metadata_file_size=%r, ' % (self.metadata_file_size)
+        repr_string += 'write_pattern=%r, ' % (self.write_pattern)
+        repr_string += 'random_block_size=%r, ' % (self.random_block_size)
+        repr_string += 'random_span=%r, ' % (self.random_span)
+        repr_string += 'random_seed=%r, ' % (self.random_seed)
+        repr_string += 'verify=%r, ' % (self.verify)
+        repr_string += 'verify_checksum=%r, ' % (self.verify_checksum)
+        repr_string += 'streams=%r, ' % (self.streams)
+        repr_string += 'stream_weights=%r, ' % (self.stream_weights)
+        repr_string += 'preallocate=%r, ' % (self.preallocate)
+        repr_string += 'data_compressibility=%r, ' % (self.data_compressibility)
+        repr_string += 'data_dedupe=%r, ' % (self.data_dedupe)
+        repr_string += 'iodepth=%r, ' % (self.iodepth)
+        repr_string += 'block_size=%r, ' % (self.block_size)
+        repr_string += 'calibration_samples=%r, ' % (self.calibration_samples)
+        repr_string += 'calibration_warmup=%r, ' % (self.calibration_warmup)
+        repr_string += 'calibration_ttl=%r, ' % (self.calibration_ttl)
+        repr_string += 'retention_files=%r, ' % (self.retention_files)
+        repr_string += 'retention_size=%r, ' % (self.retention_size)
         repr_string += 'monitor_poll_period=%r, ' % (self.monitor_poll_period)
+        repr_string += 'monitor_sampler=%r, ' % (self.monitor_sampler)
+        repr_string += 'monitor_batch=%r, ' % (self.monitor_batch)
+        repr_string += 'monitor_devices=%r, ' % (self.monitor_devices)
+        repr_string += 'monitor_sample_rate=%r, ' % (self.monitor_sample_rate)
+        repr_string += 'monitor_process_tree=%r, ' % (self.monitor_process_tree)
+        repr_string += 'monitor_workers=%r, ' % (self.monitor_workers)
+        repr_string += 'monitor_sweep_budget=%r, ' % (self.monitor_sweep_budget)
         repr_string += 'heartbeat_poll_period=%r, ' % (self.heartbeat_poll_period)
+        repr_string += 'heartbeat_liveness=%r, ' % (self.heartbeat_liveness)
+        repr_string += 'liveness_timeout=%r, ' % (self.liveness_timeout)
         repr_string += 'runtime=%r, ' % (self.runtime)
         repr_string += 'log_level=%r, ' % (self.log_level)
 
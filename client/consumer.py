@@ -5,11 +5,24 @@ import os.path
 import time
 import subprocess
 import math
+import random
+import zlib
+import struct
+import itertools
+import threading
 from datetime import datetime
-from collections import namedtuple
+from collections import namedtuple, deque
+from multiprocessing.pool import ThreadPool
 
 from process import StorageObject
-from shared import Message, init_dir_path
+from fileio import pwrite, evict_cache, fallocate
+from ratelimit import TokenBucket
+from calibration import Calibration, CalibrationCache
+from reclaim import FileReclaimer
+from stream import WriteStream
+from datapattern import DataPattern
+from placement import Placement
+from shared import Message, LatencyHistogram
 
 class RolloverPayload(object):
     """The RolloverPayload class is used as a container for the
@@ -19,17 +32,89 @@ class RolloverPayload(object):
        forwarded to the server.
     """
 
-    def __init__(self, path, size, chunk):
+    def __init__(self, path, size, chunk, latency=None, elapsed=None,
+                 target=None, client_target=None, pattern='sequential',
+                 stream=None, preallocate='none', allocation=None,
+                 storage=None, started=None):
         """Initializes a RolloverPayload with:
 
             Args:
                 path: The path of the recently completed file.
-                size: The total file size.
-                chunk: The chunk size used to write this file.
+                size: The total file size, or the bytes written by a pass of
+                    random writes.
+                chunk: The chunk size, or the random block size, used to
+                    write this file.
+                latency: A LatencyHistogram of the chunk writes for this file.
+                elapsed: Time (s) it took to write this file.
+                target: The consumer's target throughput (bytes/s) or None.
+                client_target: The client's combined target throughput
+                    (bytes/s) or None.
+                pattern: 'sequential' or 'random' writes.
+                stream: The index of the stream that wrote this file, or
+                    None for a single-stream consumer.
+                preallocate: How the file was allocated before it was
+                    written: 'none', 'fallocate' or 'sparse'.
+                allocation: Time (s) spent preallocating the file, which is
+                    not included in elapsed.
+                storage: The storage path that the file was placed in.
+                started: The datetime that the file was started, so that
+                    throughput can be measured over wall-clock time.
         """
         self.path = path
         self.size = size
         self.chunk = chunk
+        self.latency = latency
+        self.elapsed = elapsed
+        self.target = target
+        self.client_target = client_target
+        self.pattern = pattern
+        self.stream = stream
+        self.preallocate = preallocate
+        self.allocation = allocation
+        self.storage = storage
+        self.started = started
+
+
+class VerifyPayload(object):
+    """The VerifyPayload class is used as a container for the
+       Message.payload of VERIFY messages.  It holds the result of reading
+       back a completed file and comparing its chunk checksums.
+    """
+
+    def __init__(self, path, size, checksum, chunks, mismatches, elapsed):
+        """Initializes a VerifyPayload with:
+
+            Args:
+                path: The path of the verified file.
+                size: The number of bytes read back.
+                checksum: The name of the checksum function used.
+                chunks: The number of chunks compared.
+                mismatches: The number of chunks whose checksum differed
+                    from the one computed when they were written.
+                elapsed: Time (s) spent reading and checksumming the file.
+        """
+        self.path = path
+        self.size = size
+        self.checksum = checksum
+        self.chunks = chunks
+        self.mismatches = mismatches
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        """Provides a repr() implementation for VerifyPayload.
+
+            Returns:
+                A repr string for VerifyPayload.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'path={}, '.format(self.path)
+        repr_string += 'size={}, '.format(self.size)
+        repr_string += 'checksum={}, '.format(self.checksum)
+        repr_string += 'chunks={}, '.format(self.chunks)
+        repr_string += 'mismatches={}, '.format(self.mismatches)
+        repr_string += 'elapsed={}'.format(self.elapsed)
+        repr_string += ')'
+        return repr_string
 
 
 class StorageConsumer(StorageObject):
@@ -43,10 +128,83 @@ class StorageConsumer(StorageObject):
 
        KILL messages received on the "heartbeat" pipe force the process
        to stop after completing the current file.
+
+       With an iodepth greater than 1, chunks are written by a pool of
+       threads that keep iodepth positional writes in flight against the
+       current file.  Streams write one chunk at a time, so an iodepth
+       greater than 1 can't be combined with more than one stream.
+
+       Throughput can be capped per consumer with rate_limit and across
+       consumers with a shared client_limiter TokenBucket.
+
+       With max_files or max_size set, the oldest completed files are
+       deleted on a background thread once the limits are exceeded.  The
+       time spent deleting them is sent in RECLAIM messages.
+
+       Chunks are streamed to disk as repeated writes of a single reusable
+       block, so memory use does not grow with the chunk size.  A new block
+       number is stamped into every STAMP_SIZE unit of the block before
+       each write, so that storage which deduplicates never sees the same
+       data twice.
+
+       With the 'random' write_pattern the consumer instead fills a single
+       file of random_span once, then repeatedly overwrites random block
+       aligned positions in it.  Each pass writes file_size bytes and is
+       reported as a rollover.
+
+       With verify set, a checksum of each sequentially written chunk is
+       accumulated block by block as it is written.  Each completed file is
+       then dropped from the page cache and read back in blocks, and the
+       chunk checksums are compared and sent in a VERIFY message.
+
+       With more than one stream, a sequential consumer keeps that many
+       files open and interleaves its chunk writes across them, round-robin
+       or in proportion to stream_weights.  Each file is reported as a
+       rollover of its stream when it fills.
+
+       New files can be preallocated to file_size before they are written,
+       either with posix_fallocate or as a sparse file, and the time spent
+       allocating is reported separately from the write time.
+
+       Setting data_compressibility or data_dedupe replaces the reusable
+       block with new blocks from a DataPattern, so that storage which
+       compresses or deduplicates sees data like that of production.
+
+       Files can be spread over several storage paths, and over hashed
+       sub-directories of them, by a Placement.
     """
 
+    WRITE_PATTERNS = ('sequential', 'random')
+    PREALLOCATE_MODES = ('none', 'fallocate', 'sparse')
+
+    # Checksum functions that take (data, value) so that they can be
+    # computed incrementally
+    CHECKSUMS = {'crc32': zlib.crc32,
+                 'adler32': zlib.adler32}
+
+    # (bytes) Default size of the reusable block that chunks are written from
+    BLOCK_SIZE = 4 * 1000000
+
+    # (bytes) Granularity that block numbers are stamped at, which is that
+    # of most deduplicating storage
+    STAMP_SIZE = 4096
+    STAMP = struct.Struct('<Q')
+
+    # Number of untimed and timed chunk writes used for calibration
+    CALIBRATION_WARMUP = 1
+    CALIBRATION_SAMPLES = 5
+    # (seconds) How long a calibration is reused from the on-disk cache
+    CALIBRATION_TTL = 3600
+
     def __init__(self, id, chunk_size, file_size, heartbeat, report,
-                 name=None, path='.'):
+                 name=None, path='.', iodepth=1, rate_limit=None,
+                 client_limiter=None, max_files=None, max_size=None,
+                 block_size=None, write_pattern='sequential',
+                 random_block_size=4, random_span=None, random_seed=0,
+                 verify=False, verify_checksum='crc32', streams=1,
+                 stream_weights=None, preallocate='none',
+                 data_compressibility=None, data_dedupe=None, paths=None,
+                 placement='pinned', fanout=0):
         """Initializes a StorageConsumer with:
 
             Args:
@@ -57,6 +215,41 @@ class StorageConsumer(StorageObject):
                 report: A queue for sending status messages to its master.
                 name: A string name of the process.
                 path: Directory path that the files should be written to.
+                iodepth: Number of chunk writes to keep in flight at once.
+                rate_limit: Target throughput in MB/s.  None or 0 writes
+                    as fast as possible.
+                client_limiter: A TokenBucket shared by all consumers on
+                    this client, or None.
+                max_files: Number of completed files to keep.  None or 0
+                    keeps every file.
+                max_size: Total size in MB of completed files to keep.  None
+                    or 0 keeps every file.
+                block_size: Size in MB of each write that a chunk is split
+                    into.  Defaults to BLOCK_SIZE.
+                write_pattern: 'sequential' appends or 'random' overwrites.
+                random_block_size: Size in KB of each random write.
+                random_span: Size in MB of the file that random writes are
+                    made within.  None or 0 uses file_size.
+                random_seed: Seed for the random write offsets.  The id is
+                    added so that consumers write different sequences.
+                verify: Read back and check each sequentially written file.
+                verify_checksum: 'crc32' or 'adler32'.
+                streams: Number of files written concurrently.  Only
+                    supported with an iodepth of 1.
+                stream_weights: A list of the relative share of chunk writes
+                    for each stream.  None writes to them in turn.
+                preallocate: 'none', 'fallocate' or 'sparse' allocation of
+                    sequentially written files.
+                data_compressibility: Fraction (0-1) of the written data
+                    that compresses away.  None and data_dedupe None keep
+                    writing the reusable random block.
+                data_dedupe: Fraction (0-1) of the written data that is
+                    duplicated.
+                paths: A list of storage directory paths that files are
+                    placed in.  None uses path alone.
+                placement: 'pinned', 'round-robin' or 'least-used' choice
+                    among paths.
+                fanout: Number of hashed sub-directories in each path.
         """
         super(StorageConsumer, self).__init__(id=id,
                                               heartbeat=heartbeat,
@@ -66,8 +259,94 @@ class StorageConsumer(StorageObject):
         self.chunk_size = chunk_size * 1000000
         self.file_size = file_size * 1000000
 
-        # Validate the directory path
-        self.path = init_dir_path(path)
+        self.placement = Placement(paths=paths or [path],
+                                   policy=placement,
+                                   fanout=fanout,
+                                   id=id)
+        # Calibration and other per-consumer files use the pinned path
+        self.path = self.placement.pinned
+
+        # Every write is made from this one block, which never needs to be
+        # larger than a chunk
+        block_size = block_size * 1000000 if block_size else self.BLOCK_SIZE
+        self.block = os.urandom(min(block_size, self.chunk_size))
+        # Each writer thread stamps its own copy of the block
+        self._buffers = threading.local()
+        # next() on a count is atomic, so writer threads can share it
+        self.block_numbers = itertools.count()
+
+        # Chunk write latencies for the file currently being written
+        self.latency = LatencyHistogram()
+
+        self.iodepth = max(1, iodepth)
+        # The writer pool is created lazily so that its threads are started
+        # in the consumer process rather than the parent.
+        self._pool = None
+
+        self.limiters = []
+        self.target = rate_limit * 1000000 if rate_limit else None
+        if self.target is not None:
+            self.limiters.append(TokenBucket(self.target))
+        if client_limiter is not None:
+            self.limiters.append(client_limiter)
+        self.client_target = client_limiter.rate if client_limiter is not None \
+            else None
+
+        # Time (s) spent writing the file currently being written, and the
+        # datetime it was started
+        self.elapsed = None
+        self.started = None
+
+        self.max_files = max_files or None
+        self.max_size = max_size * 1000000 if max_size else None
+        # Completed files subject to the retention limits, oldest first, as
+        # (filepath, size) tuples.
+        self.retained = deque()
+        self.retained_size = 0
+        # Started lazily in the consumer process like the writer pool
+        self._reclaimer = None
+
+        if write_pattern not in self.WRITE_PATTERNS:
+            raise ValueError('Unknown write pattern {}'.format(write_pattern))
+
+        self.write_pattern = write_pattern
+        self.random_block = os.urandom(random_block_size * 1000)
+        self.random_span = random_span * 1000000 if random_span \
+            else self.file_size
+        self.random = random.Random(random_seed + id)
+
+        if verify_checksum not in self.CHECKSUMS:
+            raise ValueError('Unknown checksum {}'.format(verify_checksum))
+
+        self.verify = verify
+        self.verify_checksum = verify_checksum
+        self.checksum = self.CHECKSUMS[verify_checksum]
+        # Checksums of the chunks of the file currently being written,
+        # keyed by chunk offset
+        self.checksums = {}
+
+        self.streams = max(1, streams)
+
+        if self.streams > 1 and self.iodepth > 1 and write_pattern == 'sequential':
+            raise ValueError('iodepth {} is not supported with {} streams'.format(
+                self.iodepth, self.streams))
+
+        self.stream_weights = list(stream_weights) if stream_weights \
+            else [1] * self.streams
+
+        if preallocate not in self.PREALLOCATE_MODES:
+            raise ValueError('Unknown preallocate mode {}'.format(preallocate))
+
+        self.preallocate = preallocate
+        # Time (s) spent preallocating the file currently being written
+        self.allocation = None
+
+        if data_compressibility is None and data_dedupe is None:
+            self.data_pattern = None
+        else:
+            self.data_pattern = DataPattern(id=id,
+                                            compressibility=data_compressibility or 0.0,
+                                            dedupe=data_dedupe or 0.0)
 
     def test_chunk_speed(self, filepath):
         """Test the time to write a single chunk.
@@ -82,7 +361,8 @@ class StorageConsumer(StorageObject):
         start = time.time()
 
         with open(filepath, 'wb') as f:
-            f.write(os.urandom(self.chunk_size))
+            for block in self.chunk_blocks():
+                f.write(block)
 
         elapsed = time.time() - start
 
@@ -91,20 +371,100 @@ class StorageConsumer(StorageObject):
 
         return elapsed
 
-    def test_runtime(self, runtime):
-        """Tests the number of files that can rollover in a given runtime by
-        timing the write for a single chunk.
+    def calibration_key(self):
+        """Returns the key that calibrations are cached under, made of every
+           setting that changes how chunks are written, so that a
+           calibration is only reused for the same workload.
+        """
+        data = 'random' if self.data_pattern is None else '{}/{}'.format(
+            self.data_pattern.compressibility, self.data_pattern.dedupe)
+
+        return '{}:{}:{}:{}:{}'.format(self.chunk_size,
+                                       len(self.block),
+                                       self.write_pattern,
+                                       self.preallocate,
+                                       data)
+
+    def calibrate(self, samples=None, warmup=None, ttl=None):
+        """Measure the chunk write time of the storage paths.
+
+           Unless the placement is pinned, files can be placed in any of the
+           paths, so each of them is calibrated and the slowest is used.
+
+            Args:
+                samples: Number of timed chunk writes.
+                warmup: Number of untimed chunk writes done first.
+                ttl: Time (s) that a cached calibration remains valid.
+
+            Returns:
+                The Calibration of the chunk write times with the largest p90.
+        """
+        samples = samples if samples is not None else self.CALIBRATION_SAMPLES
+        warmup = warmup if warmup is not None else self.CALIBRATION_WARMUP
+        ttl = ttl if ttl is not None else self.CALIBRATION_TTL
+
+        paths = [self.placement.pinned] if self.placement.policy == 'pinned' \
+            else self.placement.paths
+
+        return max((self.calibrate_path(path, samples, warmup, ttl)
+                    for path in paths),
+                   key=lambda calibration: calibration.p90)
+
+    def calibrate_path(self, path, samples, warmup, ttl):
+        """Measure the chunk write time of one storage path.
+
+           A fresh result from the CalibrationCache in the storage path is
+           reused without doing any I/O.  Otherwise warmup chunk writes are
+           discarded before samples chunk writes are timed and cached.
+
+            Args:
+                path: The storage path to calibrate.
+                samples: Number of timed chunk writes.
+                warmup: Number of untimed chunk writes done first.
+                ttl: Time (s) that a cached calibration remains valid.
+
+            Returns:
+                A Calibration of the chunk write times.
+        """
+        key = self.calibration_key()
+        cache = CalibrationCache(path, ttl)
+        calibration = cache.get(key)
+        if calibration is not None:
+            return calibration
+
+        # Each consumer gets its own file so that concurrent calibrations of
+        # a shared storage path do not write over each other.
+        filepath = os.path.join(path, '.calibrate_{}_{}_{}'.format(
+            self.name, self.id, os.getpid()))
+
+        for _ in xrange(warmup):
+            self.test_chunk_speed(filepath)
+
+        calibration = Calibration([self.test_chunk_speed(filepath)
+                                   for _ in xrange(max(1, samples))])
+        cache.put(key, calibration)
+
+        return calibration
+
+    def test_runtime(self, runtime, samples=None, warmup=None, ttl=None):
+        """Tests the number of files that can rollover in a given runtime
+        using the p90 chunk write time from calibrate().
 
             Args:
                 runtime: Time (s) that StorageConsumer would be run for.
+                samples: Number of timed chunk writes for calibration.
+                warmup: Number of untimed chunk writes for calibration.
+                ttl: Time (s) that a cached calibration remains valid.
             Returns:
                 True if we can rollover at least 2 times else False
         """
-        path = os.path.join(self.path, 'temp')
+        calibration = self.calibrate(samples=samples, warmup=warmup, ttl=ttl)
 
-        chunk_time = self.test_chunk_speed(path)
+        # The p90 rather than the median errs on the side of rejecting
+        # a runtime that would only just allow two rollovers.
+        chunk_time = calibration.p90
 
-        num_chunks_per_file = math.ceil(self.file_size / self.chunk_size)
+        num_chunks_per_file = math.ceil(float(self.file_size) / self.chunk_size)
 
         time_per_file = chunk_time * num_chunks_per_file
 
@@ -125,20 +485,434 @@ class StorageConsumer(StorageObject):
         # write in order to get an accurate size measurement.
         subprocess.call(['touch', filepath])
 
-    def append_chunk(self, filepath):
-        with open(filepath, 'ab') as f:
-            # Construct a byte string of chunk_size and then
-            # write to file
-            f.write(os.urandom(self.chunk_size))
+    def throttle(self, size):
+        """Wait until size bytes may be written under every rate limit.
+
+            Args:
+                size: The number of bytes about to be written.
+
+            Returns:
+                Time (s) spent waiting.
+        """
+        return sum(limiter.consume(size) for limiter in self.limiters)
+
+    def stamp(self, data, size):
+        """Stamp a new block number into every STAMP_SIZE unit of the first
+           size bytes of data.
+
+            Args:
+                data: A bytearray.
+                size: The number of bytes that will be written.
+        """
+        stamp = self.STAMP.pack(next(self.block_numbers))
+
+        # One slice assignment per byte of the stamp covers every unit
+        for index, byte in enumerate(stamp):
+            data[index:size:self.STAMP_SIZE] = byte * len(xrange(index, size,
+                                                                 self.STAMP_SIZE))
+
+    def stamped_block(self, size):
+        """Returns size bytes of the reusable block with a new block number
+           stamped into it.
+
+           The block is this thread's own copy, which is stamped again in
+           place by the thread's next call.
+
+            Args:
+                size: The size (bytes) of the block, at most len(self.block).
+        """
+        data = getattr(self._buffers, 'block', None)
+        if data is None:
+            data = self._buffers.block = bytearray(self.block)
+
+        self.stamp(data, size)
+
+        return data if size == len(data) else data[:size]
+
+    def chunk_blocks(self, offset=0):
+        """Generates the blocks that make up one chunk.
+
+           Each block is the thread's stamped copy of the reusable block, so
+           it must be written before the next one is generated.  Only the
+           final block of a chunk that isn't a multiple of the block size is
+           a new (shorter) bytearray, unless the blocks come from a
+           DataPattern.
+
+            Args:
+                offset: The offset in the file that the chunk is written at.
+        """
+        remaining = self.chunk_size
+        while remaining > 0:
+            size = min(remaining, len(self.block))
+            if self.data_pattern is not None:
+                yield self.data_pattern.block(size, offset)
+            else:
+                yield self.stamped_block(size)
+            remaining -= size
+            offset += size
+
+    def append_chunk(self, filepath, offset=None):
+        """Append a single chunk to the end of the file, or write it over
+           the file at offset.
+
+            Args:
+                filepath: The path of the file being written.
+                offset: The byte offset to write the chunk at.  Defaults to
+                    the end of the file.
+
+            Returns:
+                Time (s) it took to write the chunk, excluding any time
+                spent waiting on rate limits.
+        """
+        throttled = 0.0
+        checksum = self.checksum('') if self.verify else None
+
+        start = time.time()
+        with open(filepath, 'ab' if offset is None else 'r+b') as f:
+            if offset is None:
+                offset = os.fstat(f.fileno()).st_size
+            else:
+                f.seek(offset)
+            for block in self.chunk_blocks(offset):
+                throttled += self.throttle(len(block))
+                f.write(block)
+                self.progress(len(block))
+                if checksum is not None:
+                    checksum = self.checksum(buffer(block), checksum)
+
+        elapsed = time.time() - start - throttled
+
+        if checksum is not None:
+            self.checksums[offset] = checksum
+
+        return elapsed
+
+    def write_chunk_at(self, fd, offset):
+        """Write a single chunk at offset without moving the file position.
+
+            Args:
+                fd: A file descriptor open for writing.
+                offset: The byte offset in the file to write the chunk at.
+
+            Returns:
+                Time (s) it took to write the chunk, excluding any time
+                spent waiting on rate limits.
+        """
+        throttled = 0.0
+        checksum = self.checksum('') if self.verify else None
+        chunk_offset = offset
+
+        start = time.time()
+        for block in self.chunk_blocks(offset):
+            throttled += self.throttle(len(block))
+            pwrite(fd, block, offset)
+            self.progress(len(block))
+            offset += len(block)
+            if checksum is not None:
+                checksum = self.checksum(buffer(block), checksum)
+
+        elapsed = time.time() - start - throttled
+
+        if checksum is not None:
+            # Each writer thread stores a different key
+            self.checksums[chunk_offset] = checksum
+
+        return elapsed
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPool(self.iodepth)
+
+        return self._pool
+
+    def _close_pool(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _terminate_pool(self):
+        """Drop the writes still queued on the pool and wait for the ones
+           in flight to finish."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _write_at_offsets(self, write, fd, offsets):
+        """Make a positional write at each offset, keeping up to iodepth
+           in flight, and record their latencies.
+
+           If a write fails, the pool is terminated before the error is
+           raised so that no other write is made to fd after the caller
+           has closed it.
+
+            Args:
+                write: write_chunk_at or write_block_at.
+                fd: A file descriptor open for writing.
+                offsets: An iterable of the offsets to write at.
+        """
+        if self.iodepth == 1:
+            for offset in offsets:
+                self.latency.record(write(fd, offset))
+            return
+
+        elapsed_times = self._get_pool().imap_unordered(
+            lambda offset: write(fd, offset), offsets)
+        try:
+            # Latencies are recorded here rather than in the workers so that
+            # the histogram is only ever touched by one thread
+            for elapsed in elapsed_times:
+                self.latency.record(elapsed)
+        except:
+            self._terminate_pool()
+            raise
+
+    def _write_file_at_offsets(self, filepath, offset):
+        """Write the remainder of the file from offset with positional
+           writes, keeping iodepth chunks in flight.
+
+           Chunk offsets match the sequential append path so the final file
+           size is identical regardless of iodepth.
+
+            Args:
+                filepath: The path of the file being written.
+                offset: The offset of the first chunk.
+        """
+        offsets = xrange(offset, self.file_size, self.chunk_size)
+
+        fd = os.open(filepath, os.O_WRONLY)
+        try:
+            self._write_at_offsets(self.write_chunk_at, fd, offsets)
+        finally:
+            os.close(fd)
+
+    def write_file_in_chunks(self, filepath, offset=None):
+        """Write chunks to the file until it reaches file_size.
+
+           Progress is tracked by offset rather than by the size of the
+           file, which a preallocated file has before anything is written.
+           Chunks take the same write path whether or not the file was
+           preallocated, so that preallocation modes are compared on
+           allocation alone.
+
+            Args:
+                filepath: The path of the file being written.
+                offset: The offset to write the first chunk at.  Defaults to
+                    the end of the file, where chunks are appended.
+        """
+        append = offset is None
+        if append:
+            offset = os.path.getsize(filepath)
+
+        if self.iodepth > 1:
+            self._write_file_at_offsets(filepath, offset)
+            return
+
+        while offset < self.file_size:
+            self.latency.record(self.append_chunk(filepath,
+                                                  None if append else offset))
+            offset += self.chunk_size
+
+    def allocate(self, fd):
+        """Preallocate file_size bytes of a new file.
+
+            Args:
+                fd: A file descriptor open for writing.
+
+            Returns:
+                Time (s) spent allocating, or None if preallocation is off.
+        """
+        if self.preallocate == 'none':
+            return None
+
+        start = time.time()
+
+        if self.preallocate == 'fallocate':
+            fallocate(fd, 0, self.file_size)
+        else:
+            # The file reads as zeros but has no blocks allocated
+            os.ftruncate(fd, self.file_size)
+
+        return time.time() - start
+
+    def preallocate_file(self, filepath):
+        """Preallocate file_size bytes of a new file.
+
+            Args:
+                filepath: The path of the new file.
+
+            Returns:
+                Time (s) spent allocating, or None if preallocation is off.
+        """
+        if self.preallocate == 'none':
+            return None
+
+        fd = os.open(filepath, os.O_WRONLY)
+        try:
+            return self.allocate(fd)
+        finally:
+            os.close(fd)
+
+    def random_offsets(self):
+        """Generates the offsets of one pass of random writes.
+
+           A pass makes as many block aligned writes as it takes to write
+           file_size bytes, at positions spread over the whole span.
+        """
+        block = len(self.random_block)
+        blocks = max(1, self.random_span // block)
+
+        for _ in xrange(max(1, self.file_size // block)):
+            yield self.random.randrange(blocks) * block
+
+    def prepare_random_file(self, filepath):
+        """Fill a new file to random_span so that random writes overwrite
+           allocated blocks rather than extending the file.
+
+            Args:
+                filepath: The path of the file to prepare.
+        """
+        with open(filepath, 'wb') as f:
+            remaining = self.random_span
+            while remaining > 0:
+                size = min(remaining, len(self.block))
+                f.write(self.stamped_block(size))
+                remaining -= size
+
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write_block_at(self, fd, offset):
+        """Write a single random block at offset.
+
+            Args:
+                fd: A file descriptor open for writing.
+                offset: The byte offset in the file to write the block at.
+
+            Returns:
+                Time (s) it took to write the block, excluding any time
+                spent waiting on rate limits.
+        """
+        if self.data_pattern is None:
+            # A copy is cheap at this size and keeps threads apart
+            block = bytearray(self.random_block)
+            self.stamp(block, len(block))
+        else:
+            block = self.data_pattern.block(len(self.random_block), offset)
+
+        self.throttle(len(block))
+
+        start = time.time()
+        pwrite(fd, block, offset)
+        elapsed = time.time() - start
+
+        self.progress(len(block))
+
+        return elapsed
+
+    def write_file_randomly(self, filepath):
+        """Make one pass of random writes over a prepared file, with up
+           to iodepth writes in flight.
+
+            Args:
+                filepath: The path of a file prepared by prepare_random_file.
+
+            Returns:
+                The number of bytes written.
+        """
+        offsets = self.random_offsets()
+
+        fd = os.open(filepath, os.O_WRONLY)
+        try:
+            self._write_at_offsets(self.write_block_at, fd, offsets)
+        finally:
+            os.close(fd)
+
+        return self.latency.count * len(self.random_block)
+
+    def verify_file(self, filepath):
+        """Read back a completed file and compare the checksum of each
+           chunk with the one computed when it was written.
+
+           The file is dropped from the page cache first so that the data
+           comes from the device.  Chunks are read in blocks and their
+           checksums are accumulated incrementally.  Each block read counts
+           as progress, so a slow read back isn't mistaken for a stall.
+
+            Args:
+                filepath: The path of a file written with verify set.
+
+            Returns:
+                A VerifyPayload with the result.
+        """
+        block_size = len(self.block)
+        size = 0
+        mismatches = 0
+
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            evict_cache(fd)
+
+            start = time.time()
+            for offset, expected in sorted(self.checksums.iteritems()):
+                os.lseek(fd, offset, os.SEEK_SET)
+                checksum = self.checksum('')
+                remaining = self.chunk_size
+                while remaining > 0:
+                    data = os.read(fd, min(remaining, block_size))
+                    if not data:
+                        break  # Truncated file.  The checksum won't match.
+                    checksum = self.checksum(data, checksum)
+                    remaining -= len(data)
+                    size += len(data)
+                    self.progress(len(data))
+
+                if checksum != expected:
+                    mismatches += 1
+
+            elapsed = time.time() - start
+        finally:
+            os.close(fd)
+
+        return VerifyPayload(path=filepath,
+                             size=size,
+                             checksum=self.verify_checksum,
+                             chunks=len(self.checksums),
+                             mismatches=mismatches,
+                             elapsed=elapsed)
+
+    def send_verify_message(self, payload):
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='VERIFY',
+                                payload=payload))
 
-    def write_file_in_chunks(self, filepath):
-        while os.path.getsize(filepath) < self.file_size:
-            self.append_chunk(filepath)
+    def send_rollover_message(self, filepath, size=None, stream=None):
+        """Send a ROLLOVER message for a completed file.
 
-    def send_rollover_message(self, filepath):
+            Args:
+                filepath: The path of the completed file.
+                size: The number of bytes written.  Defaults to the file size.
+                stream: The index of the stream that wrote the file, if any.
+        """
+        random_pattern = self.write_pattern == 'random'
         payload = RolloverPayload(path=filepath,
-                                  size=os.path.getsize(filepath),
-                                  chunk=self.chunk_size)
+                                  size=size if size is not None
+                                      else os.path.getsize(filepath),
+                                  chunk=len(self.random_block) if random_pattern
+                                      else self.chunk_size,
+                                  latency=self.latency,
+                                  elapsed=self.elapsed,
+                                  target=self.target,
+                                  client_target=self.client_target,
+                                  pattern=self.write_pattern,
+                                  stream=stream,
+                                  preallocate=self.preallocate,
+                                  allocation=self.allocation,
+                                  storage=self.placement.storage(filepath),
+                                  started=self.started)
 
         self.report.put(Message(name=self.name,
                                 id=self.id,
@@ -146,6 +920,100 @@ class StorageConsumer(StorageObject):
                                 type='ROLLOVER',
                                 payload=payload))
 
+    def _get_reclaimer(self):
+        if self._reclaimer is None:
+            self._reclaimer = FileReclaimer()
+            self._reclaimer.start()
+
+        return self._reclaimer
+
+    def retain_file(self, filepath, size):
+        """Add a completed file to the retention ring and queue the oldest
+           files for deletion while the limits are exceeded.  The most
+           recent file is always kept.
+
+            Args:
+                filepath: The path of the completed file.
+                size: The size (bytes) of the completed file.
+        """
+        if self.max_files is None and self.max_size is None:
+            return
+
+        self.retained.append((filepath, size))
+        self.retained_size += size
+
+        while len(self.retained) > 1 and (
+                (self.max_files is not None and
+                 len(self.retained) > self.max_files) or
+                (self.max_size is not None and
+                 self.retained_size > self.max_size)):
+            oldest, oldest_size = self.retained.popleft()
+            self.retained_size -= oldest_size
+            self._get_reclaimer().reclaim(oldest, oldest_size)
+
+    def send_reclaim_message(self):
+        """Send the files deleted since the last RECLAIM message, if any."""
+        if self._reclaimer is None:
+            return
+
+        payload = self._reclaimer.collect()
+        if not payload.files:
+            return
+
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='RECLAIM',
+                                payload=payload))
+
+    def complete_file(self, filepath, stream=None):
+        """Report a completed file and apply the retention limits to it.
+
+            Args:
+                filepath: The path of the completed file.
+                stream: The index of the stream that wrote the file, if any.
+        """
+        self.send_rollover_message(filepath, stream=stream)
+
+        if self.verify:
+            self.send_verify_message(self.verify_file(filepath))
+
+        self.retain_file(filepath, os.path.getsize(filepath))
+        self.send_reclaim_message()
+
+    def write_stream_chunk(self, stream):
+        """Write the next chunk of a stream's file.
+
+            Args:
+                stream: An open WriteStream.
+        """
+        # Checksums are recorded against whichever file is being written
+        self.checksums = stream.checksums
+
+        start = time.time()
+        stream.latency.record(self.write_chunk_at(stream.fd, stream.offset))
+        # Only the time spent on this stream's own chunks counts towards
+        # its file, so per-file throughput isn't diluted by the others.
+        stream.elapsed += time.time() - start
+
+        stream.offset += self.chunk_size
+
+    def complete_stream_file(self, stream):
+        """Close a stream's full file and report it.
+
+            Args:
+                stream: An open WriteStream whose file has reached file_size.
+        """
+        stream.close()
+
+        self.latency = stream.latency
+        self.elapsed = stream.elapsed
+        self.checksums = stream.checksums
+        self.allocation = stream.allocation
+        self.started = stream.started
+
+        self.complete_file(stream.filepath, stream=stream.index)
+
     def run(self):
         """Overridden from StorageObject and multiprocessing.Process
 
@@ -153,20 +1021,113 @@ class StorageConsumer(StorageObject):
 
         self.send_start_message()
 
+        if self.write_pattern == 'random':
+            self.run_random()
+            return
+
+        if self.streams > 1:
+            self.run_streams()
+            return
+
         file_num = 0
 
         # Stop when we get a KILL message from StorageHeartbeat
         while self.check_heartbeat():
             filename = '{}_{}_file_{}'.format(self.name,self.id, file_num)
-            filepath = os.path.join(self.path, filename)
+            filepath = self.placement.filepath(filename)
 
             StorageConsumer.create_new_file(filepath)
+            self.latency = LatencyHistogram()
+            self.checksums = {}
+            self.started = datetime.now()
+
+            # Allocation is timed on its own so that it isn't part of the
+            # write throughput
+            self.allocation = self.preallocate_file(filepath)
+            # A preallocated file already has its full size, so chunks are
+            # written from its start rather than appended to its end
+            offset = 0 if self.allocation is not None else None
 
-            self.write_file_in_chunks(filepath)
+            file_start = time.time()
+            self.write_file_in_chunks(filepath, offset=offset)
+            self.elapsed = time.time() - file_start
 
-            self.send_rollover_message(filepath)
+            self.complete_file(filepath)
 
             file_num += 1
 
+        self.finish()
+
+    def finish(self):
+        """Stop the helper threads and send the STOP message."""
+        self._close_pool()
+
+        # Let pending deletions finish so that they are reported too
+        if self._reclaimer is not None:
+            self._reclaimer.stop()
+            self.send_reclaim_message()
+
         self.send_stop_message()
 
+    def run_random(self):
+        """The run() task for the 'random' write_pattern.  The file is
+           prepared once and every pass of random writes over it is sent
+           as a rollover."""
+
+        filename = '{}_{}_random'.format(self.name, self.id)
+        filepath = self.placement.filepath(filename)
+
+        self.prepare_random_file(filepath)
+
+        # Stop when we get a KILL message from StorageHeartbeat
+        while self.check_heartbeat():
+            self.latency = LatencyHistogram()
+            self.started = datetime.now()
+
+            pass_start = time.time()
+            size = self.write_file_randomly(filepath)
+            self.elapsed = time.time() - pass_start
+
+            self.send_rollover_message(filepath, size=size)
+
+        self.finish()
+
+    def run_streams(self):
+        """The run() task for a consumer with more than one stream.  The
+           heartbeat is checked between chunks, and after a KILL the open
+           files are completed before stopping."""
+
+        streams = [WriteStream(index=n, weight=weight)
+                   for n, weight in enumerate(self.stream_weights)]
+
+        file_num = 0
+
+        for stream in streams:
+            filename = '{}_{}_file_{}'.format(self.name, self.id, file_num)
+            stream.open(self.placement.filepath(filename))
+            stream.allocation = self.allocate(stream.fd)
+            file_num += 1
+
+        alive = True
+        open_streams = list(streams)
+
+        while open_streams:
+            alive = alive and self.check_heartbeat()
+
+            stream = WriteStream.pick(open_streams)
+            self.write_stream_chunk(stream)
+
+            if stream.offset < self.file_size:
+                continue
+
+            self.complete_stream_file(stream)
+
+            if alive:
+                filename = '{}_{}_file_{}'.format(self.name, self.id, file_num)
+                stream.open(self.placement.filepath(filename))
+                stream.allocation = self.allocate(stream.fd)
+                file_num += 1
+            else:
+                open_streams.remove(stream)
+
+        self.finish()
@@ -0,0 +1,202 @@
+"""Contains the definition for the DataPattern class."""
+
+import os
+import math
+import struct
+import threading
+
+
+class DataPattern(object):
+    """The DataPattern generates write blocks with a target compressibility
+       and a target ratio of duplicate data, as seen by storage that
+       compresses and deduplicates in fixed size units.
+
+       Each unit is a random template followed by zeros, so that the zeros
+       make up the compressible fraction of the unit.  Unique units are
+       stamped with a counter and the consumer id, which makes them differ
+       from every other unit.  Duplicate units are copies of a single
+       precomputed unit.
+
+       Blocks are built from a precomputed base block.  The stamps of a
+       block are packed together and written as one strided slice per stamp
+       byte, and only the duplicate units are copied in one at a time, so a
+       new block costs a copy rather than any per-unit or per-byte work.
+    """
+
+    # (bytes) Granularity that compression and dedupe are measured at
+    UNIT_SIZE = 4096
+    # Number of different random templates that units cycle through, so
+    # that compressors with a large window don't find repeats in
+    # neighbouring units
+    TEMPLATES = 64
+
+    STAMP = struct.Struct('<QQ')
+
+    def __init__(self, id=0, compressibility=0.0, dedupe=0.0,
+                 unit_size=UNIT_SIZE):
+        """Initializes a DataPattern with:
+
+            Args:
+                id: Stamped into unique units so that consumers don't write
+                    duplicates of each other's data.
+                compressibility: Fraction (0-1) of each unit that compresses
+                    away.
+                dedupe: Fraction (0-1) of units that are duplicates.
+                unit_size: Size (bytes) of the compression and dedupe units.
+        """
+        if not 0.0 <= compressibility <= 1.0:
+            raise ValueError('compressibility must be between 0 and 1')
+        if not 0.0 <= dedupe <= 1.0:
+            raise ValueError('dedupe must be between 0 and 1')
+
+        self.id = id
+        self.compressibility = compressibility
+        self.dedupe = dedupe
+        self.unit_size = max(unit_size, self.STAMP.size)
+
+        # The stamp is incompressible, so it counts towards the random part
+        random_size = max(self.STAMP.size,
+                          int(round(self.unit_size * (1.0 - compressibility))))
+        zeros = '\x00' * (self.unit_size - random_size)
+
+        self.templates = [os.urandom(random_size) + zeros
+                          for _ in xrange(self.TEMPLATES)]
+        self.duplicate = bytearray(os.urandom(random_size) + zeros)
+
+        # Extended as larger blocks are asked for
+        self.base = bytearray()
+
+        # Writer threads reserve a run of counters for each block
+        self.lock = threading.Lock()
+        self.next_unit = 0
+
+    def _extend_base(self, size):
+        if len(self.base) >= size:
+            return
+
+        # Extended as a copy so that other writer threads never see a
+        # partially built base
+        base = bytearray(self.base)
+        while len(base) < size:
+            template = (len(base) // self.unit_size) % self.TEMPLATES
+            base.extend(self.templates[template])
+
+        self.base = base
+
+    def _is_duplicate(self, unit):
+        # Spread the duplicates evenly: a unit is a duplicate whenever the
+        # running total of dedupe crosses a whole number
+        return int((unit + 1) * self.dedupe) > int(unit * self.dedupe)
+
+    def _duplicates(self, first, count):
+        """Find the duplicate units among count units from first, without
+           testing each unit in turn.
+
+            Args:
+                first: The number of the first unit.
+                count: The number of units.
+
+            Returns:
+                A list of the duplicate unit numbers.
+        """
+        if not self.dedupe:
+            return []
+
+        duplicates = []
+        # The running total first reaches each whole number at a duplicate
+        for total in xrange(int(first * self.dedupe) + 1,
+                            int((first + count) * self.dedupe) + 1):
+            unit = int(math.ceil(total / self.dedupe)) - 1
+            # Rounding can land one unit either side of the crossing
+            if int(unit * self.dedupe) >= total:
+                unit -= 1
+            elif int((unit + 1) * self.dedupe) < total:
+                unit += 1
+            duplicates.append(unit)
+
+        return duplicates
+
+    def _stamp(self, data, start, count):
+        """Stamp count units of data, the first at start, with the next
+           counters and the id.
+
+            Args:
+                data: The bytearray being built.
+                start: The offset in data of the first unit.
+                count: The number of units that start in data.
+        """
+        with self.lock:
+            first = self.next_unit
+            self.next_unit += count
+
+        # The counter comes first so that a stamp cut off by the end of the
+        # block still makes the unit unique
+        stamps = (struct.pack('<{}Q'.format(count), *xrange(first, first + count)),
+                  self.STAMP.pack(0, self.id)[8:] * count)
+
+        size = len(data)
+        for byte in xrange(self.STAMP.size):
+            column = stamps[byte // 8][byte % 8::8]
+            length = len(xrange(start + byte, size, self.unit_size))
+            data[start + byte:size:self.unit_size] = column[:length]
+
+    def block(self, size, offset=0):
+        """Generate a new block of data.
+
+           Units are aligned to offsets in the file rather than to the start
+           of the block, as storage sees them.  A unit split across two
+           blocks gets the same template and the same duplicate decision in
+           both, because they depend only on the unit's position.
+
+            Args:
+                size: The size (bytes) of the block.
+                offset: The offset in the file that the block is written at.
+
+            Returns:
+                A bytearray of size bytes.
+        """
+        unit_size = self.unit_size
+        cycle = unit_size * self.TEMPLATES
+
+        # The base repeats every cycle, so any offset maps into its start
+        start = offset % cycle
+        self._extend_base(cycle + size)
+        data = self.base[start:start + size]
+
+        # The end of a unit that began in an earlier block
+        head = -offset % unit_size
+        if head and self._is_duplicate(offset // unit_size):
+            length = min(head, size)
+            data[:length] = self.duplicate[unit_size - head:unit_size - head + length]
+
+        count = len(xrange(head, size, unit_size))
+        if not count:
+            return data
+
+        self._stamp(data, head, count)
+
+        # Duplicates overwrite their stamps
+        first = (offset + head) // unit_size
+        for unit in self._duplicates(first, count):
+            position = head + (unit - first) * unit_size
+            length = min(unit_size, size - position)
+            if length == unit_size:
+                data[position:position + length] = self.duplicate
+            else:
+                data[position:position + length] = self.duplicate[:length]
+
+        return data
+
+    def __repr__(self):
+        """Provides a repr() implementation for DataPattern.
+
+            Returns:
+                A repr string for DataPattern.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'id={}, '.format(self.id)
+        repr_string += 'compressibility={}, '.format(self.compressibility)
+        repr_string += 'dedupe={}, '.format(self.dedupe)
+        repr_string += 'unit_size={}'.format(self.unit_size)
+        repr_string += ')'
+        return repr_string
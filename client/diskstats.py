@@ -0,0 +1,179 @@
+"""Contains the definitions for the DeviceStats and DeviceSampler classes."""
+
+import os
+import os.path
+import time
+
+from shared import init_dir_path
+
+
+class DeviceStats(object):
+    """The DeviceStats class is used as a container for the statistics of
+       one block device over one poll period.  A list of them is the
+       Message.payload of DEVICE messages sent to the Heartbeat process.
+    """
+
+    def __init__(self, device, paths, interval, read_iops, write_iops,
+                 read_rate, write_rate, queue_depth, utilization, await_time):
+        """Initializes a DeviceStats with:
+
+            Args:
+                device: The name of the block device (e.g. sda1).
+                paths: The storage paths on the device.
+                interval: The length (s) of the poll period.
+                read_iops: Reads completed per second.
+                write_iops: Writes completed per second.
+                read_rate: Bytes read per second.
+                write_rate: Bytes written per second.
+                queue_depth: The average number of requests in flight.
+                utilization: Percent of the period the device was busy.
+                await_time: The average time (ms) each request took, including
+                    time spent queued.  None if there were no requests.
+        """
+        self.device = device
+        self.paths = paths
+        self.interval = interval
+        self.read_iops = read_iops
+        self.write_iops = write_iops
+        self.read_rate = read_rate
+        self.write_rate = write_rate
+        self.queue_depth = queue_depth
+        self.utilization = utilization
+        self.await_time = await_time
+
+    def __repr__(self):
+        """Provides a repr() implementation for DeviceStats.
+
+            Returns:
+                A repr string for DeviceStats.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'device={}, '.format(self.device)
+        repr_string += 'paths={}, '.format(self.paths)
+        repr_string += 'interval={}, '.format(self.interval)
+        repr_string += 'read_iops={}, '.format(self.read_iops)
+        repr_string += 'write_iops={}, '.format(self.write_iops)
+        repr_string += 'read_rate={}, '.format(self.read_rate)
+        repr_string += 'write_rate={}, '.format(self.write_rate)
+        repr_string += 'queue_depth={}, '.format(self.queue_depth)
+        repr_string += 'utilization={}, '.format(self.utilization)
+        repr_string += 'await_time={}'.format(self.await_time)
+        repr_string += ')'
+        return repr_string
+
+
+class DeviceSampler(object):
+    """The DeviceSampler finds the block devices that the storage paths are
+       on and samples their statistics from /proc/diskstats, which holds
+       the counters of every device, so a single read covers them all.
+
+       A path's device is the one whose major and minor numbers match the
+       st_dev of the path.  Paths on filesystems without a block device,
+       such as tmpfs or overlay, are skipped.
+    """
+
+    SECTOR_SIZE = 512
+
+    # Indices of the /proc/diskstats fields that are used
+    MAJOR = 0
+    MINOR = 1
+    NAME = 2
+    READS = 3
+    SECTORS_READ = 5
+    READ_TIME = 6
+    WRITES = 7
+    SECTORS_WRITTEN = 9
+    WRITE_TIME = 10
+    IO_TIME = 12
+    WEIGHTED_IO_TIME = 13
+
+    def __init__(self, paths, proc='/proc'):
+        """Initializes a DeviceSampler with:
+
+            Args:
+                paths: The storage directory paths.
+                proc: The mount point of the proc filesystem.
+        """
+        self.diskstats = os.path.join(proc, 'diskstats')
+
+        # Storage paths of each (major, minor) device
+        self.devices = {}
+        for path in paths:
+            path = init_dir_path(path)
+            st_dev = os.stat(path).st_dev
+            self.devices.setdefault((os.major(st_dev), os.minor(st_dev)),
+                                    []).append(path)
+
+        # The counters of the previous sample, and when it was taken
+        self.previous = None
+        self.sample_time = None
+
+        # Drop the devices that aren't block devices
+        block_devices = self._read()
+        self.devices = {device: paths for device, paths in self.devices.iteritems()
+                        if device in block_devices}
+
+    @staticmethod
+    def available(proc='/proc'):
+        """Returns True if /proc/diskstats can be read."""
+        return os.path.exists(os.path.join(proc, 'diskstats'))
+
+    def _read(self):
+        """Returns a dict of the split lines of every device in
+           /proc/diskstats, keyed by (major, minor).
+        """
+        counters = {}
+        with open(self.diskstats, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > self.WEIGHTED_IO_TIME:
+                    counters[(int(fields[self.MAJOR]), int(fields[self.MINOR]))] = fields
+
+        return counters
+
+    def sample(self):
+        """Sample the devices and compute their statistics over the time
+           since the previous sample.
+
+            Returns:
+                A list of DeviceStats, one per device.  The first sample
+                only records the counters and returns an empty list.
+
+            Raises:
+                IOError if /proc/diskstats can't be read.
+        """
+        sample_time = time.time()
+        counters = self._read()
+
+        stats = []
+        if self.previous is not None and sample_time > self.sample_time:
+            interval = sample_time - self.sample_time
+
+            for device, paths in sorted(self.devices.iteritems()):
+                if device not in counters or device not in self.previous:
+                    continue
+
+                fields = counters[device]
+                previous = self.previous[device]
+                delta = lambda index: int(fields[index]) - int(previous[index])
+
+                ios = delta(self.READS) + delta(self.WRITES)
+                io_time = delta(self.READ_TIME) + delta(self.WRITE_TIME)
+
+                stats.append(DeviceStats(
+                    device=fields[self.NAME],
+                    paths=paths,
+                    interval=interval,
+                    read_iops=delta(self.READS) / interval,
+                    write_iops=delta(self.WRITES) / interval,
+                    read_rate=delta(self.SECTORS_READ) * self.SECTOR_SIZE / interval,
+                    write_rate=delta(self.SECTORS_WRITTEN) * self.SECTOR_SIZE / interval,
+                    # The times are counted in ms
+                    queue_depth=delta(self.WEIGHTED_IO_TIME) / (interval * 1000),
+                    utilization=min(100.0, delta(self.IO_TIME) / (interval * 10)),
+                    await_time=float(io_time) / ios if ios else None))
+
+        self.previous = counters
+        self.sample_time = sample_time
+
+        return stats
@@ -0,0 +1,119 @@
+"""Contains file I/O helpers used by the storage consumers.
+
+   Python 2 does not expose pwrite(2), posix_fadvise(2) or posix_fallocate(3)
+   in the os module, so the libc implementations are called through ctypes
+   when the os versions are missing.  ctypes releases the GIL for the
+   duration of the call, which lets several threads keep writes in flight
+   against the same descriptor.
+"""
+
+import os
+import ctypes
+import ctypes.util
+
+_libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+_libc.pwrite.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                         ctypes.c_int64]
+_libc.pwrite.restype = ctypes.c_ssize_t
+_libc.posix_fadvise.argtypes = [ctypes.c_int, ctypes.c_int64, ctypes.c_int64,
+                                ctypes.c_int]
+_libc.posix_fadvise.restype = ctypes.c_int
+_libc.posix_fallocate.argtypes = [ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+_libc.posix_fallocate.restype = ctypes.c_int
+
+# From <fcntl.h> on Linux
+POSIX_FADV_DONTNEED = getattr(os, 'POSIX_FADV_DONTNEED', 4)
+
+
+def _buffer_address(data):
+    """Returns the address of the first byte of a str or bytearray.
+
+        Args:
+            data: A str or bytearray instance.
+
+        Returns:
+            An integer memory address that stays valid while data is alive.
+    """
+    if isinstance(data, bytearray):
+        return ctypes.addressof((ctypes.c_char * len(data)).from_buffer(data))
+
+    return ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p).value
+
+
+def pwrite(fd, data, offset):
+    """Writes all of data to fd at offset without moving the file position.
+
+        Args:
+            fd: An open file descriptor.
+            data: A str or bytearray to be written.
+            offset: The byte offset in the file to write at.
+
+        Returns:
+            The number of bytes written.
+
+        Raises:
+            OSError if the underlying write fails.
+    """
+    if hasattr(os, 'pwrite'):
+        written = 0
+        view = memoryview(data)
+        while written < len(data):
+            written += os.pwrite(fd, view[written:], offset + written)
+        return written
+
+    address = _buffer_address(data)
+    written = 0
+    while written < len(data):
+        result = _libc.pwrite(fd, address + written, len(data) - written,
+                              offset + written)
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        written += result
+
+    return written
+
+
+def evict_cache(fd):
+    """Flush a file and drop its pages from the page cache so that the
+       next read of it comes from the storage device.
+
+        Args:
+            fd: An open file descriptor.
+
+        Raises:
+            OSError if the file can't be flushed or the advice fails.
+    """
+    # Dirty pages are not dropped, so write them back first
+    os.fsync(fd)
+
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, 0, 0, POSIX_FADV_DONTNEED)
+        return
+
+    # posix_fadvise returns the error number rather than setting errno
+    result = _libc.posix_fadvise(fd, 0, 0, POSIX_FADV_DONTNEED)
+    if result:
+        raise OSError(result, os.strerror(result))
+
+
+def fallocate(fd, offset, length):
+    """Allocate disk space for a byte range of a file so that later writes
+       to it don't need to allocate blocks.
+
+        Args:
+            fd: An open file descriptor.
+            offset: The byte offset that the range starts at.
+            length: The length (bytes) of the range.
+
+        Raises:
+            OSError if the space can't be allocated.
+    """
+    if hasattr(os, 'posix_fallocate'):
+        os.posix_fallocate(fd, offset, length)
+        return
+
+    # posix_fallocate returns the error number rather than setting errno
+    result = _libc.posix_fallocate(fd, offset, length)
+    if result:
+        raise OSError(result, os.strerror(result))
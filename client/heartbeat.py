@@ -1,6 +1,7 @@
 """Contains the definition for the StorageHeartbeat class."""
 
 import time
+import select
 import cPickle as pickle
 from socket import error as SocketError
 from datetime import datetime
@@ -8,6 +9,37 @@ from threading import Thread, Event
 from Queue import Empty
 
 from shared import Message, configure_logging
+from liveness import LivenessPayload
+
+
+def wait(connections, timeout):
+    """Block until at least one of the connections has data to read, like
+       Python 3's multiprocessing.connection.wait.
+
+       poll() is used where the platform has it, as select() can't watch
+       file descriptors numbered above FD_SETSIZE.
+
+        Args:
+            connections: A list of multiprocessing Connection objects.
+            timeout: The longest time (s) to wait.
+
+        Returns:
+            The list of connections that are ready to be read, which is
+            empty if the timeout passed.  A closed connection is ready, and
+            raises EOFError when it is read.
+    """
+    if hasattr(select, 'poll'):
+        poller = select.poll()
+        connection_fds = {}
+        for connection in connections:
+            connection_fds[connection.fileno()] = connection
+            poller.register(connection.fileno(), select.POLLIN)
+
+        # poll() takes milliseconds
+        return [connection_fds[fd] for fd, _ in poller.poll(timeout * 1000)]
+
+    ready, _, _ = select.select(connections, [], [], timeout)
+    return ready
 
 
 class StorageHeartbeat(object):
@@ -22,6 +54,10 @@ class StorageHeartbeat(object):
        All status tasks received on the queue are pickled and sent to the server
        over a socket.  HEARTBEAT and KILL responses are aggregated, pickled,
        and sent to the server over the same socket.
+
+       Given a LivenessBoard, HEARTBEAT requests aren't sent.  Instead each
+       child updates its own slot on the board as it makes progress, and the
+       whole board is read in one pass on each poll.
     """
 
     #These constants could optionally be converted to configuration parameters
@@ -34,7 +70,8 @@ class StorageHeartbeat(object):
     HEARTBEAT_KILL_TIMEOUT = 10
 
     def __init__(self, consumers, monitor, report_in, runtime,
-                 poll_period, client_socket, log_level=None):
+                 poll_period, client_socket, log_level=None, liveness=None,
+                 liveness_timeout=30):
         """Initializes a StorageHeartbeat with:
 
             Args:
@@ -49,6 +86,11 @@ class StorageHeartbeat(object):
                 client_socket: A connected socket to the server.
                 log_level: A string matching the logging level.
                     (e.g. DEBUG, INFO, WARNING)
+                liveness: A LivenessBoard that the children report their
+                    progress on, or None to send HEARTBEAT requests.
+                liveness_timeout: The time (s) a running child may go
+                    without progress on the board before it is reported
+                    missing.
         """
         self.consumers = consumers
         self.monitor = monitor
@@ -58,6 +100,8 @@ class StorageHeartbeat(object):
         self.socket = client_socket
         self.log = configure_logging(log_level, 'Client') \
             if log_level is not None else None
+        self.liveness = liveness
+        self.liveness_timeout = liveness_timeout
 
     def _log_message_received(self, message):
         """A helper method to log a message received from a child process.
@@ -118,34 +162,44 @@ class StorageHeartbeat(object):
                 wait_to_send: And event signal that we wait on before sending
                     the message to the server.
         """
-        #Send the message to the monitor and all consumers
-        self.monitor.pipe.send(message)
-        self._log_message_sent(message, self.monitor.process)
+        processes = [self.monitor] + list(self.consumers)
 
-        for consumer in self.consumers:
-            consumer.pipe.send(message)
-            self._log_message_sent(message, consumer.process)
+        #Send the message to the monitor and all consumers
+        for process in processes:
+            process.pipe.send(message)
+            self._log_message_sent(message, process.process)
 
-        # Poll the monitor and consumers until we get all responses or until
-        # we timeout.
+        # Block on the pipes of the processes that haven't responded yet
+        # until we get all responses or until we timeout.
         responses = []
+        waiting = processes
         response_stop = time.time() + timeout
 
-        while time.time() < response_stop and \
-            len(responses) < len(self.consumers) + 1:
+        while waiting:
+            remaining = response_stop - time.time()
+            if remaining <= 0:
+                break
+
+            ready = wait([process.pipe for process in waiting], remaining)
+
+            done = []
+            for process in waiting:
+                if process.pipe not in ready:
+                    continue
+
+                try:
+                    response = process.pipe.recv()
+                except EOFError:
+                    # The process has closed its end and can't respond
+                    done.append(process)
+                    continue
 
-            if self.monitor.pipe.poll():
-                response = self.monitor.pipe.recv()
                 self._log_message_received(response)
                 if response.type == response_type:
                     responses.append(response)
+                    done.append(process)
 
-            for consumer in self.consumers:
-                if consumer.pipe.poll():
-                    response = consumer.pipe.recv()
-                    self._log_message_received(response)
-                    if response.type == response_type:
-                        responses.append(response)
+            waiting = [process for process in waiting if process not in done]
 
         missing_responses = set([])
         if len(responses) < len(self.consumers) + 1:
@@ -173,6 +227,45 @@ class StorageHeartbeat(object):
         self._send_message_to_server(message)
         self.log.info('Message sent to server: {}'.format(repr(message)))
 
+    def _check_liveness(self):
+        """Read the LivenessBoard and send the children that have made
+           progress recently to the server as HEARTBEAT responses, in the
+           same form as _poll_processes.  Children that have stopped, have
+           stalled for longer than liveness_timeout or haven't started
+           within liveness_timeout of the heartbeat starting are sent as
+           missing responses.
+        """
+        slots = self.liveness.read()
+        now = time.time()
+
+        responses = []
+        missing_responses = set([])
+        for process in [self.monitor] + list(self.consumers):
+            name, id = process.process.name, process.process.id
+            last_time, bytes, state = slots[process.process.liveness_slot]
+
+            if state == 'starting' and now - self.start_time <= self.liveness_timeout:
+                # Still starting up, so not yet due to show progress
+                continue
+
+            if state == 'running' and now - last_time <= self.liveness_timeout:
+                responses.append(Message(name=name,
+                                         id=id,
+                                         date_time=datetime.fromtimestamp(last_time),
+                                         type='HEARTBEAT',
+                                         payload=LivenessPayload(bytes=bytes,
+                                                                 state=state)))
+            else:
+                missing_responses.add((name, id))
+
+        message = Message(name='Heartbeat',
+                          id=0,
+                          date_time=datetime.now(),
+                          type='HEARTBEAT',
+                          payload=(responses, missing_responses))
+        self._send_message_to_server(message)
+        self.log.info('Message sent to server: {}'.format(repr(message)))
+
     def _do_heartbeat(self):
         """Periodically send heartbeat requests to child processes and forward
            results to the server until:
@@ -186,15 +279,18 @@ class StorageHeartbeat(object):
         while time.time() < heartbeat_stop and not self.kill.is_set():
             poll_start_time = time.time()
 
-            message = Message(name='Heartbeat',
-                              id=0,
-                              date_time=None,
-                              type='HEARTBEAT',
-                              payload=None)
+            if self.liveness is not None:
+                self._check_liveness()
+            else:
+                message = Message(name='Heartbeat',
+                                  id=0,
+                                  date_time=None,
+                                  type='HEARTBEAT',
+                                  payload=None)
 
-            self._poll_processes(message=message,
-                                 timeout=self.HEARTBEAT_RESPONSE_TIMEOUT,
-                                 response_type='HEARTBEAT')
+                self._poll_processes(message=message,
+                                     timeout=self.HEARTBEAT_RESPONSE_TIMEOUT,
+                                     response_type='HEARTBEAT')
 
             # Subtract the elapsed time from the poll_period for
             # more accurate heartbeat intervals
@@ -255,6 +351,8 @@ class StorageHeartbeat(object):
 
     def run(self):
         """This is the main entry point for StorageHeartbeat."""
+        self.start_time = time.time()
+
         self.kill = Event() # This signals _process_message_queue to finish up
 
         # Event used to delay sending STOP message to server until all messages
@@ -0,0 +1,93 @@
+"""Contains the definitions for the LivenessBoard class and its payload."""
+
+import time
+import ctypes
+import multiprocessing
+
+
+class LivenessSlot(ctypes.Structure):
+    """The shared memory layout of one process's slot on a LivenessBoard."""
+    _fields_ = [('time', ctypes.c_double),
+                ('bytes', ctypes.c_ulonglong),
+                ('state', ctypes.c_int)]
+
+
+class LivenessPayload(object):
+    """The LivenessPayload class is used as the Message.payload of the
+       HEARTBEAT responses that StorageHeartbeat builds from a LivenessBoard.
+    """
+
+    def __init__(self, bytes, state):
+        """Initializes a LivenessPayload with:
+
+            Args:
+                bytes: The number of bytes the process had moved.
+                state: The state of the process.
+        """
+        self.bytes = bytes
+        self.state = state
+
+    def __repr__(self):
+        """Provides a repr() implementation for LivenessPayload.
+
+            Returns:
+                A repr string for LivenessPayload.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'bytes={}, '.format(self.bytes)
+        repr_string += 'state={}'.format(self.state)
+        repr_string += ')'
+        return repr_string
+
+
+class LivenessBoard(object):
+    """The LivenessBoard is an array in shared memory with a slot for each
+       child process of the client.  Each child updates its own slot with
+       the time it last made progress, the bytes it has moved and its state,
+       and StorageHeartbeat reads every slot in a single copy.
+
+       Each slot has a single writer, so no lock is taken.  A slot read while
+       it is being written may mix the old and new values, which is at most
+       one update out of date.
+    """
+
+    STATES = ('starting', 'running', 'stopped')
+
+    def __init__(self, size):
+        """Initializes a LivenessBoard with:
+
+            Args:
+                size: The number of slots.
+        """
+        self.size = size
+        # Zeroed, so every slot starts in the 'starting' state
+        self.slots = multiprocessing.Array(LivenessSlot, size, lock=False)
+
+    def update(self, slot, bytes=None, state=None):
+        """Record progress in a slot.
+
+            Args:
+                slot: The index of the slot.
+                bytes: The total bytes moved, or None to leave it unchanged.
+                state: One of STATES, or None to leave it unchanged.
+        """
+        entry = self.slots[slot]
+        if bytes is not None:
+            entry.bytes = bytes
+        if state is not None:
+            entry.state = self.STATES.index(state)
+        entry.time = time.time()
+
+    def read(self):
+        """Read every slot in one pass.
+
+            Returns:
+                A list of (time, bytes, state) tuples, one per slot.  The
+                time is the time.time() of the slot's last update, or 0 if
+                it has never been updated.
+        """
+        snapshot = (LivenessSlot * self.size)()
+        ctypes.memmove(snapshot, self.slots, ctypes.sizeof(snapshot))
+
+        return [(entry.time, entry.bytes, self.STATES[entry.state])
+                for entry in snapshot]
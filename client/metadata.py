@@ -0,0 +1,177 @@
+"""Contains the definitions for the MetadataPayload and StorageMetadata
+   classes.
+"""
+
+import os
+import os.path
+import time
+from datetime import datetime
+
+from process import StorageObject
+from shared import Message, LatencyHistogram, init_dir_path
+
+
+class MetadataPayload(object):
+    """The MetadataPayload class is used as a container for the
+       Message.payload of METADATA messages.  It holds the timings of one
+       pass of creating, statting and unlinking a set of small files.
+    """
+
+    def __init__(self, files, dirs, size):
+        """Initializes an empty MetadataPayload with:
+
+            Args:
+                files: The number of files in the pass.
+                dirs: The number of directories the files were spread over.
+                size: The size (bytes) of each file.
+        """
+        self.files = files
+        self.dirs = dirs
+        self.size = size
+        # Keyed by operation name
+        self.latency = {}
+        self.elapsed = {}
+
+    def __repr__(self):
+        """Provides a repr() implementation for MetadataPayload.
+
+            Returns:
+                A repr string for MetadataPayload.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'files={}, '.format(self.files)
+        repr_string += 'dirs={}, '.format(self.dirs)
+        repr_string += 'size={}, '.format(self.size)
+        repr_string += 'latency={}, '.format(repr(self.latency))
+        repr_string += 'elapsed={}'.format(repr(self.elapsed))
+        repr_string += ')'
+        return repr_string
+
+
+class StorageMetadata(StorageObject):
+    """The StorageMetadata repeatedly creates, stats and unlinks a set of
+       small files spread over a fan-out of sub-directories until it is
+       signalled to stop by the StorageHeartbeat instance.
+
+       StorageMetadata inherits from StorageObject, which makes it a
+       multiprocessing process.
+
+       Each pass is sent over the "report" queue as a METADATA message with
+       the latency of every operation and the time spent on each operation
+       type.
+    """
+
+    OPERATIONS = ('create', 'stat', 'unlink')
+
+    def __init__(self, id, heartbeat, report, name=None, path='.',
+                 files=1000, dirs=16, file_size=0):
+        """Initializes a StorageMetadata with:
+
+            Args:
+                id: An integer index for objects that have multiple instances.
+                heartbeat: A Pipe used to communicate with its master process.
+                report: A queue for sending status messages to its master.
+                name: A string name of the process.
+                path: Directory path that the sub-directories are created in.
+                files: Number of files created in each pass.
+                dirs: Number of sub-directories the files are spread over.
+                file_size: Size (KB) of each file.  0 creates empty files.
+        """
+        super(StorageMetadata, self).__init__(id=id,
+                                              heartbeat=heartbeat,
+                                              report=report,
+                                              name=name)
+        # Validate the directory path
+        self.path = init_dir_path(path)
+
+        self.files = max(1, files)
+        self.dirs = max(1, dirs)
+        self.file_size = file_size * 1000
+        self.data = os.urandom(self.file_size)
+
+        self.dirpaths = [os.path.join(self.path, '{}_{}_dir_{}'.format(
+                            self.name, self.id, n)) for n in xrange(self.dirs)]
+        # Consecutive files land in different directories
+        self.filepaths = [os.path.join(self.dirpaths[n % self.dirs],
+                                       'file_{}'.format(n))
+                          for n in xrange(self.files)]
+
+    def create_dirs(self):
+        """Create the sub-directories, reusing any that exist already."""
+        for dirpath in self.dirpaths:
+            if not os.path.isdir(dirpath):
+                os.makedirs(dirpath)
+
+    def remove_dirs(self):
+        """Remove the sub-directories and anything left in them."""
+        for dirpath in self.dirpaths:
+            if not os.path.isdir(dirpath):
+                continue
+
+            for filename in os.listdir(dirpath):
+                os.remove(os.path.join(dirpath, filename))
+            os.rmdir(dirpath)
+
+    def create(self, filepath):
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            if self.data:
+                os.write(fd, self.data)
+        finally:
+            os.close(fd)
+
+    def stat(self, filepath):
+        os.stat(filepath)
+
+    def unlink(self, filepath):
+        os.remove(filepath)
+
+    def run_pass(self):
+        """Run every operation in turn over all of the files.
+
+            Returns:
+                A MetadataPayload with the timings of the pass.
+        """
+        payload = MetadataPayload(files=self.files,
+                                  dirs=self.dirs,
+                                  size=self.file_size)
+
+        for operation in self.OPERATIONS:
+            function = getattr(self, operation)
+            latency = LatencyHistogram()
+
+            start = time.time()
+            for filepath in self.filepaths:
+                op_start = time.time()
+                function(filepath)
+                latency.record(time.time() - op_start)
+                self.progress()
+
+            payload.elapsed[operation] = time.time() - start
+            payload.latency[operation] = latency
+
+        return payload
+
+    def send_metadata_message(self, payload):
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='METADATA',
+                                payload=payload))
+
+    def run(self):
+        """Overridden from StorageObject and multiprocessing.Process
+
+           run() contains the task that will be run in this process."""
+
+        self.send_start_message()
+
+        self.create_dirs()
+
+        # Stop when we get a KILL message from StorageHeartbeat
+        while self.check_heartbeat():
+            self.send_metadata_message(self.run_pass())
+
+        self.remove_dirs()
+
+        self.send_stop_message()
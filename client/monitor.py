@@ -6,8 +6,13 @@ import subprocess
 import re
 import math
 from datetime import datetime
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 from process import StorageObject
+from procfs import ProcSampler
+from diskstats import DeviceSampler
+from ring import SampleRing
 from shared import Message
 
 
@@ -17,21 +22,57 @@ class MonitorData(object):
        Message payload.
     """
 
-    def __init__(self, process):
+    # Roles of monitored processes: the storage workload itself, or the
+    # client processes that drive and report on it
+    ROLES = ('workload', 'client')
+
+    def __init__(self, process, role='workload'):
         """Initializes a MonitorData with:
 
             Args:
                 process: A multiprocessing.Process instance
+                role: 'workload' or 'client'.
         """
         self.id = process.id
         self.pid = process.pid
         self.name = process.name
+        self.role = role
 
         # These will be populated later as the monitor runs
         self.cpu = None
         self.mem = None
         self.etime = None
 
+        # Cumulative I/O and context switch counters, their change per
+        # second since the previous sample, and the resident set size
+        # (bytes).  These stay None where /proc/<pid>/io can't be read.
+        self.counters = None
+        self.rates = None
+        self.rss = None
+        self.sample_time = None
+
+        # SampleSummaries of the high rate samples taken since the previous
+        # poll, keyed by metric, or None if high rate sampling is off
+        self.summaries = None
+
+    def update_io(self, counters, rss, sample_time):
+        """Store a new sample of the I/O counters and compute the rates
+           since the previous sample.
+
+            Args:
+                counters: A dict of cumulative counters.
+                rss: The resident set size (bytes).
+                sample_time: The time.time() that the sample was taken.
+        """
+        if self.counters is not None and sample_time > self.sample_time:
+            interval = sample_time - self.sample_time
+            self.rates = {field: (value - self.counters.get(field, 0)) / interval
+                          for field, value in counters.iteritems()}
+
+        self.counters = counters
+        self.rss = rss
+        self.sample_time = sample_time
+
     def __repr__(self):
         """Provides a repr() implementation for MonitorData.
 
@@ -42,13 +83,99 @@ class MonitorData(object):
         repr_string += 'id={}, '.format(self.id)
         repr_string += 'pid={}, '.format(self.pid)
         repr_string += 'name={}, '.format(self.name)
+        repr_string += 'role={}, '.format(self.role)
         repr_string += 'cpu={}, '.format(self.cpu)
         repr_string += 'mem={}, '.format(self.mem)
-        repr_string += 'etime={}'.format(self.etime)
+        repr_string += 'etime={}, '.format(self.etime)
+        repr_string += 'counters={}, '.format(self.counters)
+        repr_string += 'rates={}, '.format(self.rates)
+        repr_string += 'rss={}, '.format(self.rss)
+        repr_string += 'summaries={}'.format(self.summaries)
+        repr_string += ')'
+        return repr_string
+
+
+class MonitorBatch(object):
+    """MonitorBatch is the Message payload of MONITOR_BATCH messages.  It
+       carries the samples of every process from one poll as a table, one
+       row of plain values per process, so that a single message replaces
+       a MONITOR message per process.
+    """
+
+    COLUMNS = ('id', 'pid', 'name', 'role', 'cpu', 'mem', 'etime',
+               'counters', 'rates', 'rss', 'sample_time', 'summaries')
+
+    # Rows are pickled as plain tuples and only named when they are read
+    Sample = namedtuple('Sample', COLUMNS)
+
+    def __init__(self, processes):
+        """Initializes a MonitorBatch with:
+
+            Args:
+                processes: An iterable of sampled MonitorData objects.
+        """
+        self.rows = [tuple(getattr(process, column) for column in self.COLUMNS)
+                     for process in processes]
+
+    def samples(self):
+        """Returns a list of the rows as Samples, which have the same
+           attributes as MonitorData.
+        """
+        return [self.Sample(*row) for row in self.rows]
+
+    def __repr__(self):
+        """Provides a repr() implementation for MonitorBatch.
+
+            Returns:
+                A repr string for MonitorBatch.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'rows={}'.format(self.rows)
         repr_string += ')'
         return repr_string
 
 
+class SweepOverrun(object):
+    """SweepOverrun is the Message payload of MONITOR_OVERRUN messages,
+       sent when a poll's sweep of the processes doesn't finish within its
+       time budget.
+    """
+
+    def __init__(self, budget, elapsed, sampled, skipped):
+        """Initializes a SweepOverrun with:
+
+            Args:
+                budget: The time budget (s) of the sweep.
+                elapsed: The time (s) the sweep took.
+                sampled: The number of processes that were sampled.
+                skipped: The names of the processes that weren't sampled
+                    before the budget ran out.
+        """
+        self.budget = budget
+        self.elapsed = elapsed
+        self.sampled = sampled
+        self.skipped = skipped
+
+    def __repr__(self):
+        """Provides a repr() implementation for SweepOverrun.
+
+            Returns:
+                A repr string for SweepOverrun.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'budget={}, '.format(self.budget)
+        repr_string += 'elapsed={}, '.format(self.elapsed)
+        repr_string += 'sampled={}, '.format(self.sampled)
+        repr_string += 'skipped={}'.format(self.skipped)
+        repr_string += ')'
+        return repr_string
+
+
+# A process found in the client's process tree, with the attributes of a
+# multiprocessing.Process that MonitorData needs
+TreeProcess = namedtuple('TreeProcess', 'id pid name')
+
+
 class MonitorResponseError(Exception):
     pass
 
@@ -60,13 +187,27 @@ class StorageMonitor(StorageObject):
        StorageMonitor inherits from StorageObject, which makes it a
        multiprocessing process.
 
-       Monitoring events are sent over the "report" queue.
+       Monitoring events are sent over the "report" queue, either as a
+       MONITOR message per process or as one MONITOR_BATCH message per poll.
 
        KILL messages received on the "heartbeat" pipe force the process
-       to stop. These messages are polled once per second.
+       to stop. Between polls the monitor blocks on the pipe, so these
+       messages are answered as soon as they arrive.
+
+       Process status is read from /proc by a ProcSampler, or with the 'ps'
+       command where /proc isn't available.  The /proc sampler also reports
+       each process's I/O counters and their rates.
     """
 
-    def __init__(self, processes, id, heartbeat, report, poll_period, name=None):
+    SAMPLERS = ('proc', 'ps')
+
+    # Metrics sampled at the high sample_rate
+    METRICS = ('cpu', 'read_rate', 'write_rate')
+
+    def __init__(self, processes, id, heartbeat, report, poll_period, name=None,
+                 sampler='proc', batch=False, storage_paths=None,
+                 sample_rate=0, process_tree=False, labels=None, workers=1,
+                 budget=None):
         """Initializes a StorageMonitor with:
 
             Args:
@@ -77,13 +218,68 @@ class StorageMonitor(StorageObject):
                 poll_period: Interval (s) on which StorageMonitor should poll
                     the StorageConsumers for their status information.
                 name: A string name of the process.
+                sampler: 'proc' or 'ps'.  'proc' falls back to 'ps' if /proc
+                    can't be read.
+                batch: Send the samples of each poll as one MONITOR_BATCH
+                    message.
+                storage_paths: The storage paths whose block devices are
+                    sampled, or None.
+                sample_rate: Rate (Hz) to sample the processes between
+                    polls.  0 only samples once per poll.  Needs the 'proc'
+                    sampler.
+                process_tree: Also monitor the rest of the client's process
+                    tree.  Needs the 'proc' sampler.
+                labels: A dict of names for client processes, keyed by pid.
+                    Other processes in the tree are named by their command.
+                workers: Number of threads that sample the processes.
+                    Needs the 'proc' sampler.
+                budget: Time (s) that each sweep of the processes must
+                    finish within.  Defaults to the poll period.
         """
         super(StorageMonitor, self).__init__(id=id,
                                              heartbeat=heartbeat,
                                              report=report,
                                              name=name)
+        if sampler not in self.SAMPLERS:
+            raise ValueError('Unknown monitor sampler {}'.format(sampler))
+
         self.processes = [MonitorData(p) for p in processes]
         self.poll_period = poll_period
+        self.batch = batch
+
+        self.sampler = None
+        if sampler == 'proc' and ProcSampler.available():
+            try:
+                self.sampler = ProcSampler()
+            except (IOError, OSError, ValueError):
+                pass
+
+        self.sample_rate = sample_rate if self.sampler is not None else 0
+
+        # SampleRings of each metric of each process, keyed by pid, and the
+        # (time, ticks, read_bytes, write_bytes) of the last high rate sample
+        self.rings = {}
+        self.last_counters = {}
+        # Enough for one poll period
+        self.ring_capacity = int(math.ceil(self.sample_rate * poll_period)) + 1
+
+        self.process_tree = process_tree and self.sampler is not None
+        self.labels = labels or {}
+
+        # The 'ps' sampler runs a subprocess for each process, and Python 2's
+        # subprocess isn't thread safe, so it samples on a single thread
+        self.workers = max(1, workers) if self.sampler is not None else 1
+        self.budget = budget or poll_period
+        # Threads don't survive the fork into this process, so the pool is
+        # created by run()
+        self._pool = None
+
+        self.devices = None
+        if storage_paths and DeviceSampler.available():
+            try:
+                self.devices = DeviceSampler(storage_paths)
+            except (IOError, OSError, ValueError):
+                pass
 
     def _monitor_error(self, process):
         """Called whenever the monitor incounters an error retrieving the
@@ -117,6 +313,226 @@ class StorageMonitor(StorageObject):
 
         return response_items
 
+    def sample_ps(self, process):
+        """Use 'ps' to gather the cpu, memory, and runtime information
+           of a process.
+
+            Args:
+                process: The MonitorData object of the process.
+
+            Raises:
+                MonitorResponseError if 'ps' fails.
+        """
+        command = ['ps', '-p', str(process.pid), '-o', 'pcpu,pmem,etimes']
+        try:
+            response = subprocess.check_output(command).split(b'\n')
+        except subprocess.CalledProcessError:
+            raise MonitorResponseError
+
+        process.cpu, process.mem, process.etime = self.validate_monitor_response(response)
+
+    def sample(self, process):
+        """Gather the cpu, memory, and runtime information of a process
+           into its MonitorData.
+
+            Args:
+                process: The MonitorData object of the process.
+
+            Raises:
+                MonitorResponseError if the status can't be read.
+        """
+        if self.sampler is None:
+            self.sample_ps(process)
+            return
+
+        try:
+            process.cpu, process.mem, process.etime = self.sampler.sample(process.pid)
+        except (IOError, OSError, ValueError, IndexError):
+            raise MonitorResponseError
+
+        # The I/O counters are optional, so failing to read them isn't an
+        # error
+        try:
+            counters, rss = self.sampler.sample_io(process.pid)
+        except (IOError, OSError, ValueError, IndexError):
+            return
+
+        process.update_io(counters, rss, time.time())
+
+    def _sample_shard(self, processes, deadline):
+        """Sample a shard of the processes in turn until the deadline.
+
+            Args:
+                processes: A list of MonitorData objects.
+                deadline: The time.time() to stop sampling at.
+
+            Returns:
+                A tuple of (sampled, failed, skipped) lists of MonitorData.
+        """
+        sampled = []
+        failed = []
+        for n, process in enumerate(processes):
+            if time.time() >= deadline:
+                return sampled, failed, processes[n:]
+
+            try:
+                self.sample(process)
+                sampled.append(process)
+            except MonitorResponseError:
+                failed.append(process)
+
+        return sampled, failed, []
+
+    def sweep(self, deadline):
+        """Sample every process, sharded across the worker threads.
+
+            Args:
+                deadline: The time.time() that the sweep must finish by.
+
+            Returns:
+                A tuple of (sampled, failed, skipped) lists of MonitorData,
+                each in the order of self.processes.
+        """
+        if self._pool is None:
+            return self._sample_shard(self.processes, deadline)
+
+        shards = [self.processes[n::self.workers] for n in xrange(self.workers)]
+        results = self._pool.map(lambda shard: self._sample_shard(shard, deadline),
+                                 shards)
+
+        sampled, failed, skipped = [], [], []
+        for shard_sampled, shard_failed, shard_skipped in results:
+            sampled.extend(shard_sampled)
+            failed.extend(shard_failed)
+            skipped.extend(shard_skipped)
+
+        order = {id(process): n for n, process in enumerate(self.processes)}
+        key = lambda process: order[id(process)]
+
+        return sorted(sampled, key=key), sorted(failed, key=key), sorted(skipped, key=key)
+
+    def send_overrun_message(self, overrun):
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='MONITOR_OVERRUN',
+                                payload=overrun))
+
+    def _rings(self, pid):
+        """Returns the SampleRings of each metric of a process."""
+        if pid not in self.rings:
+            self.rings[pid] = {metric: SampleRing(self.ring_capacity)
+                               for metric in self.METRICS}
+
+        return self.rings[pid]
+
+    def discover(self):
+        """Update the monitored processes to include the client's whole
+           process tree.  Client processes that have exited are dropped.
+        """
+        # This monitor is a child of the main client process
+        root = os.getppid()
+        labels = {root: 'Heartbeat', os.getpid(): 'Monitor'}
+        labels.update(self.labels)
+
+        tree = self.sampler.process_tree(root)
+        if not tree:
+            return
+
+        pids = set(pid for pid, _ in tree)
+        for process in self.processes:
+            if process.role == 'client' and process.pid not in pids:
+                self.rings.pop(process.pid, None)
+                self.last_counters.pop(process.pid, None)
+
+        self.processes = [process for process in self.processes
+                          if process.role == 'workload' or process.pid in pids]
+
+        known = set(process.pid for process in self.processes)
+        for pid, command in tree:
+            if pid in known:
+                continue
+
+            if pid in labels:
+                process = TreeProcess(id=0, pid=pid, name=labels[pid])
+            else:
+                # Unlabelled processes are told apart by their pid
+                process = TreeProcess(id=pid, pid=pid, name=command)
+
+            self.processes.append(MonitorData(process, role='client'))
+
+    def sample_counters(self):
+        """Take a high rate sample of every process into its SampleRings."""
+        ticks_per_second = float(self.sampler.ticks_per_second)
+
+        for process in self.processes:
+            try:
+                counters = self.sampler.sample_counters(process.pid)
+            except (IOError, OSError, ValueError, IndexError):
+                # Missing samples show in the summary count.  Errors are
+                # reported by the poll itself.
+                continue
+
+            sample_time = time.time()
+            last = self.last_counters.get(process.pid)
+            self.last_counters[process.pid] = (sample_time,) + counters
+
+            if last is None or sample_time <= last[0]:
+                continue
+
+            interval = sample_time - last[0]
+            ticks, read_bytes, write_bytes = counters
+            rings = self._rings(process.pid)
+
+            rings['cpu'].append(sample_time,
+                                100.0 * (ticks - last[1]) / ticks_per_second / interval)
+            rings['read_rate'].append(sample_time, (read_bytes - last[2]) / interval)
+            rings['write_rate'].append(sample_time, (write_bytes - last[3]) / interval)
+
+    def summarize(self, process):
+        """Store the summaries of the high rate samples of a process since
+           the previous poll in its MonitorData, and start new periods.
+
+            Args:
+                process: The MonitorData object of the process.
+        """
+        summaries = {}
+        for metric, ring in self._rings(process.pid).iteritems():
+            summary = ring.summary()
+            if summary is not None:
+                summaries[metric] = summary
+            ring.clear()
+
+        process.summaries = summaries or None
+
+    def _sample_until(self, deadline):
+        """Take high rate samples until the deadline, answering the
+           heartbeat in between.
+
+            Args:
+                deadline: The time.time() to stop sampling at.
+
+            Returns:
+                False if a kill message was received.
+        """
+        interval = 1.0 / self.sample_rate
+        next_sample = time.time()
+
+        while True:
+            now = time.time()
+            if now >= deadline:
+                return True
+
+            if now >= next_sample:
+                self.sample_counters()
+                self.progress()
+
+                # Skip samples that were missed rather than bunching them up
+                next_sample = max(next_sample + interval, now)
+
+            if not self.wait_heartbeat(min(next_sample, deadline)):
+                return False
+
     def send_monitor_message(self, process):
         self.report.put(Message(name=self.name,
                                 id=self.id,
@@ -124,6 +540,34 @@ class StorageMonitor(StorageObject):
                                 type='MONITOR',
                                 payload=process))
 
+    def send_device_message(self, stats):
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='DEVICE',
+                                payload=stats))
+
+    def sample_devices(self):
+        """Sample the block devices and send their statistics."""
+        if self.devices is None or not self.devices.devices:
+            return
+
+        try:
+            stats = self.devices.sample()
+        except (IOError, OSError, ValueError, IndexError):
+            # Device statistics are optional, so this isn't an error
+            return
+
+        if stats:
+            self.send_device_message(stats)
+
+    def send_monitor_batch_message(self, processes):
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='MONITOR_BATCH',
+                                payload=MonitorBatch(processes)))
+
     def run(self):
         """Overridden from StorageObject and multiprocessing.Process
 
@@ -131,53 +575,74 @@ class StorageMonitor(StorageObject):
 
         self.send_start_message()
 
+        if self.workers > 1:
+            self._pool = ThreadPool(self.workers)
+
         # Stop when we get a KILL message from StorageHeartbeat
         while self.check_heartbeat():
             monitor_start = time.time()
 
-            for process in self.processes:
-                # Use 'ps' to gather the cpu, memory, and runtime information
-                command = ['ps', '-p', str(process.pid), '-o', 'pcpu,pmem,etimes']
-                try:
-                    response = subprocess.check_output(command).split(b'\n')
-                except subprocess.CalledProcessError:
-                    self._monitor_error(process)
-                    break
+            if self.sampler is not None:
+                # Every process in this poll is measured over the same interval
+                self.sampler.update()
+
+            if self.process_tree:
+                self.discover()
 
-                try:
-                    process.cpu, process.mem, process.etime = self.validate_monitor_response(response)
-                except MonitorResponseError:
+            sampled, failed, skipped = self.sweep(monitor_start + self.budget)
+            elapsed = time.time() - monitor_start
+
+            for process in failed:
+                # Client processes such as short lived children may exit
+                # before they are sampled
+                if process.role == 'workload':
                     self._monitor_error(process)
-                    break
+
+            if skipped or elapsed > self.budget:
+                self.send_overrun_message(SweepOverrun(budget=self.budget,
+                                                       elapsed=elapsed,
+                                                       sampled=len(sampled),
+                                                       skipped=['{}_{}'.format(p.name, p.id)
+                                                                for p in skipped]))
+
+                # Sample the skipped processes first next time so that
+                # the same ones aren't always left out
+                self.processes = skipped + [p for p in self.processes
+                                            if p not in skipped]
+
+            for process in sampled:
+                if self.sample_rate:
+                    self.summarize(process)
 
                 # Send the status information for this consumer to the
                 # StorageHeartbeat
-                self.send_monitor_message(process)
+                if not self.batch:
+                    self.send_monitor_message(process)
 
-            # Subtract the elapsed time from the poll period for more accurate
-            # monitor polling intervals
-            sleep_time = self.poll_period - (time.time() - monitor_start)
+            if self.batch and sampled:
+                self.send_monitor_batch_message(sampled)
+
+            self.sample_devices()
 
-            if sleep_time > 0:
-                # Check for the heartbeat or kill message before sleeping
-                if not self.check_heartbeat():
-                    break
+            # Each poll is the monitor's progress on the liveness board
+            self.progress()
 
-                # Sleep check the heartbeat in 1 second intervals
-                # First sleep the remaining fraction
-                time.sleep(sleep_time - math.floor(sleep_time))
+            # Wait out the rest of the poll period for more accurate
+            # monitor polling intervals
+            deadline = monitor_start + self.poll_period
 
-                # We need this so that we can break out of the for/range loop
-                # and then break out of the while loop again
-                alive = True
+            if self.sample_rate:
+                # Sample in place of sleeping
+                alive = self._sample_until(deadline)
+            else:
+                alive = self.wait_heartbeat(deadline)
 
-                for _ in range(int(math.floor(sleep_time))):
-                    if not self.check_heartbeat():
-                        alive = False
-                        break
-                    time.sleep(1)
+            if not alive:
+                break
 
-                if not alive:
-                    break
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
 
         self.send_stop_message()
@@ -0,0 +1,110 @@
+"""Contains the definition for the Placement class."""
+
+import os
+import os.path
+import zlib
+import errno
+
+from shared import init_dir_path
+
+
+class Placement(object):
+    """The Placement decides which of the storage paths each new consumer
+       file is written to, and optionally spreads the files over hashed
+       sub-directories of that path.
+
+       'pinned' keeps each consumer on one path, chosen by its id.
+       'round-robin' moves to the next path for every file, starting from a
+       different path for each consumer.  'least-used' picks the path whose
+       filesystem has the largest fraction of free space.
+    """
+
+    POLICIES = ('pinned', 'round-robin', 'least-used')
+
+    def __init__(self, paths, policy='pinned', fanout=0, id=0):
+        """Initializes a Placement with:
+
+            Args:
+                paths: A list of storage directory paths.
+                policy: 'pinned', 'round-robin' or 'least-used'.
+                fanout: Number of hashed sub-directories in each path.
+                    0 writes files directly into the path.
+                id: The id of the consumer the files belong to.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError('Unknown placement policy {}'.format(policy))
+
+        # Validate the directory paths
+        self.paths = [init_dir_path(path) for path in paths]
+        self.policy = policy
+        self.fanout = fanout
+        self.id = id
+
+        self.next = id % len(self.paths)
+
+    @property
+    def pinned(self):
+        """The path that this consumer is pinned to."""
+        return self.paths[self.id % len(self.paths)]
+
+    @staticmethod
+    def free_fraction(path):
+        """Returns the fraction of the filesystem under path that is free."""
+        stat = os.statvfs(path)
+        return float(stat.f_bavail) / stat.f_blocks if stat.f_blocks else 0.0
+
+    def choose(self):
+        """Returns the storage path for the next file."""
+        if self.policy == 'pinned' or len(self.paths) == 1:
+            return self.pinned
+
+        if self.policy == 'round-robin':
+            path = self.paths[self.next]
+            self.next = (self.next + 1) % len(self.paths)
+            return path
+
+        return max(self.paths, key=Placement.free_fraction)
+
+    def subdirectory(self, filename):
+        """Returns the name of the hashed sub-directory for filename."""
+        return '{:02x}'.format((zlib.crc32(filename) & 0xffffffff) % self.fanout)
+
+    def filepath(self, filename):
+        """Place a new file.
+
+            Args:
+                filename: The name of the new file.
+
+            Returns:
+                The path that the file should be written to.
+        """
+        path = self.choose()
+
+        if self.fanout:
+            path = os.path.join(path, self.subdirectory(filename))
+            try:
+                os.mkdir(path)
+            except OSError as e:
+                # Another consumer sharing the path may have made it
+                if e.errno != errno.EEXIST:
+                    raise
+
+        return os.path.join(path, filename)
+
+    def storage(self, filepath):
+        """Returns the storage path that filepath was placed in, or None."""
+        for path in self.paths:
+            if filepath.startswith(os.path.join(path, '')):
+                return path
+
+        return None
+
+    def directories(self):
+        """Generates every existing directory that files may be placed in."""
+        for path in self.paths:
+            yield path
+
+            for n in xrange(self.fanout):
+                directory = os.path.join(path, '{:02x}'.format(n))
+                if os.path.isdir(directory):
+                    yield directory
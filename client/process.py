@@ -1,5 +1,7 @@
 """Contains the definition for the StorageObject class."""
 
+import time
+import threading
 import multiprocessing
 from datetime import datetime
 
@@ -24,8 +26,43 @@ class StorageObject(multiprocessing.Process):
         self.heartbeat = heartbeat
         self.report = report
 
+        # Set by attach_liveness()
+        self.liveness = None
+        self.liveness_slot = None
+        # Total bytes moved, as shown on the liveness board
+        self.progress_bytes = 0
+        self._progress_lock = threading.Lock()
+
+    def attach_liveness(self, board, slot):
+        """Give this process a slot on a LivenessBoard to report its
+           progress on.  Must be called before the process is started.
+
+            Args:
+                board: A LivenessBoard.
+                slot: The index of this process's slot.
+        """
+        self.liveness = board
+        self.liveness_slot = slot
+
+    def progress(self, size=0):
+        """Record progress on the liveness board, if there is one.
+
+            Args:
+                size: The number of bytes moved since the last progress.
+        """
+        if self.liveness is None:
+            return
+
+        # Writer threads may share the process's slot
+        with self._progress_lock:
+            self.progress_bytes += size
+            self.liveness.update(self.liveness_slot, bytes=self.progress_bytes)
+
     def send_start_message(self):
         # Report that this process has started running
+        if self.liveness is not None:
+            self.liveness.update(self.liveness_slot, state='running')
+
         self.report.put(Message(name=self.name,
                                 id=self.id,
                                 date_time=datetime.now(),
@@ -34,6 +71,9 @@ class StorageObject(multiprocessing.Process):
 
     def send_stop_message(self):
         # Report that this process has stopped running
+        if self.liveness is not None:
+            self.liveness.update(self.liveness_slot, state='stopped')
+
         self.heartbeat.send(Message(name=self.name,
                                     id=self.id,
                                     date_time=datetime.now(),
@@ -64,6 +104,28 @@ class StorageObject(multiprocessing.Process):
 
         return True
 
+    def wait_heartbeat(self, deadline):
+        """Sleeps until the deadline, answering any HEARTBEAT messages as
+           soon as they arrive.  The process blocks on the heartbeat pipe
+           rather than polling it, so it only wakes for a message or at the
+           deadline.
+
+            Args:
+                deadline: The time.time() to sleep until.
+
+            Returns:
+                False as soon as a kill message is received, signalling the
+                    process to finish up.
+                True once the deadline is reached.
+        """
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return True
+
+            if self.heartbeat.poll(remaining) and not self.check_heartbeat():
+                return False
+
     def run(self):
         """Abstract run method that must be overridden by a child class."""
         raise NotImplementedError
@@ -0,0 +1,225 @@
+"""Contains the definition for the ProcSampler class."""
+
+import os
+import os.path
+
+
+class ProcSampler(object):
+    """The ProcSampler reads the status of processes directly from /proc
+       rather than running 'ps' for each of them.
+
+       CPU usage is computed from the change in a process's cpu ticks
+       between two samples, relative to the change in the system's ticks
+       from /proc/stat, so it reflects the last poll period rather than
+       the lifetime average that 'ps' reports.  The first sample of a
+       process falls back to its lifetime average.
+
+       Results are formatted like the 'ps' output they replace.
+
+       sample_io() reads the I/O, context switch and RSS counters of a
+       process, which 'ps' has no equivalent for.
+    """
+
+    # Counters read from /proc/<pid>/io
+    IO_FIELDS = ('read_bytes', 'write_bytes', 'syscr', 'syscw',
+                 'cancelled_write_bytes')
+    # Counters read from /proc/<pid>/status, and the names they are kept as
+    STATUS_FIELDS = {'voluntary_ctxt_switches': 'voluntary_switches',
+                     'nonvoluntary_ctxt_switches': 'involuntary_switches'}
+
+    def __init__(self, proc='/proc'):
+        """Initializes a ProcSampler with:
+
+            Args:
+                proc: The mount point of the proc filesystem.
+        """
+        self.proc = proc
+        self.ticks_per_second = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.mem_total = self._read_mem_total()
+
+        # Elapsed ticks of one cpu and uptime (s), set by update()
+        self.cpu_ticks = None
+        self.uptime = None
+
+        # (process ticks, cpu_ticks) of the previous sample of each pid
+        self.previous = {}
+
+    @staticmethod
+    def available(proc='/proc'):
+        """Returns True if the proc filesystem can be read."""
+        return os.path.exists(os.path.join(proc, 'stat'))
+
+    def _read(self, *path):
+        with open(os.path.join(self.proc, *path), 'r') as f:
+            return f.read()
+
+    def _read_mem_total(self):
+        """Returns the total memory (bytes) from /proc/meminfo."""
+        for line in self._read('meminfo').splitlines():
+            if line.startswith('MemTotal:'):
+                # Reported in kB
+                return int(line.split()[1]) * 1024
+
+        raise IOError('MemTotal missing from meminfo')
+
+    def update(self):
+        """Read the system wide cpu ticks and uptime.  Called once before
+           each sweep of samples so that every process in the sweep is
+           measured against the same interval.
+        """
+        cpus = 0
+        total = 0
+        for line in self._read('stat').splitlines():
+            if line.startswith('cpu '):
+                # user nice system idle iowait irq softirq steal.  The guest
+                # times that follow are already counted in user and nice.
+                total = sum(int(value) for value in line.split()[1:9])
+            elif line.startswith('cpu'):
+                cpus += 1
+
+        # Ticks that a single cpu has been through, comparable with the
+        # ticks of a single process
+        self.cpu_ticks = float(total) / max(cpus, 1)
+        self.uptime = float(self._read('uptime').split()[0])
+
+    def sample(self, pid):
+        """Sample the status of a process.
+
+            Args:
+                pid: The process id.
+
+            Returns:
+                A (cpu, mem, etime) tuple of strings in the format of
+                'ps -o pcpu,pmem,etimes'.
+
+            Raises:
+                IOError or OSError if the process can't be read.
+        """
+        if self.cpu_ticks is None:
+            self.update()
+
+        stat = self._read(str(pid), 'stat')
+        # The command name is in parentheses and may contain spaces, so
+        # the fields are counted from the closing parenthesis.  fields[0]
+        # is field 3 (state) in proc(5).
+        fields = stat[stat.rindex(')') + 2:].split()
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        start = int(fields[19])  # starttime, in ticks since boot
+
+        resident = int(self._read(str(pid), 'statm').split()[1])
+
+        previous = self.previous.get(pid)
+        if previous is not None and self.cpu_ticks > previous[1]:
+            cpu = 100.0 * (ticks - previous[0]) / (self.cpu_ticks - previous[1])
+        else:
+            lifetime = self.uptime * self.ticks_per_second - start
+            cpu = 100.0 * ticks / lifetime if lifetime > 0 else 0.0
+        self.previous[pid] = (ticks, self.cpu_ticks)
+
+        mem = 100.0 * resident * self.page_size / self.mem_total
+        etime = max(0, int(self.uptime - float(start) / self.ticks_per_second))
+
+        return '{:.1f}'.format(cpu), '{:.1f}'.format(mem), str(etime)
+
+    def process_tree(self, root):
+        """Find a process and all of its descendants.
+
+           Every process's parent is read from its /proc/<pid>/stat, so this
+           reads a file per process on the system and is meant to be called
+           once per poll rather than at a high rate.
+
+            Args:
+                root: The pid of the process at the top of the tree.
+
+            Returns:
+                A list of (pid, command name) tuples, the root first.
+        """
+        names = {}
+        children = {}
+        for entry in os.listdir(self.proc):
+            if not entry.isdigit():
+                continue
+
+            try:
+                stat = self._read(entry, 'stat')
+            except (IOError, OSError):
+                # The process exited while the tree was read
+                continue
+
+            pid = int(entry)
+            close = stat.rindex(')')
+            names[pid] = stat[stat.index('(') + 1:close]
+            ppid = int(stat[close + 2:].split()[1])
+            children.setdefault(ppid, []).append(pid)
+
+        if root not in names:
+            return []
+
+        tree = []
+        pending = [root]
+        while pending:
+            pid = pending.pop(0)
+            tree.append((pid, names[pid]))
+            pending.extend(sorted(children.get(pid, [])))
+
+        return tree
+
+    def sample_counters(self, pid):
+        """Read just the cumulative cpu ticks and I/O bytes of a process.
+           This is cheap enough to call many times per poll period.
+
+            Args:
+                pid: The process id.
+
+            Returns:
+                A (ticks, read_bytes, write_bytes) tuple.
+
+            Raises:
+                IOError or OSError if the process can't be read.
+        """
+        stat = self._read(str(pid), 'stat')
+        fields = stat[stat.rindex(')') + 2:].split()
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+
+        read_bytes = write_bytes = 0
+        for line in self._read(str(pid), 'io').splitlines():
+            field, _, value = line.partition(':')
+            if field == 'read_bytes':
+                read_bytes = int(value)
+            elif field == 'write_bytes':
+                write_bytes = int(value)
+
+        return ticks, read_bytes, write_bytes
+
+    def sample_io(self, pid):
+        """Sample the I/O counters of a process.
+
+            Args:
+                pid: The process id.
+
+            Returns:
+                A tuple of (counters, rss).  counters is a dict of the
+                cumulative IO_FIELDS and context switch counts, rss is the
+                resident set size (bytes).
+
+            Raises:
+                IOError or OSError if the process can't be read.  Reading
+                /proc/<pid>/io needs the kernel's task I/O accounting.
+        """
+        counters = {}
+        for line in self._read(str(pid), 'io').splitlines():
+            field, _, value = line.partition(':')
+            if field in self.IO_FIELDS:
+                counters[field] = int(value)
+
+        rss = 0
+        for line in self._read(str(pid), 'status').splitlines():
+            field, _, value = line.partition(':')
+            if field in self.STATUS_FIELDS:
+                counters[self.STATUS_FIELDS[field]] = int(value)
+            elif field == 'VmRSS':
+                # Reported in kB
+                rss = int(value.split()[0]) * 1024
+
+        return counters, rss
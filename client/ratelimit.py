@@ -0,0 +1,62 @@
+"""Contains the definition for the TokenBucket class."""
+
+import time
+import multiprocessing
+
+
+class TokenBucket(object):
+    """The TokenBucket paces writes to a target throughput.
+
+       The bucket state lives in shared memory, so a single instance handed
+       to several StorageConsumer processes enforces one combined rate for
+       all of them.  A consumer that takes more tokens than are available
+       goes into debt and sleeps just long enough to repay it, which spreads
+       writes evenly over time rather than bursting and then stalling.
+    """
+
+    # (seconds) Default amount of idle time that may be banked as a burst
+    BURST_SECONDS = 0.1
+
+    def __init__(self, rate, burst=None):
+        """Initializes a TokenBucket with:
+
+            Args:
+                rate: The target throughput in bytes per second.
+                burst: The bucket capacity in bytes.  Defaults to
+                    BURST_SECONDS worth of rate.
+        """
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None \
+            else self.rate * self.BURST_SECONDS
+
+        # [available tokens, time of last refill].  A refill time of 0
+        # means that the bucket has not been used yet and starts full.
+        self._state = multiprocessing.Array('d', [self.burst, 0.0])
+
+    def consume(self, amount):
+        """Take amount tokens from the bucket, sleeping if necessary.
+
+            Args:
+                amount: The number of bytes about to be written.
+
+            Returns:
+                Time (s) spent sleeping to honour the rate.
+        """
+        with self._state.get_lock():
+            now = time.time()
+            tokens, last = self._state[0], self._state[1]
+
+            if last:
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+            tokens -= amount
+            self._state[0] = tokens
+            self._state[1] = now
+
+        # Sleep outside of the lock so other consumers can reserve tokens
+        if tokens < 0:
+            delay = -tokens / self.rate
+            time.sleep(delay)
+            return delay
+
+        return 0.0
@@ -0,0 +1,231 @@
+"""Contains the definition for the StorageReader class."""
+
+import os
+import os.path
+import re
+import time
+import random
+from datetime import datetime
+
+from consumer import StorageConsumer
+from fileio import evict_cache
+from shared import Message, LatencyHistogram
+
+
+class ReadPayload(object):
+    """The ReadPayload class is used as a container for the Message.payload
+       of READ messages sent to the Heartbeat process.
+    """
+
+    def __init__(self, path, size, block, pattern, bytes_read, elapsed,
+                 latency, evicted):
+        """Initializes a ReadPayload with:
+
+            Args:
+                path: The path of the file that was read.
+                size: The file size.
+                block: The size of each read.
+                pattern: 'sequential' or 'random'.
+                bytes_read: The number of bytes read from the file.
+                elapsed: Time (s) spent reading the file.
+                latency: A LatencyHistogram of the individual reads.
+                evicted: True if the file was dropped from the page cache
+                    before it was read.
+        """
+        self.path = path
+        self.size = size
+        self.block = block
+        self.pattern = pattern
+        self.bytes_read = bytes_read
+        self.elapsed = elapsed
+        self.latency = latency
+        self.evicted = evicted
+
+    def __repr__(self):
+        """Provides a repr() implementation for ReadPayload.
+
+            Returns:
+                A repr string for ReadPayload.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'path={}, '.format(self.path)
+        repr_string += 'size={}, '.format(self.size)
+        repr_string += 'block={}, '.format(self.block)
+        repr_string += 'pattern={}, '.format(self.pattern)
+        repr_string += 'bytes_read={}, '.format(self.bytes_read)
+        repr_string += 'elapsed={}, '.format(self.elapsed)
+        repr_string += 'latency={}, '.format(repr(self.latency))
+        repr_string += 'evicted={}'.format(self.evicted)
+        repr_string += ')'
+        return repr_string
+
+
+class StorageReader(StorageConsumer):
+    """The StorageReader repeatedly reads back the files written by the
+       StorageConsumer of the same name and id until it is signalled to
+       stop by the StorageHeartbeat instance.  If there are no such files
+       yet, one file is written before reading starts.
+
+       Files are read in blocks of read_block_size, either front to back
+       or from random block aligned offsets.  Optionally each file is
+       dropped from the page cache first so that reads reach the device.
+
+       Each file read is reported over the "report" queue as a READ message.
+    """
+
+    PATTERNS = ('sequential', 'random')
+
+    def __init__(self, id, chunk_size, file_size, heartbeat, report,
+                 name=None, path='.', pattern='sequential',
+                 read_block_size=1024, evict=False, **kwargs):
+        """Initializes a StorageReader with:
+
+            Args:
+                id: An integer index for objects that have multiple instances.
+                chunk_size: Chunk size (MB) used if files must be written.
+                file_size: File size (MB) used if files must be written.
+                heartbeat: A Pipe used to communicate with its master process.
+                report: A queue for sending status messages to its master.
+                name: A string name of the process.
+                path: Directory path that the files are read from.
+                pattern: 'sequential' or 'random' read offsets.
+                read_block_size: Size (KB) of each read.
+                evict: Drop each file from the page cache before reading it.
+                kwargs: Any other StorageConsumer arguments.
+        """
+        super(StorageReader, self).__init__(id=id,
+                                            chunk_size=chunk_size,
+                                            file_size=file_size,
+                                            heartbeat=heartbeat,
+                                            report=report,
+                                            name=name,
+                                            path=path,
+                                            **kwargs)
+        if pattern not in self.PATTERNS:
+            raise ValueError('Unknown read pattern {}'.format(pattern))
+
+        self.pattern = pattern
+        self.read_block_size = read_block_size * 1000
+        self.evict = evict
+        # Seeded by id so that random runs are repeatable
+        self.random = random.Random(id)
+
+    def find_files(self):
+        """Returns the paths of the previously written files for this
+           name and id, in the order that they were written.
+        """
+        file_re = re.compile(r'^{}_{}_file_(\d+)$'.format(re.escape(self.name),
+                                                           self.id))
+        files = []
+        for directory in self.placement.directories():
+            for filename in os.listdir(directory):
+                match = file_re.match(filename)
+                filepath = os.path.join(directory, filename)
+                if match and os.path.getsize(filepath) > 0:
+                    files.append((int(match.group(1)), filepath))
+
+        return [filepath for _, filepath in sorted(files)]
+
+    def prepare_file(self):
+        """Write a single file to read from when none exist.
+
+            Returns:
+                The path of the written file.
+        """
+        filename = '{}_{}_file_0'.format(self.name, self.id)
+        filepath = self.placement.filepath(filename)
+
+        StorageConsumer.create_new_file(filepath)
+        self.write_file_in_chunks(filepath)
+
+        return filepath
+
+    def read_offsets(self, size):
+        """Returns the offsets of the reads for a file of the given size.
+
+           Random reads make as many block aligned reads as a sequential
+           pass would, so both patterns move the same amount of data.
+
+            Args:
+                size: The file size.
+        """
+        blocks = int((size + self.read_block_size - 1) // self.read_block_size)
+
+        if self.pattern == 'random':
+            return [self.random.randrange(blocks) * self.read_block_size
+                    for _ in xrange(blocks)]
+
+        return xrange(0, size, self.read_block_size)
+
+    def read_file(self, filepath):
+        """Read a file in blocks, timing each read.
+
+            Args:
+                filepath: The path of the file to read.
+
+            Returns:
+                A ReadPayload describing the reads.
+        """
+        size = os.path.getsize(filepath)
+        latency = LatencyHistogram()
+        bytes_read = 0
+        throttled = 0.0
+
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            if self.evict:
+                evict_cache(fd)
+
+            start = time.time()
+            for offset in self.read_offsets(size):
+                throttled += self.throttle(self.read_block_size)
+
+                read_start = time.time()
+                os.lseek(fd, offset, os.SEEK_SET)
+                data = os.read(fd, self.read_block_size)
+                latency.record(time.time() - read_start)
+
+                bytes_read += len(data)
+                self.progress(len(data))
+
+            elapsed = time.time() - start - throttled
+        finally:
+            os.close(fd)
+
+        return ReadPayload(path=filepath,
+                           size=size,
+                           block=self.read_block_size,
+                           pattern=self.pattern,
+                           bytes_read=bytes_read,
+                           elapsed=elapsed,
+                           latency=latency,
+                           evicted=self.evict)
+
+    def send_read_message(self, payload):
+        self.report.put(Message(name=self.name,
+                                id=self.id,
+                                date_time=datetime.now(),
+                                type='READ',
+                                payload=payload))
+
+    def run(self):
+        """Overridden from StorageConsumer and multiprocessing.Process
+
+           run() contains the task that will be run in this process."""
+
+        self.send_start_message()
+
+        filepaths = self.find_files() or [self.prepare_file()]
+        self._close_pool()
+
+        file_num = 0
+
+        # Stop when we get a KILL message from StorageHeartbeat
+        while self.check_heartbeat():
+            filepath = filepaths[file_num % len(filepaths)]
+
+            self.send_read_message(self.read_file(filepath))
+
+            file_num += 1
+
+        self.finish()
@@ -0,0 +1,93 @@
+"""Contains the definitions for the ReclaimPayload and FileReclaimer classes."""
+
+import os
+import time
+from threading import Thread, Lock
+from Queue import Queue
+
+from shared import LatencyHistogram
+
+
+class ReclaimPayload(object):
+    """The ReclaimPayload class is used as a container for the
+       Message.payload of RECLAIM messages.  It summarizes the files
+       deleted by a FileReclaimer since the previous RECLAIM message.
+    """
+
+    def __init__(self):
+        """Initializes an empty ReclaimPayload."""
+        self.files = 0
+        self.size = 0
+        self.latency = LatencyHistogram()
+
+    def __repr__(self):
+        """Provides a repr() implementation for ReclaimPayload.
+
+            Returns:
+                A repr string for ReclaimPayload.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'files={}, '.format(self.files)
+        repr_string += 'size={}, '.format(self.size)
+        repr_string += 'latency={}'.format(repr(self.latency))
+        repr_string += ')'
+        return repr_string
+
+
+class FileReclaimer(Thread):
+    """The FileReclaimer deletes files on a background thread so that the
+       time taken to unlink large files does not stall the thread writing
+       new ones.  Each unlink is timed and accumulated until collected.
+    """
+
+    def __init__(self):
+        """Initializes a FileReclaimer with an empty work queue."""
+        super(FileReclaimer, self).__init__()
+        self.daemon = True
+        self.queue = Queue()
+        self.lock = Lock()
+        self.payload = ReclaimPayload()
+
+    def reclaim(self, filepath, size):
+        """Queue a file for deletion.
+
+            Args:
+                filepath: The path of the file to delete.
+                size: The size (bytes) of the file.
+        """
+        self.queue.put((filepath, size))
+
+    def collect(self):
+        """Returns the ReclaimPayload of the files deleted since the last
+           call and starts a new one.
+        """
+        with self.lock:
+            payload, self.payload = self.payload, ReclaimPayload()
+
+        return payload
+
+    def stop(self):
+        """Finish deleting all queued files and stop the thread."""
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        """Delete queued files until stop() is called."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            filepath, size = item
+
+            start = time.time()
+            try:
+                os.remove(filepath)
+            except OSError:
+                continue  # Already gone.  Nothing was reclaimed.
+            elapsed = time.time() - start
+
+            with self.lock:
+                self.payload.files += 1
+                self.payload.size += size
+                self.payload.latency.record(elapsed)
@@ -0,0 +1,107 @@
+"""Contains the definitions for the SampleRing and SampleSummary classes."""
+
+import math
+
+
+class SampleSummary(object):
+    """The SampleSummary class is a container for the statistics of the
+       samples taken over one poll period.  It is designed to be pickled
+       and sent in place of the samples themselves.
+    """
+
+    def __init__(self, count, min, mean, max, p99, peak_time):
+        """Initializes a SampleSummary with:
+
+            Args:
+                count: The number of samples.
+                min: The smallest sample.
+                mean: The mean of the samples.
+                max: The largest sample.
+                p99: The 99th percentile sample.
+                peak_time: The time.time() of the largest sample.
+        """
+        self.count = count
+        self.min = min
+        self.mean = mean
+        self.max = max
+        self.p99 = p99
+        self.peak_time = peak_time
+
+    def __repr__(self):
+        """Provides a repr() implementation for SampleSummary.
+
+            Returns:
+                A repr string for SampleSummary.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'count={}, '.format(self.count)
+        repr_string += 'min={}, '.format(self.min)
+        repr_string += 'mean={}, '.format(self.mean)
+        repr_string += 'max={}, '.format(self.max)
+        repr_string += 'p99={}, '.format(self.p99)
+        repr_string += 'peak_time={}'.format(self.peak_time)
+        repr_string += ')'
+        return repr_string
+
+
+class SampleRing(object):
+    """The SampleRing is a fixed-size ring buffer of timestamped samples.
+       Once it is full each new sample replaces the oldest, so memory use
+       doesn't grow however long a poll period overruns.
+    """
+
+    def __init__(self, capacity):
+        """Initializes an empty SampleRing with:
+
+            Args:
+                capacity: The number of samples the ring holds.
+        """
+        self.capacity = max(1, capacity)
+        self.times = [0.0] * self.capacity
+        self.values = [0.0] * self.capacity
+        # The slot the next sample goes in, and the number of samples held
+        self.index = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, sample_time, value):
+        """Add a sample, replacing the oldest one if the ring is full.
+
+            Args:
+                sample_time: The time.time() that the sample was taken.
+                value: The sampled value.
+        """
+        self.times[self.index] = sample_time
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def clear(self):
+        self.index = 0
+        self.count = 0
+
+    def summary(self):
+        """Summarize the samples held.
+
+            Returns:
+                A SampleSummary, or None if the ring is empty.
+        """
+        if not self.count:
+            return None
+
+        # The held samples are the count slots before index
+        slots = [(self.index - n - 1) % self.capacity for n in xrange(self.count)]
+        values = sorted(self.values[slot] for slot in slots)
+        peak = max(slots, key=lambda slot: self.values[slot])
+
+        # Nearest rank percentile
+        rank = int(math.ceil(0.99 * len(values))) - 1
+
+        return SampleSummary(count=self.count,
+                             min=values[0],
+                             mean=sum(values) / len(values),
+                             max=values[-1],
+                             p99=values[rank],
+                             peak_time=self.times[peak])
@@ -0,0 +1,93 @@
+"""Contains the definition for the WriteStream class."""
+
+import os
+from datetime import datetime
+
+from shared import LatencyHistogram
+
+
+class WriteStream(object):
+    """The WriteStream class holds the state of one of the files that a
+       multi-stream StorageConsumer keeps open and interleaves its chunk
+       writes across.
+    """
+
+    def __init__(self, index, weight=1):
+        """Initializes a closed WriteStream with:
+
+            Args:
+                index: The position of the stream in its consumer.
+                weight: The relative share of chunk writes the stream gets.
+        """
+        self.index = index
+        self.weight = weight
+        # Smooth weighted round-robin credit
+        self.current = 0
+
+        self.filepath = None
+        self.fd = None
+        self.offset = 0
+        self.latency = None
+        self.checksums = None
+        self.elapsed = 0.0
+        self.allocation = None
+        self.started = None
+
+    def open(self, filepath):
+        """Start a new empty file on this stream.
+
+            Args:
+                filepath: The path of the new file.
+        """
+        self.filepath = filepath
+        self.fd = os.open(filepath,
+                          os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        self.offset = 0
+        self.latency = LatencyHistogram()
+        self.checksums = {}
+        self.elapsed = 0.0
+        self.allocation = None
+        self.started = datetime.now()
+
+    def close(self):
+        os.close(self.fd)
+        self.fd = None
+
+    @staticmethod
+    def pick(streams):
+        """Pick the stream to write the next chunk to.
+
+           Smooth weighted round-robin spreads each stream's share of the
+           writes evenly rather than in bursts, and is plain round-robin
+           when the weights are equal.
+
+            Args:
+                streams: A list of open WriteStreams.
+
+            Returns:
+                The WriteStream to write to.
+        """
+        total = 0
+        best = None
+        for stream in streams:
+            stream.current += stream.weight
+            total += stream.weight
+            if best is None or stream.current > best.current:
+                best = stream
+
+        best.current -= total
+        return best
+
+    def __repr__(self):
+        """Provides a repr() implementation for WriteStream.
+
+            Returns:
+                A repr string for WriteStream.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'index={}, '.format(self.index)
+        repr_string += 'weight={}, '.format(self.weight)
+        repr_string += 'filepath={}, '.format(self.filepath)
+        repr_string += 'offset={}'.format(self.offset)
+        repr_string += ')'
+        return repr_string
@@ -3,10 +3,10 @@
 import os.path
 import math
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import namedtuple
 
-from shared import init_dir_path
+from shared import LatencyHistogram, init_dir_path
 
 
 class Report(object):
@@ -47,8 +47,27 @@ class Report(object):
                 self._report_rollover(file=file,
                                       messages=client.messages.get('ROLLOVER'))
 
+                self._report_verify(file=file,
+                                    messages=client.messages.get('VERIFY'))
+
+                self._report_read(file=file,
+                                  messages=client.messages.get('READ'))
+
+                self._report_metadata(file=file,
+                                      messages=client.messages.get('METADATA'))
+
+                self._report_reclaim(file=file,
+                                     messages=client.messages.get('RECLAIM'))
+
                 self._report_monitor(file=file,
-                                     messages=client.messages.get('MONITOR'))
+                                     messages=client.messages.get('MONITOR'),
+                                     batches=client.messages.get('MONITOR_BATCH'))
+
+                self._report_overrun(file=file,
+                                     messages=client.messages.get('MONITOR_OVERRUN'))
+
+                self._report_device(file=file,
+                                    messages=client.messages.get('DEVICE'))
 
                 file.write('\n')
 
@@ -156,7 +175,12 @@ class Report(object):
         for message in messages:
             for child_process in message.payload[0]:
                 process = self.ID(name=child_process.name, id=child_process.id)
-                heartbeat_messages.setdefault(process, []).append(child_process.date_time)
+                heartbeat = child_process.date_time
+                # Heartbeats read from a liveness board carry the progress
+                if child_process.payload is not None:
+                    heartbeat = '{} ({} bytes)'.format(heartbeat,
+                                                       child_process.payload.bytes)
+                heartbeat_messages.setdefault(process, []).append(heartbeat)
 
             # Append error string for missing heartbeat
             for name, id in message.payload[1]:
@@ -181,6 +205,10 @@ class Report(object):
             messages: A list of rollover messages for a particular client.
         """
         MEGABYTE = 1000000
+        # Read workloads don't write files
+        if messages is None:
+            return
+
         # ROLLOVER messages are not aggregated.
         # Group them by child process
         rollover_messages = {}
@@ -189,43 +217,668 @@ class Report(object):
             process = self.ID(name=message.name, id=message.id)
             rollover_messages.setdefault(process, []).append(message)
 
+        # Chunk write latencies are merged across all consumers of the client
+        client_latency = LatencyHistogram()
+        # Consumers run concurrently so their write-time throughputs add up
+        client_write_rate = 0.0
+        client_bytes = 0
+        client_iops = 0.0
+        client_target = None
+        # [files, bytes] keyed by storage path
+        storages = {}
+        # The wall clock span of all of the rollovers
+        first_start = None
+        last_stop = None
+
         file.write('\n')
         file.write('  Rollovers:\n')
         for process, rollovers in rollover_messages.iteritems():
             file.write('    {}_{}:\n'.format(process.name, process.id))
+            process_latency = LatencyHistogram()
+            process_bytes = 0
+            process_elapsed = 0.0
+            # The wall clock span of this process's rollovers
+            process_start = None
+            process_stop = None
+            target = None
+            random_writes = False
+            # [files, bytes, elapsed] keyed by stream index
+            streams = {}
+            allocation = LatencyHistogram()
+            preallocate = None
             for rollover in rollovers:
                 # TODO reformat chunk and file size
-                chunk = math.floor(rollover.payload.chunk / MEGABYTE)
                 size = math.floor(rollover.payload.size / MEGABYTE)
-                file.write('      {}: {}MB chunk/{}MB @ {}\n'.format(rollover.date_time,
-                                                               chunk,
-                                                               size,
-                                                               rollover.payload.path))
+                if rollover.payload.pattern == 'random':
+                    random_writes = True
+                    file.write('      {}: {}KB random writes/{}MB @ {}'.format(
+                        rollover.date_time,
+                        rollover.payload.chunk / 1000,
+                        size,
+                        rollover.payload.path))
+                else:
+                    chunk = math.floor(rollover.payload.chunk / MEGABYTE)
+                    file.write('      {}: {}MB chunk/{}MB @ {}'.format(rollover.date_time,
+                                                                 chunk,
+                                                                 size,
+                                                                 rollover.payload.path))
+                if rollover.payload.stream is not None:
+                    file.write(' (stream {})'.format(rollover.payload.stream))
+                    stream = streams.setdefault(rollover.payload.stream, [0, 0, 0.0])
+                    stream[0] += 1
+                    stream[1] += rollover.payload.size
+                    stream[2] += rollover.payload.elapsed or 0.0
+                if rollover.payload.elapsed:
+                    file.write(' {:.2f}MB/s'.format(
+                        rollover.payload.size / rollover.payload.elapsed / MEGABYTE))
+                    process_bytes += rollover.payload.size
+                    process_elapsed += rollover.payload.elapsed
+                file.write('\n')
 
-    def _report_monitor(self, file, messages):
-        """Generate report text about the monitor messages of the
+                if rollover.payload.latency is not None:
+                    process_latency.merge(rollover.payload.latency)
+
+                if rollover.payload.allocation is not None:
+                    allocation.record(rollover.payload.allocation)
+                    preallocate = rollover.payload.preallocate
+
+                if rollover.payload.storage is not None:
+                    storage = storages.setdefault(rollover.payload.storage, [0, 0])
+                    storage[0] += 1
+                    storage[1] += rollover.payload.size
+
+                if rollover.payload.elapsed:
+                    stop = rollover.date_time
+                    start = rollover.payload.started
+                    if start is None:
+                        start = stop - timedelta(seconds=rollover.payload.elapsed)
+                    process_start = start if process_start is None else min(process_start, start)
+                    process_stop = stop if process_stop is None else max(process_stop, stop)
+
+                target = rollover.payload.target
+                client_target = rollover.payload.client_target
+
+            if allocation.count:
+                file.write('      Allocation ({}): {:.2f}ms mean, {}\n'.format(
+                    preallocate,
+                    allocation.mean() * 1000,
+                    self._format_latency(allocation, 'files')))
+
+            for index, (files, size, elapsed) in sorted(streams.iteritems()):
+                file.write('      Stream {}: {} files'.format(index, files))
+                if elapsed:
+                    file.write(' @ {:.2f}MB/s'.format(size / elapsed / MEGABYTE))
+                file.write('\n')
+
+            if random_writes:
+                file.write('      Write latency: {}\n'.format(
+                    self._format_latency(process_latency, 'writes')))
+            else:
+                file.write('      Chunk latency: {}\n'.format(
+                    self._format_latency(process_latency, 'chunks')))
+            client_latency.merge(process_latency)
+
+            if process_elapsed:
+                # Rate limits hold over wall clock time, including the time
+                # between files, so that is the throughput compared with the
+                # target.  The throughput while writing is shown on its own.
+                span = (process_stop - process_start).total_seconds()
+                if span > 0:
+                    file.write('      Throughput: {}\n'.format(
+                        self._format_rate(process_bytes / span, target)))
+                process_rate = process_bytes / process_elapsed
+                client_write_rate += process_rate
+                client_bytes += process_bytes
+                file.write('      Write-time throughput: {:.2f}MB/s\n'.format(
+                    process_rate / MEGABYTE))
+
+                first_start = process_start if first_start is None \
+                    else min(first_start, process_start)
+                last_stop = process_stop if last_stop is None \
+                    else max(last_stop, process_stop)
+
+                if random_writes:
+                    process_iops = process_latency.count / process_elapsed
+                    client_iops += process_iops
+                    file.write('      IOPS: {:.0f}\n'.format(process_iops))
+
+        if client_iops:
+            file.write('    All consumers write latency: {}\n'.format(
+                self._format_latency(client_latency, 'writes')))
+        else:
+            file.write('    All consumers chunk latency: {}\n'.format(
+                self._format_latency(client_latency, 'chunks')))
+        # The wall clock span of all of the rollovers
+        span = (last_stop - first_start).total_seconds() \
+            if first_start is not None else 0.0
+        if client_bytes and span > 0:
+            file.write('    All consumers throughput: {}\n'.format(
+                self._format_rate(client_bytes / span, client_target)))
+        if client_write_rate:
+            file.write('    All consumers write-time throughput: {:.2f}MB/s\n'.format(
+                client_write_rate / MEGABYTE))
+        if client_iops:
+            file.write('    All consumers IOPS: {:.0f}\n'.format(client_iops))
+
+        # Consumers share paths, so a path's throughput is what was written
+        # to it over the whole span of the rollovers
+        if len(storages) > 1:
+            for path, (files, size) in sorted(storages.iteritems()):
+                file.write('    Storage {}: {} files/{}MB'.format(
+                    path, files, math.floor(size / MEGABYTE)))
+                if span:
+                    file.write(' @ {:.2f}MB/s'.format(size / span / MEGABYTE))
+                file.write('\n')
+
+    def _format_rate(self, rate, target):
+        """Format an achieved throughput against its target for the report.
+
+           Args:
+            rate: The achieved throughput in bytes/s.
+            target: The target throughput in bytes/s or None if unlimited.
+
+           Returns:
+            A string of achieved versus target throughput in MB/s.
+        """
+        MEGABYTE = 1000000
+        rate_string = '{:.2f}MB/s achieved'.format(rate / MEGABYTE)
+
+        if target:
+            rate_string += ' of {:.2f}MB/s target ({:.0f}%)'.format(
+                target / MEGABYTE, 100.0 * rate / target)
+        else:
+            rate_string += ', unlimited'
+
+        return rate_string
+
+    def _report_verify(self, file, messages):
+        """Generate report text about the verify messages of the
            client.
 
            Args:
             file: An open file handle for outputting text to.
-            messages: A list of monitor messages for a particular client.
+            messages: A list of verify messages for a particular client.
         """
-        # MONITOR messages are not aggregated.
+        MEGABYTE = 1000000
+        # VERIFY messages are only sent when verification is enabled
+        if messages is None:
+            return
+
+        # Merge the VERIFY messages of each child process
+        verifies = {}
+
+        for message in messages:
+            process = self.ID(name=message.name, id=message.id)
+            verify = verifies.setdefault(process, {'files': 0,
+                                                   'chunks': 0,
+                                                   'mismatches': 0,
+                                                   'size': 0,
+                                                   'elapsed': 0.0,
+                                                   'failed': []})
+            verify['files'] += 1
+            verify['chunks'] += message.payload.chunks
+            verify['mismatches'] += message.payload.mismatches
+            verify['size'] += message.payload.size
+            verify['elapsed'] += message.payload.elapsed
+            if message.payload.mismatches:
+                verify['failed'].append(message.payload.path)
+
+        client_mismatches = 0
+
+        file.write('\n')
+        file.write('  Verification:\n')
+        for process, verify in verifies.iteritems():
+            file.write('    {}_{}:\n'.format(process.name, process.id))
+            file.write('      {} files/{} chunks verified, {} mismatched'.format(
+                verify['files'],
+                verify['chunks'],
+                verify['mismatches']))
+            if verify['elapsed']:
+                file.write(' @ {:.2f}MB/s'.format(
+                    verify['size'] / verify['elapsed'] / MEGABYTE))
+            file.write('\n')
+
+            for path in verify['failed']:
+                file.write('      Mismatch in {}\n'.format(path))
+
+            client_mismatches += verify['mismatches']
+
+        file.write('    All consumers mismatched chunks: {}\n'.format(
+            client_mismatches))
+
+    def _report_read(self, file, messages):
+        """Generate report text about the read messages of the
+           client.
+
+           Args:
+            file: An open file handle for outputting text to.
+            messages: A list of read messages for a particular client.
+        """
+        MEGABYTE = 1000000
+        # READ messages are only sent by read workloads
+        if messages is None:
+            return
+
+        # READ messages are not aggregated.
         # Group them by child process
-        monitor_messages = {}
+        read_messages = {}
+
+        for message in messages:
+            process = self.ID(name=message.name, id=message.id)
+            read_messages.setdefault(process, []).append(message)
+
+        client_latency = LatencyHistogram()
+        client_rate = 0.0
+
+        file.write('\n')
+        file.write('  Reads:\n')
+        for process, reads in read_messages.iteritems():
+            file.write('    {}_{}:\n'.format(process.name, process.id))
+            process_latency = LatencyHistogram()
+            process_bytes = 0
+            process_elapsed = 0.0
+            for read in reads:
+                payload = read.payload
+                file.write('      {}: {}MB {} {}KB blocks{} @ {}'.format(
+                    read.date_time,
+                    math.floor(payload.bytes_read / MEGABYTE),
+                    payload.pattern,
+                    payload.block / 1000,
+                    ' (evicted)' if payload.evicted else '',
+                    payload.path))
+                if payload.elapsed:
+                    file.write(' {:.2f}MB/s'.format(
+                        payload.bytes_read / payload.elapsed / MEGABYTE))
+                    process_bytes += payload.bytes_read
+                    process_elapsed += payload.elapsed
+                file.write('\n')
+
+                process_latency.merge(payload.latency)
+
+            file.write('      Read latency: {}\n'.format(
+                self._format_latency(process_latency, 'reads')))
+            client_latency.merge(process_latency)
+
+            if process_elapsed:
+                process_rate = process_bytes / process_elapsed
+                client_rate += process_rate
+                file.write('      Throughput: {:.2f}MB/s, {:.0f} reads/s\n'.format(
+                    process_rate / MEGABYTE,
+                    process_latency.count / process_elapsed))
+
+        file.write('    All consumers read latency: {}\n'.format(
+            self._format_latency(client_latency, 'reads')))
+        if client_rate:
+            file.write('    All consumers read throughput: {:.2f}MB/s\n'.format(
+                client_rate / MEGABYTE))
+
+    def _report_metadata(self, file, messages):
+        """Generate report text about the metadata messages of the
+           client.
+
+           Args:
+            file: An open file handle for outputting text to.
+            messages: A list of metadata messages for a particular client.
+        """
+        # METADATA messages are only sent by metadata workloads
+        if messages is None:
+            return
+
+        # Merge the passes of each child process by operation
+        processes = {}
+
+        for message in messages:
+            process = self.ID(name=message.name, id=message.id)
+            operations = processes.setdefault(process, {})
+            for operation, latency in message.payload.latency.iteritems():
+                merged = operations.setdefault(operation,
+                                               {'elapsed': 0.0,
+                                                'latency': LatencyHistogram()})
+                merged['elapsed'] += message.payload.elapsed[operation]
+                merged['latency'].merge(latency)
+
+        # Consumers run concurrently so their operation rates add up
+        client_operations = {}
+
+        file.write('\n')
+        file.write('  Metadata:\n')
+        for process, operations in processes.iteritems():
+            file.write('    {}_{}:\n'.format(process.name, process.id))
+            for operation, merged in sorted(operations.iteritems()):
+                latency = merged['latency']
+                rate = latency.count / merged['elapsed'] if merged['elapsed'] else 0.0
+                file.write('      {}: {:.0f} ops/s, {}\n'.format(
+                    operation, rate, self._format_latency(latency, 'ops')))
+
+                client_operation = client_operations.setdefault(
+                    operation, {'rate': 0.0, 'latency': LatencyHistogram()})
+                client_operation['rate'] += rate
+                client_operation['latency'].merge(latency)
+
+        for operation, client_operation in sorted(client_operations.iteritems()):
+            file.write('    All consumers {}: {:.0f} ops/s, {}\n'.format(
+                operation,
+                client_operation['rate'],
+                self._format_latency(client_operation['latency'], 'ops')))
+
+    def _report_reclaim(self, file, messages):
+        """Generate report text about the reclaim messages of the
+           client.
+
+           Args:
+            file: An open file handle for outputting text to.
+            messages: A list of reclaim messages for a particular client.
+        """
+        MEGABYTE = 1000000
+        # RECLAIM messages are only sent when a retention limit is set
+        if messages is None:
+            return
+
+        # Merge the RECLAIM messages of each child process
+        reclaims = {}
 
         for message in messages:
             process = self.ID(name=message.name, id=message.id)
-            monitor_messages.setdefault(process, []).append(message)
+            reclaim = reclaims.setdefault(process, {'files': 0,
+                                                    'size': 0,
+                                                    'latency': LatencyHistogram()})
+            reclaim['files'] += message.payload.files
+            reclaim['size'] += message.payload.size
+            reclaim['latency'].merge(message.payload.latency)
+
+        file.write('\n')
+        file.write('  Reclaimed Files:\n')
+        for process, reclaim in reclaims.iteritems():
+            file.write('    {}_{}:\n'.format(process.name, process.id))
+            file.write('      {} files/{}MB in {:.3f}s\n'.format(
+                reclaim['files'],
+                math.floor(reclaim['size'] / MEGABYTE),
+                reclaim['latency'].total))
+            file.write('      Unlink latency: {}\n'.format(
+                self._format_latency(reclaim['latency'], 'files')))
+
+    def _format_latency(self, histogram, label):
+        """Format the percentiles of a LatencyHistogram for the report.
+
+           Args:
+            histogram: A LatencyHistogram instance.
+            label: A plural noun for the things that were timed.
+
+           Returns:
+            A string of latency percentiles in milliseconds.
+        """
+        if not histogram.count:
+            return 'no samples'
+
+        percentiles = ['p{} {:.2f}ms'.format(p, histogram.percentile(p) * 1000)
+                       for p in (50, 90, 99)]
+
+        return '{} {}, {}, max {:.2f}ms'.format(histogram.count,
+                                                label,
+                                                ', '.join(percentiles),
+                                                histogram.max * 1000)
+
+    def _report_monitor(self, file, messages, batches=None):
+        """Generate report text about the monitor messages of the
+           client.
+
+           Args:
+            file: An open file handle for outputting text to.
+            messages: A list of monitor messages for a particular client.
+            batches: A list of monitor batch messages for a particular
+                client.
+        """
+        if messages is None and batches is None:
+            return
+
+        # Each MONITOR message holds one sample and each MONITOR_BATCH
+        # message the samples of one poll.  Group the (date_time, sample)
+        # pairs by monitor process.
+        monitor_samples = {}
+
+        for message in messages or []:
+            process = self.ID(name=message.name, id=message.id)
+            monitor_samples.setdefault(process, []).append((message.date_time,
+                                                            message.payload))
+
+        for message in batches or []:
+            process = self.ID(name=message.name, id=message.id)
+            for sample in message.payload.samples():
+                monitor_samples.setdefault(process, []).append((message.date_time,
+                                                                sample))
 
         file.write('\n')
         file.write('  Process Status:\n')
-        for process, monitors in monitor_messages.iteritems():
+        for process, samples in monitor_samples.iteritems():
             file.write('    {}_{}:\n'.format(process.name, process.id))
-            for status in monitors:
-                file.write('      {}: {}_{} '.format(status.date_time,
-                                                     status.payload.name,
-                                                     status.payload.id))
-                file.write('{}% cpu  {}% mem  {}s runtime\n'.format(status.payload.cpu,
-                                                                     status.payload.mem,
-                                                                     status.payload.etime))
+            for date_time, sample in samples:
+                file.write('      {}: {}_{} '.format(date_time,
+                                                     sample.name,
+                                                     sample.id))
+                file.write('{}% cpu  {}% mem  {}s runtime'.format(sample.cpu,
+                                                                  sample.mem,
+                                                                  sample.etime))
+                file.write('{}\n'.format(self._format_io_rates(sample)))
+                self._report_summaries(file=file, sample=sample)
+
+        all_samples = [sample for samples in monitor_samples.itervalues()
+                       for _, sample in samples]
+
+        self._report_roles(file=file, samples=all_samples)
+
+        self._report_device_io(file=file, samples=all_samples)
+
+    def _report_roles(self, file, samples):
+        """Generate report text comparing the cpu used by the workload
+           processes with the cpu used by the client's own processes.
+
+           Args:
+            file: An open file handle for outputting text to.
+            samples: A list of monitor samples for a particular client.
+        """
+        # The cpu samples of each process, grouped by role
+        roles = {}
+        for sample in samples:
+            process = self.ID(name=sample.name, id=sample.id)
+            roles.setdefault(sample.role, {}).setdefault(process, []).append(float(sample.cpu))
+
+        # Only worth comparing once the client's processes are monitored
+        if 'client' not in roles:
+            return
+
+        file.write('\n')
+        file.write('  Process Roles (mean cpu):\n')
+        for role in ('workload', 'client'):
+            processes = roles.get(role, {})
+            means = [(process, sum(cpus) / len(cpus))
+                     for process, cpus in sorted(processes.iteritems())]
+
+            file.write('    {}: {:.1f}% cpu'.format(role, sum(mean for _, mean in means)))
+            if means:
+                file.write(' ({})'.format(', '.join('{}_{} {:.1f}%'.format(process.name,
+                                                                           process.id,
+                                                                           mean)
+                                                    for process, mean in means)))
+            file.write('\n')
+
+    def _format_io_rates(self, payload):
+        """Returns a string of the per second I/O rates of a MonitorData,
+           or an empty string if it has none.
+        """
+        rates = payload.rates
+        if not rates:
+            return ''
+
+        MEGABYTE = 1000000
+        return '  {:.2f}MB/s read  {:.2f}MB/s write  {:.0f}/{:.0f} syscalls/s r/w' \
+               '  {:.0f}/{:.0f} ctx switches/s vol/invol  {:.1f}MB rss'.format(
+                   rates.get('read_bytes', 0) / MEGABYTE,
+                   rates.get('write_bytes', 0) / MEGABYTE,
+                   rates.get('syscr', 0),
+                   rates.get('syscw', 0),
+                   rates.get('voluntary_switches', 0),
+                   rates.get('involuntary_switches', 0),
+                   float(payload.rss) / MEGABYTE)
+
+    def _report_summaries(self, file, sample):
+        """Generate report text about the high rate samples taken in the
+           poll period of a monitor sample.
+
+           Args:
+            file: An open file handle for outputting text to.
+            sample: A MonitorData or MonitorBatch sample.
+        """
+        if not sample.summaries:
+            return
+
+        MEGABYTE = 1000000
+        # (metric, label, scale, unit)
+        metrics = (('cpu', 'cpu', 1, '%'),
+                   ('read_rate', 'read', MEGABYTE, 'MB/s'),
+                   ('write_rate', 'write', MEGABYTE, 'MB/s'))
+
+        for metric, label, scale, unit in metrics:
+            summary = sample.summaries.get(metric)
+            if summary is None:
+                continue
+
+            file.write('        {:5} min/mean/max/p99 {:.2f}/{:.2f}/{:.2f}/{:.2f}{} '
+                       'over {} samples, peak at {}\n'.format(
+                           label,
+                           summary.min / scale,
+                           summary.mean / scale,
+                           summary.max / scale,
+                           summary.p99 / scale,
+                           unit,
+                           summary.count,
+                           datetime.fromtimestamp(summary.peak_time).time()))
+
+    def _report_device_io(self, file, samples):
+        """Generate report text about the I/O that each monitored process
+           made to storage, as counted by the kernel rather than by the
+           process itself.
+
+           Args:
+            file: An open file handle for outputting text to.
+            samples: A list of monitor samples for a particular client, in
+                the order they were taken.
+        """
+        MEGABYTE = 1000000
+
+        # The first and last samples with counters of each process
+        first_last = {}
+        for sample in samples:
+            if sample.counters is None:
+                continue
+
+            process = self.ID(name=sample.name, id=sample.id)
+            first, _ = first_last.get(process, (sample, None))
+            first_last[process] = (first, sample)
+
+        if not first_last:
+            return
+
+        file.write('\n')
+        file.write('  Device I/O:\n')
+        for process in sorted(first_last):
+            first, last = first_last[process]
+            interval = last.sample_time - first.sample_time
+
+            read = last.counters['read_bytes'] - first.counters['read_bytes']
+            written = last.counters['write_bytes'] - first.counters['write_bytes']
+            cancelled = (last.counters['cancelled_write_bytes'] -
+                         first.counters['cancelled_write_bytes'])
+
+            file.write('    {}_{}: {:.2f}MB read, {:.2f}MB written, '
+                       '{:.2f}MB cancelled'.format(process.name,
+                                                   process.id,
+                                                   float(read) / MEGABYTE,
+                                                   float(written) / MEGABYTE,
+                                                   float(cancelled) / MEGABYTE))
+            if interval > 0:
+                file.write(' @ {:.2f}MB/s read, {:.2f}MB/s write over {:.0f}s'.format(
+                    read / interval / MEGABYTE,
+                    written / interval / MEGABYTE,
+                    interval))
+            file.write('\n')
+
+    def _report_overrun(self, file, messages):
+        """Generate report text about the monitor sweeps that overran
+           their time budget.
+
+           Args:
+            file: An open file handle for outputting text to.
+            messages: A list of monitor overrun messages for a particular
+                client.
+        """
+        if messages is None:
+            return
+
+        file.write('\n')
+        file.write('  Monitor Overruns: {}\n'.format(len(messages)))
+        for message in messages:
+            overrun = message.payload
+            file.write('    {}: {}_{} {:.3f}s of {:.3f}s budget, {} sampled, {} skipped'.format(
+                message.date_time,
+                message.name,
+                message.id,
+                overrun.elapsed,
+                overrun.budget,
+                overrun.sampled,
+                len(overrun.skipped)))
+            if overrun.skipped:
+                file.write(' ({})'.format(', '.join(overrun.skipped)))
+            file.write('\n')
+
+    def _report_device(self, file, messages):
+        """Generate report text about the block device statistics of the
+           client.
+
+           Args:
+            file: An open file handle for outputting text to.
+            messages: A list of device messages for a particular client.
+        """
+        if messages is None:
+            return
+
+        MEGABYTE = 1000000
+
+        # Each message holds the statistics of every device for one poll.
+        # Group them by device.
+        devices = {}
+        for message in messages:
+            for stats in message.payload:
+                devices.setdefault(stats.device, []).append((message.date_time, stats))
+
+        file.write('\n')
+        file.write('  Block Devices:\n')
+        for device in sorted(devices):
+            polls = devices[device]
+            file.write('    {} ({}):\n'.format(device, ', '.join(polls[0][1].paths)))
+
+            for date_time, stats in polls:
+                file.write('      {}: {:.0f}/{:.0f} IOPS r/w  {:.2f}/{:.2f}MB/s r/w'
+                           '  qd {:.2f}  {:.1f}% util'.format(date_time,
+                                                               stats.read_iops,
+                                                               stats.write_iops,
+                                                               stats.read_rate / MEGABYTE,
+                                                               stats.write_rate / MEGABYTE,
+                                                               stats.queue_depth,
+                                                               stats.utilization))
+                if stats.await_time is not None:
+                    file.write('  {:.2f}ms await'.format(stats.await_time))
+                file.write('\n')
+
+            # Averages are weighted by the length of each poll
+            interval = sum(stats.interval for _, stats in polls)
+            average = lambda field: sum(getattr(stats, field) * stats.interval
+                                        for _, stats in polls) / interval
+            file.write('      Average: {:.0f}/{:.0f} IOPS r/w  {:.2f}/{:.2f}MB/s r/w'
+                       '  qd {:.2f}  {:.1f}% util, peak {:.1f}% util\n'.format(
+                           average('read_iops'),
+                           average('write_iops'),
+                           average('read_rate') / MEGABYTE,
+                           average('write_rate') / MEGABYTE,
+                           average('queue_depth'),
+                           average('utilization'),
+                           max(stats.utilization for _, stats in polls)))
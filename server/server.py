@@ -173,7 +173,14 @@ class Server(MultiprocessMixin, TCPServer):
                                   'STOP'         : self._handle_stop,
                                   'ROLLOVER'     : self._handle_rollover,
                                   'MONITOR'      : self._handle_monitor,
-                                  'MONITOR_ERROR': self._handle_monitor }
+                                  'MONITOR_BATCH': self._handle_monitor,
+                                  'DEVICE'       : self._handle_device,
+                                  'MONITOR_OVERRUN': self._handle_overrun,
+                                  'MONITOR_ERROR': self._handle_monitor,
+                                  'RECLAIM'      : self._handle_reclaim,
+                                  'READ'         : self._handle_read,
+                                  'METADATA'     : self._handle_metadata,
+                                  'VERIFY'       : self._handle_verify }
 
         self.report = Report(path=report_path,
                              clients=self.clients)
@@ -299,14 +306,159 @@ class Server(MultiprocessMixin, TCPServer):
             Returns:
                 A string with the rollover payload information.
         """
-        return '; {}_{} {}MB/{}MB chunks - {}'.format(message.name,
+        if message.payload.pattern == 'random':
+            rollover_string = '; {}_{} {}MB/{}KB random writes - {}'.format(message.name,
+                                                  message.id,
+                                                  message.payload.size / int(1e6),
+                                                  message.payload.chunk / int(1e3),
+                                                  message.payload.path)
+        else:
+            rollover_string = '; {}_{} {}MB/{}MB chunks - {}'.format(message.name,
                                                   message.id,
                                                   message.payload.size / int(1e6),
                                                   message.payload.chunk / int(1e6),
                                                   message.payload.path)
 
+        if message.payload.stream is not None:
+            rollover_string += ' (stream {})'.format(message.payload.stream)
+
+        if message.payload.allocation is not None:
+            rollover_string += ' ({} {:.2f}ms)'.format(message.payload.preallocate,
+                                                       message.payload.allocation * 1000)
+
+        latency = message.payload.latency
+        if latency is not None and latency.count:
+            rollover_string += ' (chunk p99 {:.2f}ms)'.format(latency.percentile(99) * 1000)
+
+        return rollover_string
+
+    def _handle_read(self, message, client):
+        """Generate a response string for READ Messages.
+
+            Args:
+                message: A Message received from the client.
+                client: A ClientData mapped to client_address
+
+            Returns:
+                A string with the read payload information.
+        """
+        return '; {}_{} read {}MB {} in {:.3f}s - {}'.format(
+            message.name,
+            message.id,
+            message.payload.bytes_read / int(1e6),
+            message.payload.pattern,
+            message.payload.elapsed,
+            message.payload.path)
+
+    def _handle_metadata(self, message, client):
+        """Generate a response string for METADATA Messages.
+
+            Args:
+                message: A Message received from the client.
+                client: A ClientData mapped to client_address
+
+            Returns:
+                A string with the operation rates of the metadata pass.
+        """
+        payload = message.payload
+        rates = ['{} {:.0f}/s'.format(operation, payload.files / elapsed)
+                 for operation, elapsed in sorted(payload.elapsed.iteritems())
+                 if elapsed]
+
+        return '; {}_{} {} files in {} dirs: {}'.format(message.name,
+                                                        message.id,
+                                                        payload.files,
+                                                        payload.dirs,
+                                                        ', '.join(rates))
+
+    def _handle_verify(self, message, client):
+        """Generate a response string for VERIFY Messages.
+
+            Args:
+                message: A Message received from the client.
+                client: A ClientData mapped to client_address
+
+            Returns:
+                A string with the verify payload information.
+        """
+        return '; {}_{} verified {} {} chunks, {} mismatched - {}'.format(
+            message.name,
+            message.id,
+            message.payload.chunks,
+            message.payload.checksum,
+            message.payload.mismatches,
+            message.payload.path)
+
+    def _handle_reclaim(self, message, client):
+        """Generate a response string for RECLAIM Messages.
+
+            Args:
+                message: A Message received from the client.
+                client: A ClientData mapped to client_address
+
+            Returns:
+                A string with the reclaim payload information.
+        """
+        return '; {}_{} reclaimed {} files/{}MB in {:.3f}s'.format(
+            message.name,
+            message.id,
+            message.payload.files,
+            message.payload.size / int(1e6),
+            message.payload.latency.total)
+
+    def _handle_device(self, message, client):
+        """Generate a response string for DEVICE Messages.
+
+            Args:
+                message: A Message received from the client.
+                client: A ClientData mapped to client_address
+
+            Returns:
+                A string with the statistics of each device.
+        """
+        device_string = ''
+        for stats in message.payload:
+            device_string += '; {}_{} device {}: {:.0f}/{:.0f} IOPS r/w, ' \
+                             '{:.2f}/{:.2f}MB/s r/w, qd {:.2f}, util {:.1f}%'.format(
+                                 message.name,
+                                 message.id,
+                                 stats.device,
+                                 stats.read_iops,
+                                 stats.write_iops,
+                                 stats.read_rate / 1e6,
+                                 stats.write_rate / 1e6,
+                                 stats.queue_depth,
+                                 stats.utilization)
+
+            if stats.await_time is not None:
+                device_string += ', await {:.2f}ms'.format(stats.await_time)
+
+        return device_string
+
+    def _handle_overrun(self, message, client):
+        """Generate a response string for MONITOR_OVERRUN Messages.
+
+            Args:
+                message: A Message received from the client.
+                client: A ClientData mapped to client_address
+
+            Returns:
+                A string with the overrun payload information.
+        """
+        overrun_string = '; {}_{} sweep took {:.3f}s of a {:.3f}s budget, {} sampled'.format(
+            message.name,
+            message.id,
+            message.payload.elapsed,
+            message.payload.budget,
+            message.payload.sampled)
+
+        if message.payload.skipped:
+            overrun_string += ', skipped {}'.format(', '.join(message.payload.skipped))
+
+        return overrun_string
+
     def _handle_monitor(self, message, client):
-        """Generate a response string for MONITOR Messages.
+        """Generate a response string for MONITOR and MONITOR_BATCH Messages.
 
             Args:
                 message: A Message received from the client.
@@ -319,16 +471,42 @@ class Server(MultiprocessMixin, TCPServer):
         if message.payload is None:
             return ''
 
-        # Building the string for readability
         monitor_name = '{}_{}'.format(message.name, message.id)
-        child_process = '{}_{}: pid {},'.format(message.payload.name,
-                                                 message.payload.id,
-                                                 message.payload.pid)
-        data = 'mem {}, cpu {}, time {}'.format(message.payload.mem,
-                                                message.payload.cpu,
-                                                message.payload.etime)
-
-        return '; {} monitoring {} {}'.format(monitor_name, child_process, data)
+
+        if message.type == 'MONITOR_BATCH':
+            samples = message.payload.samples()
+        else:
+            samples = [message.payload]
+
+        return ''.join('; {} monitoring {}'.format(monitor_name,
+                                                   self._format_monitor_sample(sample))
+                       for sample in samples)
+
+    def _format_monitor_sample(self, sample):
+        """Returns a string of the status information of one monitored
+           process.
+        """
+        # Building the string for readability
+        child_process = '{}_{}: pid {},'.format(sample.name,
+                                                 sample.id,
+                                                 sample.pid)
+        data = 'mem {}, cpu {}, time {}'.format(sample.mem,
+                                                sample.cpu,
+                                                sample.etime)
+
+        rates = sample.rates
+        if rates:
+            data += ', read {:.2f}MB/s, write {:.2f}MB/s'.format(
+                rates.get('read_bytes', 0) / 1e6,
+                rates.get('write_bytes', 0) / 1e6)
+
+        summaries = sample.summaries
+        if summaries and 'write_rate' in summaries:
+            data += ', peak cpu {:.1f}, peak write {:.2f}MB/s'.format(
+                summaries['cpu'].max,
+                summaries['write_rate'].max / 1e6)
+
+        return '{} {}'.format(child_process, data)
 
     def _are_all_clients_done(self):
         """Iterate through clients to determine if they are all done.
@@ -1,6 +1,8 @@
-__all__ = ['ProcessData', 'Message', 'configure_logging', 'init_dir_path', 'ProcessData']
+__all__ = ['ProcessData', 'Message', 'configure_logging', 'init_dir_path', 'ProcessData',
+           'LatencyHistogram']
 
 from message import Message
 from logging_config import configure_logging
 from path import init_dir_path
 from process import ProcessData
+from histogram import LatencyHistogram
@@ -0,0 +1,143 @@
+"""Contains the shared definition for the LatencyHistogram class."""
+
+
+class LatencyHistogram(object):
+    """The LatencyHistogram accumulates latencies into a fixed number of
+       log-scaled buckets, in the style of an HDR histogram.
+
+       Values are recorded in microseconds.  Each power of two range is split
+       into SUB_BUCKETS linear sub-buckets, so any recorded value is
+       reproduced to within 1/SUB_BUCKETS of its magnitude.  Histograms from
+       different processes can be merged without losing precision, which is
+       what lets the server combine them per consumer and per client.
+    """
+
+    SUB_BUCKET_BITS = 3
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    # 36 octaves of microseconds covers latencies up to ~3 days
+    BUCKET_COUNT = SUB_BUCKETS * 36
+
+    def __init__(self):
+        """Initializes an empty LatencyHistogram."""
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def _bucket_index(cls, value):
+        """Maps a value in microseconds to its bucket index."""
+        if value < cls.SUB_BUCKETS:
+            return value
+
+        exponent = value.bit_length() - 1
+        shift = exponent - cls.SUB_BUCKET_BITS
+        sub_bucket = (value >> shift) & (cls.SUB_BUCKETS - 1)
+        index = (shift + 1) * cls.SUB_BUCKETS + sub_bucket
+
+        return min(index, cls.BUCKET_COUNT - 1)
+
+    @classmethod
+    def _bucket_upper(cls, index):
+        """Returns the exclusive upper bound (microseconds) of a bucket."""
+        if index < cls.SUB_BUCKETS:
+            return index + 1
+
+        shift = index // cls.SUB_BUCKETS - 1
+        sub_bucket = index % cls.SUB_BUCKETS
+
+        return (cls.SUB_BUCKETS + sub_bucket + 1) << shift
+
+    def record(self, seconds):
+        """Record a single latency.
+
+            Args:
+                seconds: The latency in seconds.
+        """
+        value = max(0, int(seconds * 1e6))
+
+        self.counts[self._bucket_index(value)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        """Add the contents of another LatencyHistogram to this one.
+
+            Args:
+                other: A LatencyHistogram instance.
+        """
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+
+        self.count += other.count
+        self.total += other.total
+
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self):
+        """Returns the mean latency in seconds or None if empty."""
+        if not self.count:
+            return None
+
+        return self.total / self.count
+
+    def percentile(self, percent):
+        """Returns the latency (s) at or below which percent of the recorded
+           latencies fall, or None if the histogram is empty.
+
+            Args:
+                percent: A percentile between 0 and 100.
+        """
+        if not self.count:
+            return None
+
+        target = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                # The last bucket also holds every clamped value
+                if index == self.BUCKET_COUNT - 1:
+                    return self.max
+
+                # Report the top of the bucket, but never beyond what was seen
+                return min(self._bucket_upper(index) / 1e6, self.max)
+
+        return self.max
+
+    def __getstate__(self):
+        """Only pickle the non-empty buckets to keep messages compact."""
+        state = self.__dict__.copy()
+        state['counts'] = dict((index, count) for index, count in
+                               enumerate(self.counts) if count)
+        return state
+
+    def __setstate__(self, state):
+        """Restore the full bucket list from the pickled non-empty buckets."""
+        counts = [0] * self.BUCKET_COUNT
+        for index, count in state['counts'].iteritems():
+            counts[index] = count
+
+        self.__dict__.update(state)
+        self.counts = counts
+
+    def __repr__(self):
+        """Provides a repr() implementation for LatencyHistogram.
+
+            Returns:
+                A repr string for LatencyHistogram.
+        """
+        repr_string = '{}('.format(self.__class__.__name__)
+        repr_string += 'count={}, '.format(self.count)
+        repr_string += 'min={}, '.format(self.min)
+        repr_string += 'p50={}, '.format(self.percentile(50))
+        repr_string += 'p99={}, '.format(self.percentile(99))
+        repr_string += 'max={}'.format(self.max)
+        repr_string += ')'
+        return repr_string
@@ -6,10 +6,26 @@
 
 import unittest
 
-from test_heartbeat import TestHeartbeat
+from test_heartbeat import TestHeartbeat, TestWait, TestPollProcesses, \
+    TestCheckLiveness
 from test_consumer import TestConsumer
 from test_monitor import TestMonitor
 from test_storage_object import TestObject
+from test_fileio import TestFileIO
+from test_histogram import TestHistogram
+from test_ratelimit import TestTokenBucket
+from test_calibration import TestCalibration
+from test_reader import TestReader
+from test_report import TestReport
+from test_main import TestMain
+from test_metadata import TestMetadata
+from test_stream import TestWriteStream
+from test_datapattern import TestDataPattern
+from test_placement import TestPlacement
+from test_procfs import TestProcSampler
+from test_diskstats import TestDeviceSampler
+from test_ring import TestSampleRing
+from test_liveness import TestLivenessBoard
 from test_handler import TestHandler
 from test_server import TestServer
 
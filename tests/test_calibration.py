@@ -0,0 +1,64 @@
+""" Contains the unittest class and methods that test the Calibration and
+    CalibrationCache classes.
+"""
+
+import os
+import os.path
+import time
+import shutil
+import unittest
+
+from client.calibration import Calibration, CalibrationCache
+from shared import init_dir_path
+
+
+class TestCalibration(unittest.TestCase):
+    """The TestCalibration contains the unittests that are used for testing
+       the Calibration and CalibrationCache classes.
+    """
+    CHUNK_SIZE = 10000000
+    SAMPLES = [0.5, 0.1, 0.3, 0.2, 0.4, 0.9, 0.6, 0.8, 0.7, 1.0]
+
+    def setUp(self):
+        """ Set up a CalibrationCache in a temporary directory. """
+        self.path = init_dir_path('./temp/')
+        self.dut = CalibrationCache(self.path, ttl=60)
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+
+    def test_statistics(self):
+        """ Test the median and p90 of a Calibration. """
+        calibration = Calibration(self.SAMPLES)
+
+        self.assertAlmostEqual(calibration.median, 0.55)
+        self.assertEqual(calibration.p90, 0.9)
+
+        calibration = Calibration([0.2])
+        self.assertEqual(calibration.median, 0.2)
+        self.assertEqual(calibration.p90, 0.2)
+
+    def test_cache_miss(self):
+        """ Test that an empty cache has no entry. """
+        self.assertIsNone(self.dut.get(self.CHUNK_SIZE))
+
+    def test_cache_hit(self):
+        """ Test that a stored Calibration is returned for its chunk size
+            only.
+        """
+        self.dut.put(self.CHUNK_SIZE, Calibration(self.SAMPLES))
+
+        calibration = self.dut.get(self.CHUNK_SIZE)
+
+        self.assertIsNotNone(calibration)
+        self.assertEqual(calibration.samples, sorted(self.SAMPLES))
+        self.assertIsNone(self.dut.get(2 * self.CHUNK_SIZE))
+
+    def test_cache_expired(self):
+        """ Test that entries older than the ttl are ignored. """
+        self.dut.put(self.CHUNK_SIZE, Calibration(self.SAMPLES,
+                                                  timestamp=time.time() - 120))
+
+        self.assertIsNone(self.dut.get(self.CHUNK_SIZE))
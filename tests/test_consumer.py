@@ -11,8 +11,14 @@ import math
 import shutil
 from Queue import Queue
 
+from mock import MagicMock
+
 from client import StorageConsumer
-from shared import Message
+from client.ratelimit import TokenBucket
+from client.stream import WriteStream
+from client.datapattern import DataPattern
+from client.placement import Placement
+from shared import Message, LatencyHistogram
 from test_storage_object import TestObject
 
 
@@ -70,17 +76,72 @@ class TestConsumer(TestObject):
             rollover a file twice given a set of file size, chunk size
             and runtime parameters.  This test exercises that test.
 
-            NOTE: This unittest is highly unreliable as chunk write
-            speeds are variable.
+            test_runtime validates against the p90 of the cached
+            calibration, so the file time is derived from that same
+            calibration rather than from a separate chunk write.
         """
         # StorageConsumer is setup with 10 chunks per file.
         chunks_per_file = math.ceil(self.FILE_SIZE/self.CHUNK_SIZE)
-        file_time =  chunks_per_file * self.dut.test_chunk_speed(self.filepath)
+        file_time =  chunks_per_file * self.dut.calibrate().p90
 
         self.assertTrue(self.dut.test_runtime(2 * file_time))
 
         self.assertFalse(self.dut.test_runtime(file_time / 2))
 
+    def test_calibrate_cached(self):
+        """ Test that a second calibration of the same path and chunk size
+            is served from the cache without writing any chunks.
+        """
+        calibration = self.dut.calibrate(samples=3, warmup=1)
+        self.assertEqual(len(calibration.samples), 3)
+
+        self.dut.test_chunk_speed = MagicMock()
+        cached = self.dut.calibrate(samples=3, warmup=1)
+
+        self.assertEqual(self.dut.test_chunk_speed.call_count, 0)
+        self.assertEqual(cached.samples, calibration.samples)
+
+    def test_calibrate_key(self):
+        """ Test that a calibration is not reused by a consumer that writes
+            its chunks differently.
+        """
+        self.dut.calibrate(samples=1, warmup=0)
+
+        self.dut.test_chunk_speed = MagicMock(return_value=0.1)
+        self.dut.preallocate = 'fallocate'
+        self.dut.calibrate(samples=1, warmup=0)
+        self.assertEqual(self.dut.test_chunk_speed.call_count, 1)
+
+        self.dut.block = self.dut.block[:self.MEGABYTE]
+        self.dut.calibrate(samples=1, warmup=0)
+        self.assertEqual(self.dut.test_chunk_speed.call_count, 2)
+
+        # Both are now cached
+        self.dut.calibrate(samples=1, warmup=0)
+        self.assertEqual(self.dut.test_chunk_speed.call_count, 2)
+
+    def test_calibrate_paths(self):
+        """ Test that every path files may be placed in is calibrated and
+            that the slowest is used.
+        """
+        paths = ['./temp/fast', './temp/slow']
+        self.dut.placement = Placement(paths=paths, policy='round-robin')
+        self.dut.test_chunk_speed = MagicMock(
+            side_effect=lambda filepath: 0.3 if '/slow/' in filepath else 0.1)
+
+        calibration = self.dut.calibrate(samples=3, warmup=0)
+
+        self.assertEqual(self.dut.test_chunk_speed.call_count, 6)
+        self.assertEqual(calibration.p90, 0.3)
+
+        # A pinned consumer only uses its own path, which is cached
+        self.dut.placement = Placement(paths=paths, policy='pinned')
+        self.dut.test_chunk_speed.reset_mock()
+        calibration = self.dut.calibrate(samples=3, warmup=0)
+
+        self.assertEqual(self.dut.test_chunk_speed.call_count, 0)
+        self.assertEqual(calibration.p90, 0.1)
+
     def test_create_file(self):
         """ Test the create_new_file method. """
         StorageConsumer.create_new_file(self.filepath)
@@ -101,6 +162,48 @@ class TestConsumer(TestObject):
         # The new file should be empty.
         self.assertEqual(os.path.getsize(self.filepath), 0)
 
+    def test_chunk_blocks(self):
+        """ Test the chunk_blocks method.
+            Verify that a chunk is streamed from the reusable block, and that
+            no two 4KB units of the chunk are alike.
+        """
+        blocks = []
+        contents = []
+        for block in self.dut.chunk_blocks():
+            blocks.append(block)
+            contents.append(str(block))
+        data = ''.join(contents)
+
+        self.assertEqual(len(data), self.CHUNK_SIZE * self.MEGABYTE)
+        self.assertLessEqual(len(self.dut.block), StorageConsumer.BLOCK_SIZE)
+
+        # All but a short final block are the same buffer rather than copies
+        for block in blocks[:-1]:
+            self.assertIs(block, blocks[0])
+
+        units = [data[i:i + StorageConsumer.STAMP_SIZE]
+                 for i in xrange(0, len(data), StorageConsumer.STAMP_SIZE)]
+        self.assertEqual(len(set(units)), len(units))
+
+        # Blocks are stamped, so the next chunk differs from this one
+        self.assertNotEqual(''.join(str(block) for block in self.dut.chunk_blocks()), data)
+
+    def test_chunk_blocks_pattern(self):
+        """ Test that chunk blocks come from the DataPattern when one is
+            configured, and that checksums can be taken of them.
+        """
+        self.dut.data_pattern = DataPattern(compressibility=0.5)
+        self.dut.verify = True
+
+        blocks = list(self.dut.chunk_blocks())
+
+        self.assertEqual(sum(len(block) for block in blocks), self.CHUNK_SIZE * self.MEGABYTE)
+        self.assertNotEqual(blocks[0], blocks[1])
+
+        subprocess.call(['touch', self.filepath])
+        self.dut.append_chunk(self.filepath)
+        self.assertEqual(self.dut.verify_file(self.filepath).mismatches, 0)
+
     def test_append_chunk(self):
         """ Test the append_chunk method.
             Verify that the chunk written is the correct size.
@@ -123,8 +226,321 @@ class TestConsumer(TestObject):
 
         self.assertTrue(os.path.exists(self.filepath))
 
+        # Every chunk write should have been timed
+        self.assertEqual(self.dut.latency.count, self.FILE_SIZE / self.CHUNK_SIZE)
+
+        self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
+
+    def test_preallocate(self):
+        """ Test that preallocated files are written from their start
+            and end up the same size as appended files.
+        """
+        for mode in ('fallocate', 'sparse'):
+            self.dut.preallocate = mode
+            self.dut.latency = LatencyHistogram()
+            StorageConsumer.create_new_file(self.filepath)
+
+            allocation = self.dut.preallocate_file(self.filepath)
+
+            self.assertIsNotNone(allocation)
+            self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
+
+            self.dut.write_file_in_chunks(self.filepath, offset=0)
+
+            self.assertEqual(self.dut.latency.count, self.FILE_SIZE / self.CHUNK_SIZE)
+            self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
+
+        self.dut.preallocate = 'none'
+        self.assertIsNone(self.dut.preallocate_file(self.filepath))
+
+    def test_preallocate_write_path(self):
+        """ Test that chunks take the same write path in every preallocate
+            mode, and that chunks written over a preallocated file verify.
+        """
+        self.dut.verify = True
+        append_chunk = self.dut.append_chunk
+
+        for mode in ('none', 'fallocate', 'sparse'):
+            self.dut.preallocate = mode
+            self.dut.checksums = {}
+            self.dut.append_chunk = MagicMock(side_effect=append_chunk)
+            StorageConsumer.create_new_file(self.filepath)
+
+            allocation = self.dut.preallocate_file(self.filepath)
+            self.dut.write_file_in_chunks(self.filepath,
+                                          offset=0 if allocation is not None else None)
+
+            self.assertEqual(self.dut.append_chunk.call_count, self.FILE_SIZE / self.CHUNK_SIZE)
+            self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
+            self.assertEqual(self.dut.verify_file(self.filepath).mismatches, 0)
+
+    def test_write_file_parallel(self):
+        """ Test the write_file_in_chunks method with an iodepth greater
+            than 1.  Verify that the final file size matches the sequential
+            path.
+        """
+        self.dut.iodepth = 4
+        subprocess.call(['touch', self.filepath])
+
+        self.dut.write_file_in_chunks(self.filepath)
+
+        self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
+
+    def test_write_failure_parallel(self):
+        """ Test that when a chunk write fails with an iodepth greater
+            than 1, no other write is made after the file is closed.
+        """
+        self.dut.iodepth = 4
+        subprocess.call(['touch', self.filepath])
+
+        # (offset, fd open before the write, fd open after the write)
+        writes = []
+        def write_chunk_at(fd, offset):
+            is_open = lambda: os.path.exists('/proc/self/fd/{}'.format(fd))
+            before = is_open()
+            if offset == 2 * self.CHUNK_SIZE * self.MEGABYTE:
+                raise OSError('Injected write failure')
+            time.sleep(0.05)
+            writes.append((offset, before, is_open()))
+            return 0.05
+
+        self.dut.write_chunk_at = write_chunk_at
+
+        with self.assertRaises(OSError):
+            self.dut.write_file_in_chunks(self.filepath)
+
+        count = len(writes)
+        time.sleep(0.2)
+
+        # No write carried on or started once the error was raised
+        self.assertEqual(len(writes), count)
+        self.assertLess(count, self.FILE_SIZE / self.CHUNK_SIZE - 1)
+        for offset, before, after in writes:
+            self.assertTrue(before and after)
+
+        # A new pool is used for the next file
+        self.assertIsNone(self.dut._pool)
+
+    def test_random_offsets(self):
+        """ Test the random_offsets method.
+            Verify that a pass writes file_size bytes at block aligned
+            offsets within the span, repeatably for a given seed.
+        """
+        self.dut = StorageConsumer(id=0,
+                                   chunk_size=self.CHUNK_SIZE,
+                                   file_size=1,
+                                   heartbeat=self.hb_slave,
+                                   report=self.queue,
+                                   path='./temp/',
+                                   name=self.NAME,
+                                   write_pattern='random',
+                                   random_block_size=4,
+                                   random_span=2,
+                                   random_seed=5)
+        block = 4 * 1000
+        offsets = list(self.dut.random_offsets())
+
+        self.assertEqual(len(offsets), self.MEGABYTE / block)
+        for offset in offsets:
+            self.assertEqual(offset % block, 0)
+            self.assertLess(offset, 2 * self.MEGABYTE)
+
+        # Offsets reach beyond the first file_size bytes of the span
+        self.assertGreaterEqual(max(offsets), self.MEGABYTE)
+
+        # The same seed and id give the same offsets
+        other = StorageConsumer(id=0,
+                                chunk_size=self.CHUNK_SIZE,
+                                file_size=1,
+                                heartbeat=self.hb_slave,
+                                report=self.queue,
+                                path='./temp/',
+                                write_pattern='random',
+                                random_span=2,
+                                random_seed=5)
+        self.assertEqual(list(other.random_offsets()), offsets)
+
+    def test_write_file_randomly(self):
+        """ Test the write_file_randomly method.
+            Verify that random writes overwrite the prepared file without
+            changing its size.
+        """
+        self.dut.write_pattern = 'random'
+        self.dut.iodepth = 4
+        self.dut.prepare_random_file(self.filepath)
+        self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
+
+        written = self.dut.write_file_randomly(self.filepath)
+
+        self.assertEqual(written, self.FILE_SIZE * self.MEGABYTE)
+        self.assertEqual(self.dut.latency.count, self.FILE_SIZE * self.MEGABYTE / len(self.dut.random_block))
         self.assertEqual(os.path.getsize(self.filepath), self.FILE_SIZE * self.MEGABYTE)
 
+        self.dut.send_rollover_message(self.filepath, size=written)
+        message = self.get_message_from_queue()
+
+        self.assertEqual(message.payload.pattern, 'random')
+        self.assertEqual(message.payload.chunk, len(self.dut.random_block))
+        self.assertEqual(message.payload.size, written)
+
+    def test_streams_iodepth(self):
+        """ Test that an iodepth greater than 1 is rejected with more than
+            one stream, which writes a chunk at a time.
+        """
+        with self.assertRaises(ValueError):
+            StorageConsumer(id=0,
+                            chunk_size=self.CHUNK_SIZE,
+                            file_size=self.FILE_SIZE,
+                            heartbeat=self.hb_slave,
+                            report=self.queue,
+                            path='./temp/',
+                            iodepth=4,
+                            streams=2)
+
+    def test_unknown_write_pattern(self):
+        """ Test that an unknown write pattern is rejected. """
+        with self.assertRaises(ValueError):
+            StorageConsumer(id=0,
+                            chunk_size=self.CHUNK_SIZE,
+                            file_size=self.FILE_SIZE,
+                            heartbeat=self.hb_slave,
+                            report=self.queue,
+                            path='./temp/',
+                            write_pattern='backwards')
+
+    def test_verify(self):
+        """ Test the verify_file method.
+            Verify that chunk checksums recorded while writing match on
+            read back and that a corrupted chunk is detected.
+        """
+        self.dut.verify = True
+        subprocess.call(['touch', self.filepath])
+
+        self.dut.write_file_in_chunks(self.filepath)
+
+        self.assertEqual(len(self.dut.checksums), self.FILE_SIZE / self.CHUNK_SIZE)
+
+        payload = self.dut.verify_file(self.filepath)
+
+        self.assertEqual(payload.chunks, self.FILE_SIZE / self.CHUNK_SIZE)
+        self.assertEqual(payload.size, self.FILE_SIZE * self.MEGABYTE)
+        self.assertEqual(payload.checksum, 'crc32')
+        self.assertEqual(payload.mismatches, 0)
+
+        # Flip a byte in the second chunk
+        with open(self.filepath, 'r+b') as f:
+            f.seek(self.CHUNK_SIZE * self.MEGABYTE + 1)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(chr(ord(byte) ^ 0xff))
+
+        self.assertEqual(self.dut.verify_file(self.filepath).mismatches, 1)
+
+    def test_verify_progress(self):
+        """ Test that reading a file back to verify it records progress
+            for every block read.
+        """
+        self.dut.verify = True
+        subprocess.call(['touch', self.filepath])
+        self.dut.write_file_in_chunks(self.filepath)
+
+        self.dut.progress = MagicMock()
+        self.dut.verify_file(self.filepath)
+
+        self.assertGreaterEqual(self.dut.progress.call_count, self.FILE_SIZE / self.CHUNK_SIZE)
+        self.assertEqual(sum(args[0] for args, _ in self.dut.progress.call_args_list),
+                         self.FILE_SIZE * self.MEGABYTE)
+
+    def test_verify_parallel(self):
+        """ Test that chunks written with an iodepth greater than 1 are
+            checksummed at their own offsets.
+        """
+        self.dut.verify = True
+        self.dut.iodepth = 4
+        self.dut.checksum = StorageConsumer.CHECKSUMS['adler32']
+        subprocess.call(['touch', self.filepath])
+
+        self.dut.write_file_in_chunks(self.filepath)
+
+        self.assertEqual(sorted(self.dut.checksums),
+                         range(0, self.FILE_SIZE * self.MEGABYTE, self.CHUNK_SIZE * self.MEGABYTE))
+        self.assertEqual(self.dut.verify_file(self.filepath).mismatches, 0)
+
+    def test_stream_rollover(self):
+        """ Test that interleaved stream writes fill each stream's file
+            and that each file is reported as a rollover of its stream.
+        """
+        streams = [WriteStream(index=n) for n in xrange(2)]
+        for stream in streams:
+            stream.open(os.path.join(self.dut.path, 'stream{}'.format(stream.index)))
+
+        chunks = self.FILE_SIZE / self.CHUNK_SIZE
+        for _ in xrange(2 * chunks):
+            self.dut.write_stream_chunk(WriteStream.pick(streams))
+
+        for stream in streams:
+            self.assertEqual(stream.offset, self.FILE_SIZE * self.MEGABYTE)
+            self.assertEqual(stream.latency.count, chunks)
+            self.dut.complete_stream_file(stream)
+
+            message = self.get_message_from_queue()
+            self.assertEqual(message.type, 'ROLLOVER')
+            self.assertEqual(message.payload.stream, stream.index)
+            self.assertEqual(message.payload.size, self.FILE_SIZE * self.MEGABYTE)
+            self.assertIs(message.payload.latency, stream.latency)
+
+    def test_rate_limit(self):
+        """ Test that a rate limited consumer writes a file no faster than
+            its target throughput.
+        """
+        self.dut.limiters.append(TokenBucket(self.FILE_SIZE * self.MEGABYTE))
+        subprocess.call(['touch', self.filepath])
+
+        start = time.time()
+        self.dut.write_file_in_chunks(self.filepath)
+        elapsed = time.time() - start
+
+        # One file per second less the burst allowance
+        self.assertGreater(elapsed, 1.0 - TokenBucket.BURST_SECONDS - 0.05)
+
+    def test_retention(self):
+        """ Test the retain_file method.
+            Verify that the oldest files beyond max_files are deleted in
+            the background and reported in a RECLAIM message.
+        """
+        self.dut.max_files = 2
+        filepaths = [os.path.join(self.dut.path, 'tempfile{}'.format(n))
+                     for n in xrange(4)]
+
+        for filepath in filepaths:
+            with open(filepath, 'wb') as f:
+                f.write('abc')
+            self.dut.retain_file(filepath, 3)
+
+        self.dut._reclaimer.stop()
+
+        self.assertFalse(os.path.exists(filepaths[0]))
+        self.assertFalse(os.path.exists(filepaths[1]))
+        self.assertTrue(os.path.exists(filepaths[2]))
+        self.assertTrue(os.path.exists(filepaths[3]))
+
+        self.dut.send_reclaim_message()
+        message = self.get_message_from_queue()
+
+        self.assertEqual(message.type, 'RECLAIM')
+        self.assertEqual(message.payload.files, 2)
+        self.assertEqual(message.payload.size, 6)
+        self.assertEqual(message.payload.latency.count, 2)
+
+    def test_retention_size(self):
+        """ Test that max_size never deletes the most recent file. """
+        self.dut.max_size = 1
+
+        self.dut.retain_file(self.filepath, 10)
+
+        self.assertEqual(len(self.dut.retained), 1)
+        self.assertIsNone(self.dut._reclaimer)
+
     def test_rollover_message(self):
         """ Test the send_rollover_message method.
             Verify that the created method is placed in the queue for
@@ -148,6 +564,23 @@ class TestConsumer(TestObject):
         self.assertEqual(message.payload.path, self.filepath)
         self.assertEqual(message.payload.size, 3)
         self.assertEqual(message.payload.chunk, self.CHUNK_SIZE * self.MEGABYTE)
+        self.assertIsInstance(message.payload.latency, LatencyHistogram)
+
+    def test_rollover_storage(self):
+        """ Test that rollovers name the storage path the file was
+            placed in.
+        """
+        self.dut.placement = Placement(['./temp/a', './temp/b'], policy='round-robin')
+
+        for path in self.dut.placement.paths:
+            filepath = self.dut.placement.filepath('tempfile')
+            self.assertEqual(os.path.dirname(filepath), path)
+
+            with open(filepath, 'w') as f:
+                f.write('abc')
+            self.dut.send_rollover_message(filepath)
+
+            self.assertEqual(self.get_message_from_queue().payload.storage, path)
 
     def run_thread(self):
         """ A thread that is run along side the run() method.
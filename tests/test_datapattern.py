@@ -0,0 +1,91 @@
+""" Contains the unittest class and methods that test the DataPattern
+    class.
+"""
+
+import zlib
+import unittest
+
+from client.datapattern import DataPattern
+
+
+class TestDataPattern(unittest.TestCase):
+    """The TestDataPattern contains the unittests that are used for testing
+       the DataPattern class.
+    """
+    BLOCK_SIZE = 1000 * DataPattern.UNIT_SIZE
+
+    def units(self, data):
+        """ Split data into dedupe units. """
+        data = str(data)
+        size = DataPattern.UNIT_SIZE
+        return [data[n:n + size] for n in xrange(0, len(data), size)]
+
+    def test_block_size(self):
+        """ Test that blocks of any size can be generated. """
+        dut = DataPattern()
+
+        for size in (1, 100, DataPattern.UNIT_SIZE + 1, self.BLOCK_SIZE):
+            self.assertEqual(len(dut.block(size)), size)
+
+    def test_unique(self):
+        """ Test that without dedupe every unit is unique, across blocks
+            as well as within them.
+        """
+        dut = DataPattern()
+
+        units = self.units(dut.block(self.BLOCK_SIZE)) + self.units(dut.block(self.BLOCK_SIZE))
+
+        self.assertEqual(len(set(units)), len(units))
+
+    def test_dedupe(self):
+        """ Test that the fraction of duplicate units matches dedupe. """
+        dut = DataPattern(dedupe=0.25)
+
+        units = self.units(dut.block(self.BLOCK_SIZE))
+        duplicates = len(units) - len(set(units))
+
+        # The duplicates are all copies of one unit, which is stored once
+        self.assertAlmostEqual(duplicates / float(len(units)), 0.25, delta=0.01)
+
+    def test_alignment(self):
+        """ Test that units stay aligned to file offsets when blocks
+            aren't a multiple of the unit size.
+        """
+        dut = DataPattern(dedupe=0.5)
+        size = 1000000
+
+        data = ''.join(str(dut.block(size, offset)) for offset in xrange(0, 10 * size, size))
+        units = self.units(data)
+
+        self.assertAlmostEqual((len(units) - len(set(units))) / float(len(units)), 0.5, delta=0.01)
+
+    def test_duplicates(self):
+        """ Test that the duplicate units found for a run of units are the
+            ones that each unit's position makes a duplicate.
+        """
+        for dedupe in (0.0, 0.1, 1 / 3.0, 0.75, 1.0):
+            dut = DataPattern(dedupe=dedupe)
+
+            for first in (0, 7, 10 ** 9 + 3):
+                expected = [unit for unit in xrange(first, first + 1000)
+                            if dut._is_duplicate(unit)]
+                self.assertEqual(dut._duplicates(first, 1000), expected)
+
+    def test_compressibility(self):
+        """ Test that units compress to about 1 - compressibility. """
+        for compressibility in (0.0, 0.5, 0.9):
+            dut = DataPattern(compressibility=compressibility)
+
+            units = self.units(dut.block(self.BLOCK_SIZE))
+            compressed = sum(len(zlib.compress(unit)) for unit in units)
+            ratio = compressed / float(self.BLOCK_SIZE)
+
+            self.assertAlmostEqual(ratio, 1.0 - compressibility, delta=0.05)
+
+    def test_invalid(self):
+        """ Test that ratios outside of 0-1 are rejected. """
+        with self.assertRaises(ValueError):
+            DataPattern(compressibility=1.5)
+
+        with self.assertRaises(ValueError):
+            DataPattern(dedupe=-0.1)
@@ -0,0 +1,114 @@
+""" Contains the unittest class and methods that test the DeviceSampler
+    class.
+"""
+
+import os
+import os.path
+import shutil
+import unittest
+
+from mock import patch
+
+from client.diskstats import DeviceSampler, DeviceStats
+
+
+class TestDeviceSampler(unittest.TestCase):
+    """The TestDeviceSampler contains the unittests that are used for
+       testing the DeviceSampler class.
+
+       The tests use a fake /proc/diskstats under ./temp that holds the
+       device of ./temp/storage.
+    """
+    PROC = './temp/proc'
+    STORAGE = './temp/storage'
+
+    def setUp(self):
+        """ Create the storage path and the fake diskstats. """
+        os.makedirs(self.PROC)
+        os.makedirs(self.STORAGE)
+
+        st_dev = os.stat(self.STORAGE).st_dev
+        self.major, self.minor = os.major(st_dev), os.minor(st_dev)
+
+        self.write_diskstats(reads=0, sectors_read=0, read_time=0,
+                             writes=0, sectors_written=0, write_time=0,
+                             io_time=0, weighted_io_time=0)
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists('./temp'):
+            shutil.rmtree('./temp')
+
+    def write_diskstats(self, reads, sectors_read, read_time, writes,
+                        sectors_written, write_time, io_time, weighted_io_time):
+        """ Write a diskstats with the storage device and one other. """
+        line = '{:4d} {:7d} {} {} 0 {} {} {} 0 {} {} 0 {} {} 0 0 0 0\n'
+        with open(os.path.join(self.PROC, 'diskstats'), 'w') as f:
+            f.write(line.format(self.major, self.minor, 'test0', reads,
+                                sectors_read, read_time, writes,
+                                sectors_written, write_time, io_time,
+                                weighted_io_time))
+            f.write(line.format(self.major + 1, 0, 'other', 1, 1, 1, 1, 1, 1, 1, 1))
+
+    def test_available(self):
+        """ Test that available() finds the fake diskstats. """
+        self.assertTrue(DeviceSampler.available(self.PROC))
+        self.assertFalse(DeviceSampler.available('./temp/missing'))
+
+    def test_resolve(self):
+        """ Test that the storage path resolves to its device only. """
+        dut = DeviceSampler([self.STORAGE], proc=self.PROC)
+
+        self.assertEqual(dut.devices.keys(), [(self.major, self.minor)])
+        self.assertEqual(dut.devices.values(), [[os.path.abspath(self.STORAGE)]])
+
+    def test_resolve_no_device(self):
+        """ Test that a path on no listed block device is dropped. """
+        with open(os.path.join(self.PROC, 'diskstats'), 'w') as f:
+            f.write('')
+
+        dut = DeviceSampler([self.STORAGE], proc=self.PROC)
+
+        self.assertEqual(dut.devices, {})
+
+    def test_sample(self):
+        """ Test the statistics derived from two samples 2s apart. """
+        dut = DeviceSampler([self.STORAGE], proc=self.PROC)
+
+        with patch('client.diskstats.time.time', return_value=100.0):
+            self.assertEqual(dut.sample(), [])
+
+        # 100 reads of 8 sectors and 300 writes of 16 sectors taking
+        # 200ms and 1000ms, busy for 1s, 3 requests in flight on average
+        self.write_diskstats(reads=100, sectors_read=800, read_time=200,
+                             writes=300, sectors_written=4800, write_time=1000,
+                             io_time=1000, weighted_io_time=6000)
+
+        with patch('client.diskstats.time.time', return_value=102.0):
+            stats = dut.sample()
+
+        self.assertEqual(len(stats), 1)
+        stats = stats[0]
+        self.assertIsInstance(stats, DeviceStats)
+        self.assertEqual(stats.device, 'test0')
+        self.assertEqual(stats.interval, 2.0)
+        self.assertEqual(stats.read_iops, 50.0)
+        self.assertEqual(stats.write_iops, 150.0)
+        self.assertEqual(stats.read_rate, 800 * 512 / 2.0)
+        self.assertEqual(stats.write_rate, 4800 * 512 / 2.0)
+        self.assertEqual(stats.queue_depth, 3.0)
+        self.assertEqual(stats.utilization, 50.0)
+        self.assertEqual(stats.await_time, 3.0)
+
+    def test_sample_idle(self):
+        """ Test that an idle device has no await time. """
+        dut = DeviceSampler([self.STORAGE], proc=self.PROC)
+
+        with patch('client.diskstats.time.time', return_value=100.0):
+            dut.sample()
+        with patch('client.diskstats.time.time', return_value=101.0):
+            stats = dut.sample()[0]
+
+        self.assertEqual(stats.write_iops, 0.0)
+        self.assertEqual(stats.utilization, 0.0)
+        self.assertIsNone(stats.await_time)
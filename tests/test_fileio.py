@@ -0,0 +1,57 @@
+""" Contains the unittest class and methods that test the client file
+    I/O helpers.
+"""
+
+import os
+import os.path
+import shutil
+import unittest
+
+from client.fileio import pwrite, fallocate
+from shared import init_dir_path
+
+
+class TestFileIO(unittest.TestCase):
+    """The TestFileIO contains the unittests that are used for testing
+       the positional file I/O helpers.
+    """
+
+    def setUp(self):
+        """ Create an empty file to write into for each test. """
+        self.path = init_dir_path('./temp/')
+        self.filepath = os.path.join(self.path, 'tempfile')
+        self.fd = os.open(self.filepath, os.O_RDWR | os.O_CREAT)
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        os.close(self.fd)
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+
+    def test_pwrite_offset(self):
+        """ Test that pwrite places data at the requested offset and
+            leaves the file position untouched.
+        """
+        self.assertEqual(pwrite(self.fd, 'abc', 5), 3)
+
+        self.assertEqual(os.lseek(self.fd, 0, os.SEEK_CUR), 0)
+
+        with open(self.filepath, 'rb') as f:
+            self.assertEqual(f.read(), '\x00' * 5 + 'abc')
+
+    def test_pwrite_bytearray(self):
+        """ Test that pwrite accepts a bytearray as well as a str. """
+        pwrite(self.fd, bytearray('xyz'), 0)
+
+        with open(self.filepath, 'rb') as f:
+            self.assertEqual(f.read(), 'xyz')
+
+    def test_fallocate(self):
+        """ Test that fallocate sizes the file and reserves its blocks. """
+        length = 1000000
+
+        fallocate(self.fd, 0, length)
+
+        stat = os.fstat(self.fd)
+        self.assertEqual(stat.st_size, length)
+        self.assertGreaterEqual(stat.st_blocks * 512, length)
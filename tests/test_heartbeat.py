@@ -2,6 +2,7 @@
     class.
 """
 
+import time
 import unittest
 import multiprocessing
 import threading
@@ -9,8 +10,11 @@ import cPickle as pickle
 
 from mock import MagicMock, patch, call
 from Queue import Queue, Empty
+from datetime import datetime
 
 from client import StorageHeartbeat
+from client.heartbeat import wait
+from client.liveness import LivenessBoard, LivenessPayload
 from shared import ProcessData, Message
 
 class TestHeartbeat(object):
@@ -262,3 +266,294 @@ class TestHeartbeat(object):
         t.join()
 
 
+class TestWait(unittest.TestCase):
+    """The TestWait contains the unittests that are used for testing the
+       wait function that StorageHeartbeat blocks on its pipes with.
+    """
+
+    def setUp(self):
+        """ Set up pipes to a few fake child processes. """
+        self.pipes = [multiprocessing.Pipe() for _ in xrange(3)]
+        self.masters = [master for master, _ in self.pipes]
+
+    def test_wait_timeout(self):
+        """ Test that wait returns nothing once the timeout passes. """
+        start = time.time()
+
+        self.assertEqual(wait(self.masters, 0.2), [])
+
+        self.assertGreaterEqual(time.time() - start, 0.15)
+
+    def test_wait_ready(self):
+        """ Test that wait returns only the pipes with data. """
+        self.pipes[1][1].send('response')
+
+        self.assertEqual(wait(self.masters, 1), [self.masters[1]])
+
+    def test_wait_wakes(self):
+        """ Test that wait returns as soon as a response is sent. """
+        timer = threading.Timer(0.1, self.pipes[2][1].send, args=['response'])
+        timer.start()
+
+        start = time.time()
+        ready = wait(self.masters, 5)
+        timer.join()
+
+        self.assertEqual(ready, [self.masters[2]])
+        self.assertLess(time.time() - start, 1)
+
+    def test_wait_closed(self):
+        """ Test that a pipe closed at the far end is ready. """
+        self.pipes[0][1].close()
+
+        self.assertEqual(wait(self.masters, 1), [self.masters[0]])
+        self.assertRaises(EOFError, self.masters[0].recv)
+
+
+class TestPollProcesses(unittest.TestCase):
+    """The TestPollProcesses contains the unittests that are used for
+       testing how StorageHeartbeat collects responses over the pipes of
+       its children.
+    """
+
+    class MockProcess(object):
+        """ The MockProcess contains a limited subset of attribute of
+            a multiprocessing.Process.
+        """
+        def __init__(self, id, name):
+            self.id = id
+            self.name = name
+
+    def setUp(self):
+        """ Set up a StorageHeartbeat of a monitor and three consumers over
+            real pipes, with the message it sends to the server captured.
+        """
+        pipes = [multiprocessing.Pipe() for _ in xrange(4)]
+        # The ends of the pipes that the fake children hold
+        self.children = [child for _, child in pipes]
+
+        monitor = ProcessData(process=self.MockProcess(id=0, name='TestMonitor'),
+                              pipe=pipes[0][0])
+        consumers = [ProcessData(process=self.MockProcess(id=id, name='TestConsumer'),
+                                 pipe=pipes[id + 1][0])
+                     for id in xrange(3)]
+
+        self.dut = StorageHeartbeat(consumers=consumers,
+                                    monitor=monitor,
+                                    report_in=None,
+                                    runtime=10,
+                                    poll_period=5,
+                                    client_socket=None)
+        self.dut.log = MagicMock()
+        self.dut._send_message_to_server = MagicMock()
+
+    def respond(self, child, name, id, types):
+        """ Receive the request on a child's pipe and send a response of
+            each of types, or close the pipe if types is None.
+        """
+        self.requests.append(child.recv())
+
+        if types is None:
+            child.close()
+            return
+
+        for type in types:
+            child.send(Message(name=name, id=id, date_time=None,
+                               type=type, payload=None))
+
+    def poll(self, behaviours, timeout):
+        """ Run _poll_processes for a KILL request while a thread for each
+            child responds with its behaviour.
+
+            Returns:
+                The responses and missing responses sent to the server and
+                the time (s) that _poll_processes took.
+        """
+        self.requests = []
+        names = [('TestMonitor', 0)] + [('TestConsumer', id) for id in xrange(3)]
+        threads = [threading.Thread(target=self.respond,
+                                    args=(child, name, id, types))
+                   for child, (name, id), types in zip(self.children, names, behaviours)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        start = time.time()
+        self.dut._poll_processes(message=Message(name='Heartbeat', id=0, date_time=None,
+                                                 type='KILL', payload=None),
+                                 timeout=timeout,
+                                 response_type='STOP')
+        elapsed = time.time() - start
+
+        # Every child was sent the request
+        self.assertEqual([request.type for request in self.requests], ['KILL'] * 4)
+
+        self.assertEqual(self.dut._send_message_to_server.call_count, 1)
+        message = self.dut._send_message_to_server.call_args[0][0]
+        self.assertEqual(message.type, 'STOP')
+
+        responses, missing = message.payload
+        return sorted((r.name, r.id) for r in responses), missing, elapsed
+
+    def test_responses(self):
+        """ Test that a response of the wrong type is skipped until the
+            right one arrives, and that a closed pipe stops the wait for
+            that child without waiting for the deadline.
+        """
+        responses, missing, elapsed = self.poll([['STOP'],
+                                                 ['HEARTBEAT', 'STOP'],
+                                                 None,
+                                                 ['STOP']], timeout=5)
+
+        self.assertEqual(responses, [('TestConsumer', 0), ('TestConsumer', 2),
+                                     ('TestMonitor', 0)])
+        self.assertEqual(missing, set([('TestConsumer', 1)]))
+        self.assertLess(elapsed, 2)
+
+    def test_deadline(self):
+        """ Test that children that never send the response type are
+            missing once the deadline passes.
+        """
+        responses, missing, elapsed = self.poll([['STOP'],
+                                                 [],
+                                                 ['HEARTBEAT'],
+                                                 ['STOP']], timeout=0.5)
+
+        self.assertEqual(responses, [('TestConsumer', 2), ('TestMonitor', 0)])
+        self.assertEqual(missing, set([('TestConsumer', 0), ('TestConsumer', 1)]))
+        self.assertGreaterEqual(elapsed, 0.45)
+        self.assertLess(elapsed, 2)
+
+
+class TestCheckLiveness(unittest.TestCase):
+    """The TestCheckLiveness contains the unittests that are used for
+       testing how StorageHeartbeat reads the children from a LivenessBoard.
+    """
+
+    TIMEOUT = 30
+    START = 1000.0
+
+    class MockProcess(object):
+        """ The MockProcess contains the attributes of a StorageObject
+            that the heartbeat reads.
+        """
+        def __init__(self, id, name, liveness_slot):
+            self.id = id
+            self.name = name
+            self.liveness_slot = liveness_slot
+
+    def setUp(self):
+        """ Set up a StorageHeartbeat of one consumer in slot 0 and the
+            monitor in slot 1 of a LivenessBoard, with the message it sends
+            to the server captured.
+        """
+        self.board = LivenessBoard(2)
+
+        consumer = ProcessData(process=self.MockProcess(id=0,
+                                                        name='TestConsumer',
+                                                        liveness_slot=0),
+                               pipe=None)
+        monitor = ProcessData(process=self.MockProcess(id=0,
+                                                       name='TestMonitor',
+                                                       liveness_slot=1),
+                              pipe=None)
+
+        self.dut = StorageHeartbeat(consumers=[consumer],
+                                    monitor=monitor,
+                                    report_in=None,
+                                    runtime=10,
+                                    poll_period=5,
+                                    client_socket=None,
+                                    liveness=self.board,
+                                    liveness_timeout=self.TIMEOUT)
+        self.dut.log = MagicMock()
+        self.dut._send_message_to_server = MagicMock()
+        self.dut.start_time = self.START
+
+    def update(self, slot, at, **kwargs):
+        """ Update a slot of the board at the time.time() at. """
+        with patch('client.liveness.time.time', return_value=at):
+            self.board.update(slot, **kwargs)
+
+    def check(self, at):
+        """ Check the board at the time.time() at.
+
+            Returns:
+                The HEARTBEAT message sent to the server.
+        """
+        with patch('client.heartbeat.time.time', return_value=at):
+            self.dut._check_liveness()
+
+        self.assertEqual(self.dut._send_message_to_server.call_count, 1)
+        message = self.dut._send_message_to_server.call_args[0][0]
+        self.assertEqual(message.type, 'HEARTBEAT')
+        self.assertEqual(message.name, 'Heartbeat')
+
+        return message
+
+    def test_starting(self):
+        """ Test that a child still starting within liveness_timeout of the
+            heartbeat starting is neither a response nor missing.
+        """
+        self.update(1, self.START, state='running')
+
+        responses, missing = self.check(self.START + self.TIMEOUT).payload
+
+        self.assertEqual([(r.name, r.id) for r in responses], [('TestMonitor', 0)])
+        self.assertEqual(missing, set())
+
+    def test_starting_timeout(self):
+        """ Test that a child still starting past liveness_timeout is
+            missing.
+        """
+        self.update(1, self.START, state='running')
+
+        responses, missing = self.check(self.START + self.TIMEOUT + 1).payload
+
+        self.assertEqual(missing, set([('TestConsumer', 0), ('TestMonitor', 0)]))
+
+    def test_stopped(self):
+        """ Test that a child that has stopped is missing, however recently
+            it updated its slot.
+        """
+        self.update(0, self.START, state='stopped')
+        self.update(1, self.START, state='running')
+
+        responses, missing = self.check(self.START + 1).payload
+
+        self.assertEqual([(r.name, r.id) for r in responses], [('TestMonitor', 0)])
+        self.assertEqual(missing, set([('TestConsumer', 0)]))
+
+    def test_stalled(self):
+        """ Test that a running child without progress for longer than
+            liveness_timeout is missing.
+        """
+        self.update(0, self.START, state='running')
+        self.update(1, self.START + 10, state='running')
+
+        responses, missing = self.check(self.START + self.TIMEOUT + 1).payload
+
+        self.assertEqual([(r.name, r.id) for r in responses], [('TestMonitor', 0)])
+        self.assertEqual(missing, set([('TestConsumer', 0)]))
+
+    def test_running(self):
+        """ Test that a running child with recent progress is a HEARTBEAT
+            response carrying its progress.
+        """
+        self.update(0, self.START, state='running')
+        self.update(0, self.START + 20, bytes=4096)
+        self.update(1, self.START + 25, state='running')
+
+        responses, missing = self.check(self.START + self.TIMEOUT).payload
+
+        self.assertEqual(missing, set())
+        self.assertEqual(len(responses), 2)
+
+        monitor, consumer = responses
+        self.assertEqual((consumer.name, consumer.id), ('TestConsumer', 0))
+        self.assertEqual(consumer.type, 'HEARTBEAT')
+        self.assertEqual(consumer.date_time, datetime.fromtimestamp(self.START + 20))
+        self.assertIsInstance(consumer.payload, LivenessPayload)
+        self.assertEqual(consumer.payload.bytes, 4096)
+        self.assertEqual(consumer.payload.state, 'running')
+        self.assertEqual(monitor.payload.bytes, 0)
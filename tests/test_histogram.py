@@ -0,0 +1,77 @@
+""" Contains the unittest class and methods that test the LatencyHistogram
+    class.
+"""
+
+import unittest
+import cPickle as pickle
+
+from shared import LatencyHistogram
+
+
+class TestHistogram(unittest.TestCase):
+    """The TestHistogram contains the unittests that are used for testing
+       the LatencyHistogram class.
+    """
+
+    def setUp(self):
+        """ Set up an empty LatencyHistogram at the beginning of each test. """
+        self.dut = LatencyHistogram()
+
+    def test_empty(self):
+        """ Test that an empty histogram has no percentiles. """
+        self.assertEqual(self.dut.count, 0)
+        self.assertIsNone(self.dut.percentile(50))
+        self.assertIsNone(self.dut.mean())
+
+    def test_percentile_precision(self):
+        """ Test that percentiles are within the relative precision of the
+            sub-buckets.
+        """
+        # 1ms through 1000ms
+        for ms in xrange(1, 1001):
+            self.dut.record(ms / 1000.0)
+
+        tolerance = 1.0 / LatencyHistogram.SUB_BUCKETS
+
+        for percent, expected in [(50, 0.5), (90, 0.9), (99, 0.99)]:
+            result = self.dut.percentile(percent)
+            self.assertAlmostEqual(result, expected, delta=expected * tolerance)
+
+        self.assertEqual(self.dut.percentile(100), 1.0)
+        self.assertEqual(self.dut.min, 0.001)
+
+    def test_large_value(self):
+        """ Test that values beyond the last bucket are clamped rather
+            than raising an error.
+        """
+        self.dut.record(1e9)
+
+        self.assertEqual(self.dut.count, 1)
+        self.assertEqual(self.dut.percentile(99), 1e9)
+
+    def test_merge(self):
+        """ Test that merging two histograms combines their counts and
+            extremes.
+        """
+        other = LatencyHistogram()
+        self.dut.record(0.001)
+        other.record(0.002)
+        other.record(0.003)
+
+        self.dut.merge(other)
+
+        self.assertEqual(self.dut.count, 3)
+        self.assertEqual(self.dut.min, 0.001)
+        self.assertEqual(self.dut.max, 0.003)
+        self.assertAlmostEqual(self.dut.mean(), 0.002)
+
+    def test_pickle(self):
+        """ Test that a histogram survives the trip through pickle. """
+        self.dut.record(0.01)
+        self.dut.record(0.5)
+
+        received = pickle.loads(pickle.dumps(self.dut, pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(received.counts, self.dut.counts)
+        self.assertEqual(received.count, 2)
+        self.assertEqual(received.percentile(99), self.dut.percentile(99))
@@ -0,0 +1,53 @@
+""" Contains the unittest class and methods that test the LivenessBoard
+    class.
+"""
+
+import multiprocessing
+import unittest
+
+from mock import patch
+
+from client.liveness import LivenessBoard
+
+
+def update_slot(board, slot):
+    """ Update a slot of the board from a child process. """
+    board.update(slot, bytes=4096, state='running')
+
+
+class TestLivenessBoard(unittest.TestCase):
+    """The TestLivenessBoard contains the unittests that are used for
+       testing the LivenessBoard class.
+    """
+
+    def test_initial(self):
+        """ Test that a new board has every slot starting. """
+        dut = LivenessBoard(3)
+
+        self.assertEqual(dut.read(), [(0.0, 0, 'starting')] * 3)
+
+    def test_update(self):
+        """ Test that an update only changes the given fields and
+            always stamps the time.
+        """
+        dut = LivenessBoard(2)
+
+        with patch('client.liveness.time.time', return_value=100.0):
+            dut.update(1, state='running')
+        with patch('client.liveness.time.time', return_value=102.5):
+            dut.update(1, bytes=1000)
+
+        self.assertEqual(dut.read(), [(0.0, 0, 'starting'),
+                                      (102.5, 1000, 'running')])
+
+    def test_child_update(self):
+        """ Test that a child process's update is read by the parent. """
+        dut = LivenessBoard(2)
+
+        child = multiprocessing.Process(target=update_slot, args=(dut, 1))
+        child.start()
+        child.join()
+
+        _, bytes, state = dut.read()[1]
+        self.assertEqual(bytes, 4096)
+        self.assertEqual(state, 'running')
@@ -0,0 +1,155 @@
+""" Contains the unittest class and methods that test the client's
+    __main__ module.
+"""
+
+import os
+import os.path
+import re
+import sys
+import shutil
+import threading
+import time
+import unittest
+
+from mock import patch
+
+from client.__main__ import get_config, get_command_line_args, validate_runtimes
+from shared import ProcessData
+
+
+class TestMain(unittest.TestCase):
+    """The TestMain contains the unittests that are used for testing the
+       configuration checks and startup of the client.
+    """
+
+    class MockConsumer(object):
+        """ The MockConsumer contains the attributes of a StorageConsumer
+            that validate_runtimes uses, and records the calibrations made.
+        """
+        def __init__(self, id, result=True):
+            self.id = id
+            self.chunk_size = 4
+            self.result = result
+            self.calls = []
+
+        def test_runtime(self, runtime, samples=None, warmup=None, ttl=None):
+            self.calls.append((runtime, samples, warmup, ttl,
+                               threading.current_thread().name))
+            # Long enough for the calibrations to overlap
+            time.sleep(0.1)
+            return self.result
+
+    class MockConfig(object):
+
+        def __init__(self, workload='write'):
+            self.workload = workload
+            self.runtime = 10
+            self.calibration_samples = 5
+            self.calibration_warmup = 1
+            self.calibration_ttl = 3600
+
+    def setUp(self):
+        """ Set up a directory for configuration files. """
+        os.mkdir('./temp')
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists('./temp'):
+            shutil.rmtree('./temp')
+
+    def consumers(self, results):
+        """ Returns a ProcessData of a MockConsumer for each result. """
+        return [ProcessData(process=self.MockConsumer(id=id, result=result), pipe=None)
+                for id, result in enumerate(results)]
+
+    def get_config(self, **settings):
+        """ Load client_config.yaml with settings replaced, as the client
+            does at startup.
+
+            Returns:
+                The ClientConfig.
+        """
+        with open('client_config.yaml', 'r') as f:
+            text = f.read()
+
+        for key, value in settings.iteritems():
+            text, count = re.subn(r'(?m)^{}: .*$'.format(key),
+                                  '{}: {!r}'.format(key, value), text)
+            self.assertEqual(count, 1)
+
+        path = './temp/client_config.yaml'
+        with open(path, 'w') as f:
+            f.write(text)
+
+        with patch.object(sys, 'argv', ['client', '--config-file', path]):
+            return get_config(get_command_line_args())
+
+    def test_liveness_monitor_period(self):
+        """ Test that a liveness board is rejected when the monitor polls
+            no more often than liveness_timeout and doesn't sample between
+            polls.
+        """
+        settings = dict(heartbeat_liveness='board',
+                        liveness_timeout=30,
+                        monitor_poll_period=30,
+                        monitor_sample_rate=0)
+
+        with self.assertRaises(SystemExit):
+            self.get_config(**settings)
+
+        # Any of these makes the monitor show progress in time
+        for change in (dict(heartbeat_liveness='pipe'),
+                       dict(monitor_poll_period=10),
+                       dict(monitor_sample_rate=20)):
+            config = self.get_config(**dict(settings, **change))
+            self.assertEqual(config.liveness_timeout, 30)
+
+    def test_validate_runtimes(self):
+        """ Test that every consumer is calibrated concurrently on the pool
+            with the calibration settings.
+        """
+        consumers = self.consumers([True] * 4)
+
+        start = time.time()
+        validate_runtimes(consumers, self.MockConfig())
+        elapsed = time.time() - start
+
+        threads = set()
+        for consumer in consumers:
+            self.assertEqual(len(consumer.process.calls), 1)
+            runtime, samples, warmup, ttl, thread = consumer.process.calls[0]
+            self.assertEqual((runtime, samples, warmup, ttl), (10, 5, 1, 3600))
+            threads.add(thread)
+
+        # One pool thread each, rather than one after the other here
+        self.assertEqual(len(threads), len(consumers))
+        self.assertNotIn(threading.current_thread().name, threads)
+        self.assertLess(elapsed, 0.1 * len(consumers))
+
+    def test_validate_runtimes_failure(self):
+        """ Test that the client exits if any consumer can't roll over twice
+            within the runtime, after every consumer has been calibrated.
+        """
+        consumers = self.consumers([True, False, True])
+
+        with self.assertRaises(SystemExit) as context:
+            validate_runtimes(consumers, self.MockConfig())
+
+        self.assertEqual(str(context.exception),
+                         'Runtime 10 and chunk size 4 for Consumer 1 '
+                         'not sufficient for 2x rollover.')
+        for consumer in consumers:
+            self.assertEqual(len(consumer.process.calls), 1)
+
+    def test_validate_runtimes_skipped(self):
+        """ Test that read and metadata workloads, and a client without
+            consumers, aren't calibrated.
+        """
+        for workload in ('read', 'metadata'):
+            consumers = self.consumers([False])
+
+            validate_runtimes(consumers, self.MockConfig(workload=workload))
+
+            self.assertEqual(consumers[0].process.calls, [])
+
+        validate_runtimes([], self.MockConfig())
@@ -0,0 +1,137 @@
+""" Contains the unittest class and methods that test the StorageMetadata
+    class.
+"""
+
+import os
+import os.path
+import time
+import multiprocessing
+import shutil
+from Queue import Queue, Empty
+
+from client import StorageMetadata
+from shared import LatencyHistogram
+from test_storage_object import TestObject
+
+
+class TestMetadata(TestObject):
+    """The TestMetadata contains the unittests that are used for testing
+       the StorageMetadata class.
+
+       It is derived from TestObject with contains tests used for all
+       StorageObject items.
+    """
+    FILES = 20
+    DIRS = 4
+    FILE_SIZE = 4
+    NAME = 'TestMetadata'
+
+    def setUp(self):
+        """ Set up a StorageMetadata instance at the beginning of each test.
+            The StorageMetadata will be provided with a pipe for START and
+            HEARTBEAT messages and a queue for METADATA and STOP messages.
+        """
+        self.hb_master, self.hb_slave = multiprocessing.Pipe()
+        self.queue = Queue()
+
+        self.dut = StorageMetadata(id=0,
+                                   heartbeat=self.hb_slave,
+                                   report=self.queue,
+                                   name=self.NAME,
+                                   path='./temp/',
+                                   files=self.FILES,
+                                   dirs=self.DIRS,
+                                   file_size=self.FILE_SIZE)
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists(self.dut.path):
+            shutil.rmtree(self.dut.path)
+
+    def test_fanout(self):
+        """ Test that the files are spread evenly over the directories. """
+        self.assertEqual(len(self.dut.filepaths), self.FILES)
+
+        for dirpath in self.dut.dirpaths:
+            in_dir = [f for f in self.dut.filepaths if os.path.dirname(f) == dirpath]
+            self.assertEqual(len(in_dir), self.FILES / self.DIRS)
+
+    def test_operations(self):
+        """ Test the create, stat and unlink operations. """
+        self.dut.create_dirs()
+        filepath = self.dut.filepaths[0]
+
+        self.dut.create(filepath)
+        self.assertEqual(os.path.getsize(filepath), self.FILE_SIZE * 1000)
+
+        self.dut.stat(filepath)
+
+        self.dut.unlink(filepath)
+        self.assertFalse(os.path.exists(filepath))
+
+    def test_run_pass(self):
+        """ Test the run_pass method.
+            Verify that every operation is timed for every file and that
+            no files are left behind.
+        """
+        self.dut.create_dirs()
+
+        payload = self.dut.run_pass()
+
+        self.assertEqual(payload.files, self.FILES)
+        self.assertEqual(payload.dirs, self.DIRS)
+        for operation in StorageMetadata.OPERATIONS:
+            self.assertIsInstance(payload.latency[operation], LatencyHistogram)
+            self.assertEqual(payload.latency[operation].count, self.FILES)
+            self.assertGreater(payload.elapsed[operation], 0)
+
+        for dirpath in self.dut.dirpaths:
+            self.assertEqual(os.listdir(dirpath), [])
+
+        self.dut.remove_dirs()
+        for dirpath in self.dut.dirpaths:
+            self.assertFalse(os.path.exists(dirpath))
+
+    def run_thread(self):
+        """ A thread that is run along side the run() method.
+            Sends the appropriate messages into the StorageMetadata
+            and verify that the appropriate messages are put out.
+        """
+        self.start_message_check()
+
+        self.send_heartbeat()
+
+        # Give HB client 3 seconds to respond
+        self.assertTrue(self.hb_master.poll(3))
+
+        if self.hb_master.poll():
+            response = self.hb_master.recv()
+            self.check_heartbeat(response)
+
+        time.sleep(1)  # Give the process time to make some passes
+
+        self.send_heartbeat_kill()
+
+        self.stop_message_check()
+
+        messages = []
+        while True:
+            try:
+                messages.append(self.queue.get(block=False))
+            except Empty:
+                break
+
+        self.assertGreater(len(messages), 0)
+        for message in messages:
+            self.assertEqual(message.type, 'METADATA')
+            self.assertEqual(message.payload.files, self.FILES)
+
+        # The directories are removed on the way out
+        for dirpath in self.dut.dirpaths:
+            self.assertFalse(os.path.exists(dirpath))
+
+    def test_run(self):
+        """ Functional test to exercise the run() method.
+            This function definition is in TestObject.
+        """
+        self.run_test()
@@ -6,10 +6,13 @@ import os
 import os.path
 import time
 import multiprocessing
+import pickle
+from multiprocessing.pool import ThreadPool
 from Queue import Queue
 from copy import copy
 
-from client import StorageMonitor, MonitorResponseError
+from client import StorageMonitor, MonitorResponseError, MonitorData, MonitorBatch
+from client.monitor import SweepOverrun
 from shared import Message
 from test_storage_object import TestObject
 
@@ -124,6 +127,186 @@ class TestMonitor(TestObject):
         response[0] = 'error'
         self.assertRaises(MonitorResponseError, self.dut.validate_monitor_response, response)
 
+    def test_unknown_sampler(self):
+        """ Test that an unknown sampler is rejected. """
+        self.assertRaises(ValueError, StorageMonitor, processes=[], id=0,
+                          heartbeat=self.hb_slave, report=self.queue,
+                          poll_period=1, sampler='top')
+
+    def test_ps_workers(self):
+        """ Test that the 'ps' sampler, which runs subprocesses, always
+            samples on a single thread.
+        """
+        dut = StorageMonitor(processes=[], id=0, heartbeat=self.hb_slave,
+                             report=self.queue, poll_period=1, sampler='ps',
+                             workers=4)
+
+        self.assertIsNone(dut.sampler)
+        self.assertEqual(dut.workers, 1)
+
+    def test_sample_ps(self):
+        """ Test that the 'ps' sampler fills in the process status. """
+        self.dut.sampler = None
+        process = self.dut.processes[0]
+
+        self.dut.sample(process)
+
+        self.validate_monitor_payload(process)
+
+    def test_sample_proc(self):
+        """ Test that the /proc sampler fills in the process status. """
+        if self.dut.sampler is None:
+            self.skipTest('/proc is not available')
+
+        process = self.dut.processes[0]
+        self.dut.sampler.update()
+
+        self.dut.sample(process)
+
+        self.validate_monitor_payload(process)
+
+        if os.path.exists('/proc/self/io'):
+            self.assertIn('write_bytes', process.counters)
+            self.assertGreater(process.rss, 0)
+
+    def test_update_io(self):
+        """ Test that the I/O rates are the change in the counters per
+            second since the previous sample.
+        """
+        process = MonitorData(self.MockProcess(id=0, pid=1, name='TestProcess'))
+
+        process.update_io({'write_bytes': 1000, 'syscw': 10}, rss=1, sample_time=100.0)
+        self.assertIsNone(process.rates)
+
+        process.update_io({'write_bytes': 5000, 'syscw': 30}, rss=2, sample_time=102.0)
+        self.assertEqual(process.rates, {'write_bytes': 2000.0, 'syscw': 10.0})
+        self.assertEqual(process.counters, {'write_bytes': 5000, 'syscw': 30})
+        self.assertEqual(process.rss, 2)
+
+    def test_sample_rate(self):
+        """ Test that high rate samples between polls are summarized into
+            each process's MonitorData.
+        """
+        dut = StorageMonitor(processes=[self.MockProcess(id=0,
+                                                         pid=os.getpid(),
+                                                         name='TestProcess')],
+                             id=0,
+                             heartbeat=self.hb_slave,
+                             report=self.queue,
+                             poll_period=1,
+                             sample_rate=50)
+        if dut.sampler is None or not os.path.exists('/proc/self/io'):
+            self.skipTest('/proc is not available')
+
+        self.assertTrue(dut._sample_until(time.time() + 0.2))
+
+        process = dut.processes[0]
+        dut.summarize(process)
+
+        self.assertEqual(sorted(process.summaries), sorted(StorageMonitor.METRICS))
+        cpu = process.summaries['cpu']
+        self.assertGreater(cpu.count, 1)
+        self.assertLessEqual(cpu.min, cpu.mean)
+        self.assertLessEqual(cpu.mean, cpu.max)
+
+        # The next period starts empty
+        dut.summarize(process)
+        self.assertIsNone(process.summaries)
+
+    def test_discover(self):
+        """ Test that discover adds the processes of the client's tree as
+            client processes, labelled where their role is known.
+        """
+        parent = os.getppid()
+        dut = StorageMonitor(processes=[],
+                             id=0,
+                             heartbeat=self.hb_slave,
+                             report=self.queue,
+                             poll_period=1,
+                             process_tree=True,
+                             labels={parent: 'Client'})
+        if dut.sampler is None:
+            self.skipTest('/proc is not available')
+
+        dut.discover()
+
+        names = {process.pid: process.name for process in dut.processes}
+        self.assertEqual(names[parent], 'Client')
+        self.assertEqual(names[os.getpid()], 'Monitor')
+        for process in dut.processes:
+            self.assertEqual(process.role, 'client')
+
+        # Discovering again doesn't add the same processes twice
+        dut.discover()
+        self.assertEqual(len(dut.processes), len(names))
+
+    def make_sweep_monitor(self, workers):
+        """ Returns a StorageMonitor of a missing process between two
+            running ones, with its worker threads started.
+        """
+        processes = [self.MockProcess(id=0, pid=os.getpid(), name='TestProcess'),
+                     self.MockProcess(id=1, pid=2 ** 22 + 1, name='TestProcess'),
+                     self.MockProcess(id=2, pid=os.getpid(), name='TestProcess')]
+        dut = StorageMonitor(processes=processes,
+                             id=0,
+                             heartbeat=self.hb_slave,
+                             report=self.queue,
+                             poll_period=1,
+                             workers=workers)
+        if workers > 1:
+            dut._pool = ThreadPool(workers)
+            self.addCleanup(dut._pool.terminate)
+
+        return dut
+
+    def test_sweep(self):
+        """ Test that a sweep carries on past a process that can't be
+            sampled, with and without worker threads.
+        """
+        for workers in (1, 2):
+            dut = self.make_sweep_monitor(workers)
+
+            sampled, failed, skipped = dut.sweep(time.time() + 10)
+
+            self.assertEqual([p.id for p in sampled], [0, 2])
+            self.assertEqual([p.id for p in failed], [1])
+            self.assertEqual(skipped, [])
+            for process in sampled:
+                self.validate_monitor_payload(process)
+
+    def test_sweep_budget(self):
+        """ Test that processes are skipped once the budget has run out. """
+        dut = self.make_sweep_monitor(workers=2)
+
+        sampled, failed, skipped = dut.sweep(time.time() - 1)
+
+        self.assertEqual(sampled, [])
+        self.assertEqual(failed, [])
+        self.assertEqual([p.id for p in skipped], [0, 1, 2])
+
+    def test_overrun_message(self):
+        """ Test the send_overrun_message method. """
+        self.dut.send_overrun_message(SweepOverrun(budget=1, elapsed=2,
+                                                   sampled=1,
+                                                   skipped=['TestProcess_2']))
+
+        message = self.get_message_from_queue()
+
+        self.assertEqual(message.type, 'MONITOR_OVERRUN')
+        self.assertEqual(message.payload.skipped, ['TestProcess_2'])
+
+    def test_sample_missing(self):
+        """ Test that sampling a process that has gone raises
+            MonitorResponseError with either sampler.
+        """
+        process = self.MockProcess(id=0, pid=2 ** 22 + 1, name='TestProcess')
+        process = MonitorData(process)
+
+        self.assertRaises(MonitorResponseError, self.dut.sample, process)
+
+        self.dut.sampler = None
+        self.assertRaises(MonitorResponseError, self.dut.sample, process)
+
     def check_monitor_message_common(self):
         """ A method that tests use to retreive MONITOR messages from the
             queue and validate them.
@@ -159,6 +342,28 @@ class TestMonitor(TestObject):
         self.assertEqual(payload.mem, '3.4')
         self.assertEqual(payload.etime, '1000')
 
+    def test_monitor_batch_message(self):
+        """ Test the send_monitor_batch_message method.
+            Validate that one MONITOR_BATCH message holds a sample for each
+            process and survives pickling.
+        """
+        for process in self.dut.processes:
+            process.cpu, process.mem, process.etime = '1.2', '3.4', '1000'
+
+        self.dut.send_monitor_batch_message(self.dut.processes)
+
+        message = self.get_message_from_queue()
+        self.assertEqual(message.type, 'MONITOR_BATCH')
+        self.assertIsInstance(message.payload, MonitorBatch)
+        self.assertTrue(self.queue.empty())
+
+        samples = pickle.loads(pickle.dumps(message.payload)).samples()
+
+        self.assertEqual(len(samples), 3)
+        for sample in samples:
+            self.validate_monitor_payload(sample)
+            self.assertIsNone(sample.rates)
+
     def validate_monitor_payload(self, payload):
         """ Method used by tests to validate the payload contents
             of a MONITOR message.
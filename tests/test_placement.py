@@ -0,0 +1,88 @@
+""" Contains the unittest class and methods that test the Placement
+    class.
+"""
+
+import os
+import os.path
+import shutil
+import unittest
+
+from mock import patch
+
+from client.placement import Placement
+
+
+class TestPlacement(unittest.TestCase):
+    """The TestPlacement contains the unittests that are used for testing
+       the Placement class.
+    """
+    PATHS = ['./temp/a', './temp/b', './temp/c']
+
+    def setUp(self):
+        """ Create the parent of the storage paths. """
+        if not os.path.exists('./temp'):
+            os.mkdir('./temp')
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists('./temp'):
+            shutil.rmtree('./temp')
+
+    def test_pinned(self):
+        """ Test that a pinned consumer always uses the path for its id. """
+        dut = Placement(self.PATHS, policy='pinned', id=4)
+
+        for _ in xrange(3):
+            self.assertEqual(os.path.dirname(dut.filepath('file')), dut.paths[1])
+
+    def test_round_robin(self):
+        """ Test that round-robin moves to the next path for every file,
+            starting from a path that depends on the id.
+        """
+        dut = Placement(self.PATHS, policy='round-robin', id=1)
+
+        paths = [os.path.dirname(dut.filepath('file')) for _ in xrange(4)]
+
+        self.assertEqual(paths, [dut.paths[1], dut.paths[2], dut.paths[0], dut.paths[1]])
+
+    def test_least_used(self):
+        """ Test that least-used picks the path with the most free space. """
+        dut = Placement(self.PATHS, policy='least-used')
+        free = {dut.paths[0]: 0.2, dut.paths[1]: 0.7, dut.paths[2]: 0.5}
+
+        with patch.object(Placement, 'free_fraction', side_effect=free.get):
+            self.assertEqual(os.path.dirname(dut.filepath('file')), dut.paths[1])
+
+    def test_unknown_policy(self):
+        """ Test that an unknown placement policy is rejected. """
+        with self.assertRaises(ValueError):
+            Placement(self.PATHS, policy='random')
+
+    def test_fanout(self):
+        """ Test that files are hashed into sub-directories, which are
+            created as needed and found again by directories().
+        """
+        dut = Placement(self.PATHS[:1], fanout=4)
+
+        filepaths = [dut.filepath('file_{}'.format(n)) for n in xrange(20)]
+
+        subdirectories = set(os.path.dirname(filepath) for filepath in filepaths)
+        self.assertGreater(len(subdirectories), 1)
+        self.assertLessEqual(len(subdirectories), 4)
+
+        # The same name always hashes to the same sub-directory
+        self.assertEqual(dut.filepath('file_0'), filepaths[0])
+
+        for subdirectory in subdirectories:
+            self.assertTrue(os.path.isdir(subdirectory))
+            self.assertEqual(os.path.dirname(subdirectory), dut.paths[0])
+
+        self.assertEqual(set(dut.directories()), subdirectories | set(dut.paths))
+
+    def test_storage(self):
+        """ Test that a file is matched to the path it was placed in. """
+        dut = Placement(['./temp/a', './temp/ab'], fanout=2)
+
+        self.assertEqual(dut.storage(os.path.join(dut.paths[1], '00', 'file')), dut.paths[1])
+        self.assertEqual(dut.storage(os.path.join(dut.paths[0], 'file')), dut.paths[0])
+        self.assertIsNone(dut.storage('/elsewhere/file'))
@@ -0,0 +1,175 @@
+""" Contains the unittest class and methods that test the ProcSampler
+    class.
+"""
+
+import os
+import os.path
+import shutil
+import unittest
+
+from client.procfs import ProcSampler
+
+
+class TestProcSampler(unittest.TestCase):
+    """The TestProcSampler contains the unittests that are used for testing
+       the ProcSampler class.
+
+       Most tests run against a fake proc filesystem under ./temp so that
+       the expected values are known.
+    """
+    PROC = './temp/proc'
+    PID = 1234
+
+    # 1 GB in kB
+    MEMINFO = 'MemTotal:        1048576 kB\nMemFree:          524288 kB\n'
+
+    def setUp(self):
+        """ Create a fake proc filesystem with two cpus. """
+        os.makedirs(os.path.join(self.PROC, str(self.PID)))
+
+        self.write('meminfo', self.MEMINFO)
+        self.set_system(cpu_ticks=1000, uptime=100.0)
+        self.set_process(ticks=0, start=5000, resident=0)
+
+        self.ticks_per_second = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists('./temp'):
+            shutil.rmtree('./temp')
+
+    def write(self, path, contents):
+        with open(os.path.join(self.PROC, path), 'w') as f:
+            f.write(contents)
+
+    def set_system(self, cpu_ticks, uptime):
+        """ Write /proc/stat and /proc/uptime.  cpu_ticks is the number
+            of ticks that each of the two cpus has been through.
+        """
+        # Split across user, system and idle.  The guest tick must not be
+        # counted again.
+        total = cpu_ticks * 2
+        stat = 'cpu  {} 0 {} {} 0 0 0 0 7 0\n'.format(total // 4, total // 4,
+                                                     total - total // 2)
+        stat += 'cpu0 0 0 0 0 0 0 0 0 0 0\ncpu1 0 0 0 0 0 0 0 0 0 0\n'
+        stat += 'intr 0\nbtime 0\n'
+        self.write('stat', stat)
+        self.write('uptime', '{} 0.00\n'.format(uptime))
+
+    def set_process(self, ticks, start, resident):
+        """ Write /proc/<pid>/stat and statm. """
+        # The command name contains a space and a parenthesis
+        fields = ['S'] + ['0'] * 10 + [str(ticks // 2), str(ticks - ticks // 2)]
+        fields += ['0'] * 6 + [str(start)] + ['0'] * 10
+        self.write(os.path.join(str(self.PID), 'stat'),
+                   '{} (a b) c) {}\n'.format(self.PID, ' '.join(fields)))
+        self.write(os.path.join(str(self.PID), 'statm'),
+                   '100 {} 0 0 0 0 0\n'.format(resident))
+
+    def test_available(self):
+        """ Test that available() finds the fake proc filesystem. """
+        self.assertTrue(ProcSampler.available(self.PROC))
+        self.assertFalse(ProcSampler.available('./temp/missing'))
+
+    def test_mem_total(self):
+        """ Test that the total memory is read from meminfo in bytes. """
+        dut = ProcSampler(self.PROC)
+
+        self.assertEqual(dut.mem_total, 1048576 * 1024)
+
+    def test_sample(self):
+        """ Test the memory and elapsed time of a sample, and that the
+            first sample uses the lifetime average cpu.
+        """
+        uptime = 100.0
+        start = int((uptime - 40) * self.ticks_per_second)
+        lifetime_ticks = 40 * self.ticks_per_second
+        resident = (1048576 * 1024 // 4) // self.page_size
+
+        self.set_system(cpu_ticks=1000, uptime=uptime)
+        self.set_process(ticks=lifetime_ticks // 2, start=start, resident=resident)
+
+        dut = ProcSampler(self.PROC)
+        cpu, mem, etime = dut.sample(self.PID)
+
+        self.assertEqual(cpu, '50.0')
+        self.assertEqual(mem, '25.0')
+        self.assertEqual(etime, '40')
+
+    def test_sample_delta(self):
+        """ Test that later samples use the cpu ticks since the last one. """
+        dut = ProcSampler(self.PROC)
+        self.set_process(ticks=100, start=0, resident=0)
+        dut.update()
+        dut.sample(self.PID)
+
+        # 500 ticks pass on each cpu, and the process uses 375 of them
+        self.set_system(cpu_ticks=1500, uptime=105.0)
+        self.set_process(ticks=475, start=0, resident=0)
+        dut.update()
+        cpu, _, _ = dut.sample(self.PID)
+
+        self.assertEqual(cpu, '75.0')
+
+    def test_sample_missing(self):
+        """ Test that sampling a process that has gone raises IOError. """
+        dut = ProcSampler(self.PROC)
+
+        self.assertRaises(IOError, dut.sample, self.PID + 1)
+
+    def test_sample_io(self):
+        """ Test that the I/O, context switch and RSS counters are read. """
+        self.write(os.path.join(str(self.PID), 'io'),
+                   'rchar: 10\nwchar: 20\nsyscr: 3\nsyscw: 4\n'
+                   'read_bytes: 4096\nwrite_bytes: 8192\n'
+                   'cancelled_write_bytes: 512\n')
+        self.write(os.path.join(str(self.PID), 'status'),
+                   'Name:\ttest\nVmRSS:\t    2048 kB\n'
+                   'voluntary_ctxt_switches:\t7\n'
+                   'nonvoluntary_ctxt_switches:\t2\n')
+
+        dut = ProcSampler(self.PROC)
+        counters, rss = dut.sample_io(self.PID)
+
+        self.assertEqual(counters, {'read_bytes': 4096,
+                                    'write_bytes': 8192,
+                                    'syscr': 3,
+                                    'syscw': 4,
+                                    'cancelled_write_bytes': 512,
+                                    'voluntary_switches': 7,
+                                    'involuntary_switches': 2})
+        self.assertEqual(rss, 2048 * 1024)
+
+    def test_process_tree(self):
+        """ Test that the tree holds the root and all of its descendants,
+            parents before children.
+        """
+        # pid: (name, ppid)
+        processes = {1: ('init', 0), 10: ('client', 1), 11: ('worker (1)', 10),
+                     12: ('manager', 10), 13: ('ps', 11), 20: ('other', 1)}
+        for pid, (name, ppid) in processes.iteritems():
+            os.mkdir(os.path.join(self.PROC, str(pid)))
+            self.write(os.path.join(str(pid), 'stat'),
+                       '{} ({}) S {} 0 0\n'.format(pid, name, ppid))
+
+        dut = ProcSampler(self.PROC)
+
+        self.assertEqual(dut.process_tree(10), [(10, 'client'),
+                                                (11, 'worker (1)'),
+                                                (12, 'manager'),
+                                                (13, 'ps')])
+        self.assertEqual(dut.process_tree(99), [])
+
+    def test_sample_self(self):
+        """ Test a sample of this process from the real /proc. """
+        if not ProcSampler.available():
+            self.skipTest('/proc is not available')
+
+        dut = ProcSampler()
+        dut.update()
+        cpu, mem, etime = dut.sample(os.getpid())
+
+        self.assertGreaterEqual(float(cpu), 0.0)
+        self.assertGreater(float(mem), 0.0)
+        self.assertGreaterEqual(int(etime), 0)
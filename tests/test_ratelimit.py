@@ -0,0 +1,56 @@
+""" Contains the unittest class and methods that test the TokenBucket
+    class.
+"""
+
+import time
+import unittest
+import multiprocessing
+
+from client.ratelimit import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """The TestTokenBucket contains the unittests that are used for testing
+       the TokenBucket class.
+    """
+    MEGABYTE = 1000000
+    RATE = 10 * MEGABYTE
+
+    def setUp(self):
+        """ Set up a 10MB/s TokenBucket at the beginning of each test. """
+        self.dut = TokenBucket(self.RATE)
+
+    def test_burst(self):
+        """ Test that a fresh bucket allows a burst without sleeping. """
+        self.assertEqual(self.dut.consume(self.dut.burst), 0.0)
+
+    def test_pacing(self):
+        """ Test that consuming past the burst is paced to the rate. """
+        start = time.time()
+        for _ in xrange(5):
+            self.dut.consume(self.MEGABYTE)
+        elapsed = time.time() - start
+
+        # 5MB at 10MB/s less the 1MB burst
+        self.assertAlmostEqual(elapsed, 0.4, delta=0.1)
+
+    def consume_in_process(self):
+        """ Consume 2MB from the shared bucket in a child process. """
+        for _ in xrange(2):
+            self.dut.consume(self.MEGABYTE)
+
+    def test_shared(self):
+        """ Test that two processes sharing a bucket are paced to the
+            combined rate.
+        """
+        start = time.time()
+        processes = [multiprocessing.Process(target=self.consume_in_process)
+                     for _ in xrange(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.time() - start
+
+        # 4MB at 10MB/s less the 1MB burst
+        self.assertAlmostEqual(elapsed, 0.3, delta=0.15)
@@ -0,0 +1,179 @@
+""" Contains the unittest class and methods that test the StorageReader
+    class.
+"""
+
+import os
+import os.path
+import time
+import multiprocessing
+import shutil
+from Queue import Queue, Empty
+
+from mock import MagicMock
+
+from client import StorageReader, StorageConsumer
+from shared import LatencyHistogram
+from test_storage_object import TestObject
+
+
+class TestReader(TestObject):
+    """The TestReader contains the unittests that are used for testing
+       the StorageReader class.
+
+       It is derived from TestObject with contains tests used for all
+       StorageObject items.
+    """
+    MEGABYTE = 1000000
+    CHUNK_SIZE = 1
+    FILE_SIZE = 10
+    READ_BLOCK_SIZE = 100
+    NAME = 'TestReader'
+
+    def setUp(self):
+        """ Set up a StorageReader instance at the beginning of each test.
+            The StorageReader will be provided with a pipe for START and
+            HEARTBEAT messages and a queue for READ and STOP messages.
+        """
+        self.hb_master, self.hb_slave = multiprocessing.Pipe()
+        self.queue = Queue()
+
+        self.dut = self.create_reader(pattern='sequential')
+
+        self.filepath = os.path.join(self.dut.path, '{}_0_file_0'.format(self.NAME))
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists(self.dut.path):
+            shutil.rmtree(self.dut.path)
+
+    def create_reader(self, pattern, evict=False):
+        """ Returns a StorageReader using the test pipe and queue. """
+        return StorageReader(id=0,
+                             chunk_size=self.CHUNK_SIZE,
+                             file_size=self.FILE_SIZE,
+                             heartbeat=self.hb_slave,
+                             report=self.queue,
+                             path='./temp/',
+                             name=self.NAME,
+                             pattern=pattern,
+                             read_block_size=self.READ_BLOCK_SIZE,
+                             evict=evict)
+
+    def test_unknown_pattern(self):
+        """ Test that an unknown read pattern is rejected. """
+        with self.assertRaises(ValueError):
+            self.create_reader(pattern='backwards')
+
+    def test_find_files(self):
+        """ Test that find_files returns this reader's non-empty files in
+            the order that they were written.
+        """
+        for num in (10, 2, 1):
+            with open(os.path.join(self.dut.path, '{}_0_file_{}'.format(self.NAME, num)), 'wb') as f:
+                f.write('abc')
+        # Empty files and files of other consumers are skipped
+        StorageConsumer.create_new_file(os.path.join(self.dut.path, '{}_0_file_3'.format(self.NAME)))
+        with open(os.path.join(self.dut.path, '{}_1_file_0'.format(self.NAME)), 'wb') as f:
+            f.write('abc')
+
+        files = [os.path.basename(path) for path in self.dut.find_files()]
+
+        self.assertEqual(files, ['{}_0_file_{}'.format(self.NAME, num) for num in (1, 2, 10)])
+
+    def test_read_sequential(self):
+        """ Test the read_file method with sequential reads.
+            Verify that the whole file is read once.
+        """
+        filepath = self.dut.prepare_file()
+        self.assertEqual(filepath, self.filepath)
+
+        payload = self.dut.read_file(filepath)
+
+        self.assertEqual(payload.size, self.FILE_SIZE * self.MEGABYTE)
+        self.assertEqual(payload.bytes_read, self.FILE_SIZE * self.MEGABYTE)
+        self.assertEqual(payload.pattern, 'sequential')
+        self.assertFalse(payload.evicted)
+        self.assertIsInstance(payload.latency, LatencyHistogram)
+        self.assertEqual(payload.latency.count, self.FILE_SIZE * self.MEGABYTE / (self.READ_BLOCK_SIZE * 1000))
+
+    def test_read_random(self):
+        """ Test the read_file method with random reads.
+            Verify that the offsets are block aligned, repeatable and that
+            as much data is read as a sequential pass.
+        """
+        self.dut = self.create_reader(pattern='random', evict=True)
+        filepath = self.dut.prepare_file()
+
+        block = self.READ_BLOCK_SIZE * 1000
+        offsets = self.dut.read_offsets(self.FILE_SIZE * self.MEGABYTE)
+
+        self.assertEqual(len(offsets), self.FILE_SIZE * self.MEGABYTE / block)
+        for offset in offsets:
+            self.assertEqual(offset % block, 0)
+            self.assertLess(offset, self.FILE_SIZE * self.MEGABYTE)
+
+        # Readers with the same id make the same reads
+        self.assertEqual(self.create_reader(pattern='random').read_offsets(self.FILE_SIZE * self.MEGABYTE),
+                         offsets)
+
+        payload = self.dut.read_file(filepath)
+
+        self.assertEqual(payload.bytes_read, self.FILE_SIZE * self.MEGABYTE)
+        self.assertEqual(payload.pattern, 'random')
+        self.assertTrue(payload.evicted)
+
+    def run_thread(self):
+        """ A thread that is run along side the run() method.
+            Sends the appropriate messages into the StorageReader
+            and verify that the appropriate messages are put out.
+        """
+        self.start_message_check()
+
+        self.send_heartbeat()
+
+        # Give HB client 3 seconds to respond
+        self.assertTrue(self.hb_master.poll(3))
+
+        if self.hb_master.poll():
+            response = self.hb_master.recv()
+            self.check_heartbeat(response)
+
+        time.sleep(2)  # Give reader time to read some files
+
+        self.send_heartbeat_kill()
+
+        self.stop_message_check()
+
+        # The single prepared file is read repeatedly
+        self.assertEqual(self.dut.find_files(), [self.filepath])
+
+        messages = []
+        while True:
+            try:
+                messages.append(self.queue.get(block=False))
+            except Empty:
+                break
+
+        self.assertGreater(len(messages), 0)
+        for message in messages:
+            self.assertEqual(message.type, 'READ')
+            self.assertEqual(message.payload.path, self.filepath)
+            self.assertEqual(message.payload.bytes_read, self.FILE_SIZE * self.MEGABYTE)
+
+    def test_run(self):
+        """ Functional test to exercise the run() method.
+            This function definition is in TestObject.
+        """
+        self.run_test()
+
+    def test_run_finish(self):
+        """ Test that run() ends with finish(), which stops the helper
+            threads before the STOP message is sent.
+        """
+        self.dut.check_heartbeat = MagicMock(return_value=False)
+        self.dut.send_start_message = MagicMock()
+        self.dut.finish = MagicMock()
+
+        self.dut.run()
+
+        self.dut.finish.assert_called_once_with()
@@ -0,0 +1,309 @@
+""" Contains the unittest class and methods that test the Report class.
+"""
+
+import os
+import os.path
+import glob
+import shutil
+import unittest
+import cPickle as pickle
+
+from datetime import datetime, timedelta
+from StringIO import StringIO
+
+from server.report import Report
+from client import MonitorData, MonitorBatch
+from client.consumer import RolloverPayload, VerifyPayload
+from client.reader import ReadPayload
+from client.metadata import MetadataPayload
+from client.reclaim import ReclaimPayload
+from client.diskstats import DeviceStats
+from client.monitor import SweepOverrun
+from shared import Message, LatencyHistogram
+
+
+class TestReport(unittest.TestCase):
+    """The TestReport contains the unittests that are used for testing
+       the Report class.
+    """
+    MEGABYTE = 1000000
+    START = datetime(2020, 1, 1, 12, 0, 0)
+
+    class MockClient(object):
+
+        def __init__(self):
+            self.messages = {}
+
+    class MockProcess(object):
+
+        def __init__(self, id, pid, name):
+            self.id = id
+            self.pid = pid
+            self.name = name
+
+    def setUp(self):
+        """ Set up a Report with no clients in a temporary directory. """
+        self.dut = Report(path='./temp/', clients={})
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists('./temp'):
+            shutil.rmtree('./temp')
+
+    def message(self, type, payload, name='Consumer', id=0, seconds=0.0):
+        """ Returns a message as the server receives it, pickled and
+            unpickled, dated seconds after START.
+        """
+        message = Message(name=name,
+                          id=id,
+                          date_time=self.START + timedelta(seconds=seconds),
+                          type=type,
+                          payload=payload)
+
+        return pickle.loads(pickle.dumps(message, pickle.HIGHEST_PROTOCOL))
+
+    def generate(self, messages):
+        """ Generate a report of one client with messages.
+
+            Returns:
+                The lines of the report.
+        """
+        client = self.MockClient()
+        # Every client sends heartbeats and monitor samples, which the
+        # report expects
+        client.messages['HEARTBEAT'] = []
+        client.messages['MONITOR'] = []
+        for message in messages:
+            client.messages.setdefault(message.type, []).append(message)
+
+        self.dut.clients[('127.0.0.1', 5000)] = client
+        self.dut.generate()
+
+        reports = glob.glob(os.path.join(self.dut.path, 'Server_Report_*.log'))
+        self.assertEqual(len(reports), 1)
+        with open(reports[0], 'r') as f:
+            return f.read().splitlines()
+
+    def section(self, lines, title):
+        """ Returns the lines of the report section with title. """
+        first = lines.index('  {}'.format(title)) + 1
+        last = lines.index('', first) if '' in lines[first:] else len(lines)
+        return lines[first:last]
+
+    def rollover(self, id, start, elapsed, size, target=None,
+                 client_target=None):
+        """ Returns a ROLLOVER message for a file started start seconds
+            after START that took elapsed seconds to write.
+        """
+        latency = LatencyHistogram()
+        latency.record(elapsed)
+
+        payload = RolloverPayload(path='./temp/Consumer_{}_file'.format(id),
+                                  size=size,
+                                  chunk=size,
+                                  latency=latency,
+                                  elapsed=elapsed,
+                                  target=target,
+                                  client_target=client_target,
+                                  started=self.START + timedelta(seconds=start))
+
+        return self.message('ROLLOVER', payload, id=id, seconds=start + elapsed)
+
+    def report_rollover(self, messages):
+        """ Returns the text of the rollover section for messages. """
+        file = StringIO()
+        self.dut._report_rollover(file=file, messages=messages)
+        return file.getvalue()
+
+    def test_generate(self):
+        """ Test the Runtime, Heartbeat, Rollovers and Reclaimed Files
+            sections of a generated report.
+        """
+        MEGABYTE = self.MEGABYTE
+        target = 50 * MEGABYTE
+
+        start = self.message('START', None)
+        stop = self.message('STOP',
+                            ([self.message('STOP', None, seconds=10.0)], set()),
+                            name='Heartbeat', seconds=10.0)
+        heartbeat = self.message('HEARTBEAT', ([start], set([('Consumer', 1)])),
+                                 name='Heartbeat', seconds=5.0)
+
+        reclaim = ReclaimPayload()
+        reclaim.files = 1
+        reclaim.size = 60 * MEGABYTE
+        reclaim.latency.record(0.25)
+
+        lines = self.generate([
+            start,
+            stop,
+            heartbeat,
+            self.rollover(0, start=0.0, elapsed=1.0, size=60 * MEGABYTE, target=target),
+            self.rollover(0, start=1.4, elapsed=1.0, size=60 * MEGABYTE, target=target),
+            self.message('RECLAIM', reclaim, seconds=2.5)])
+
+        self.assertEqual(lines[0], 'Client @ 127.0.0.1:5000')
+
+        self.assertEqual(self.section(lines, 'Runtime:')[-1], '      Runtime: 0:00:10')
+
+        self.assertIn('      ERROR: Missing heartbeat', self.section(lines, 'Heartbeat:'))
+
+        rollovers = self.section(lines, 'Rollovers:')
+        self.assertEqual(rollovers[1],
+                         '      2020-01-01 12:00:01: 60.0MB chunk/60.0MB @ '
+                         './temp/Consumer_0_file 60.00MB/s')
+        self.assertIn('      Throughput: 50.00MB/s achieved of 50.00MB/s target (100%)',
+                      rollovers)
+        self.assertIn('      Write-time throughput: 60.00MB/s', rollovers)
+        self.assertIn('    All consumers throughput: 50.00MB/s achieved, unlimited',
+                      rollovers)
+
+        self.assertEqual(self.section(lines, 'Reclaimed Files:')[1],
+                         '      1 files/60.0MB in 0.250s')
+
+    def test_report_read(self):
+        """ Test the Reads section of a generated report. """
+        latency = LatencyHistogram()
+        latency.record(0.001)
+
+        read = ReadPayload(path='./temp/Consumer_0_file_0',
+                           size=60 * self.MEGABYTE,
+                           block=1000000,
+                           pattern='sequential',
+                           bytes_read=60 * self.MEGABYTE,
+                           elapsed=0.5,
+                           latency=latency,
+                           evicted=True)
+
+        reads = self.section(self.generate([self.message('READ', read, seconds=3.0)]),
+                             'Reads:')
+
+        self.assertEqual(reads[1],
+                         '      2020-01-01 12:00:03: 60.0MB sequential 1000KB blocks '
+                         '(evicted) @ ./temp/Consumer_0_file_0 120.00MB/s')
+        self.assertIn('      Throughput: 120.00MB/s, 2 reads/s', reads)
+        self.assertIn('    All consumers read throughput: 120.00MB/s', reads)
+
+    def test_report_metadata(self):
+        """ Test the Metadata section of a generated report. """
+        metadata = MetadataPayload(files=100, dirs=4, size=0)
+        for operation, elapsed in (('create', 0.5), ('stat', 0.25)):
+            metadata.elapsed[operation] = elapsed
+            metadata.latency[operation] = LatencyHistogram()
+            for _ in xrange(100):
+                metadata.latency[operation].record(0.001)
+
+        lines = self.section(self.generate([self.message('METADATA', metadata, seconds=3.0)]),
+                             'Metadata:')
+
+        self.assertTrue(lines[1].startswith('      create: 200 ops/s, 100 ops, '))
+        self.assertTrue(lines[2].startswith('      stat: 400 ops/s, 100 ops, '))
+        self.assertTrue(lines[3].startswith('    All consumers create: 200 ops/s, '))
+
+    def test_report_verify(self):
+        """ Test the Verification section of a generated report. """
+        verify = VerifyPayload(path='./temp/Consumer_0_file_0',
+                               size=60 * self.MEGABYTE,
+                               checksum='crc32',
+                               chunks=6,
+                               mismatches=1,
+                               elapsed=0.5)
+
+        lines = self.generate([self.message('VERIFY', verify, seconds=1.2)])
+
+        self.assertEqual(self.section(lines, 'Verification:'), [
+            '    Consumer_0:',
+            '      1 files/6 chunks verified, 1 mismatched @ 120.00MB/s',
+            '      Mismatch in ./temp/Consumer_0_file_0',
+            '    All consumers mismatched chunks: 1'])
+
+    def test_report_monitor(self):
+        """ Test that the Process Status and Device I/O sections take the
+            samples of both MONITOR and MONITOR_BATCH messages.
+        """
+        MEGABYTE = self.MEGABYTE
+
+        # Two samples 10s apart of a consumer that wrote 100MB between
+        # them, one sent on its own and one in a batch
+        sample = MonitorData(self.MockProcess(id=0, pid=100, name='Consumer'))
+        sample.cpu, sample.mem, sample.etime = '12.5', '1.0', '10'
+        messages = []
+        for seconds, written in ((0.0, 0), (10.0, 100 * MEGABYTE)):
+            sample.update_io({'read_bytes': 0,
+                              'write_bytes': written,
+                              'cancelled_write_bytes': 0}, 4 * MEGABYTE, seconds)
+            if not messages:
+                messages.append(self.message('MONITOR', sample, name='Monitor'))
+            else:
+                messages.append(self.message('MONITOR_BATCH', MonitorBatch([sample]),
+                                             name='Monitor', seconds=seconds))
+
+        lines = self.generate(messages)
+
+        self.assertEqual(self.section(lines, 'Process Status:'), [
+            '    Monitor_0:',
+            '      2020-01-01 12:00:00: Consumer_0 12.5% cpu  1.0% mem  10s runtime',
+            '      2020-01-01 12:00:10: Consumer_0 12.5% cpu  1.0% mem  10s runtime'
+            '  0.00MB/s read  10.00MB/s write  0/0 syscalls/s r/w'
+            '  0/0 ctx switches/s vol/invol  4.0MB rss'])
+
+        self.assertEqual(self.section(lines, 'Device I/O:'), [
+            '    Consumer_0: 0.00MB read, 100.00MB written, 0.00MB cancelled'
+            ' @ 0.00MB/s read, 10.00MB/s write over 10s'])
+
+    def test_report_device(self):
+        """ Test the Block Devices section of a generated report. """
+        device = DeviceStats(device='sda1', paths=['./storage'], interval=2.0,
+                             read_iops=50.0, write_iops=150.0,
+                             read_rate=2 * self.MEGABYTE, write_rate=12.5 * self.MEGABYTE,
+                             queue_depth=3.0, utilization=50.0, await_time=3.0)
+
+        lines = self.generate([self.message('DEVICE', [device], name='Monitor', seconds=2.0)])
+
+        self.assertEqual(self.section(lines, 'Block Devices:'), [
+            '    sda1 (./storage):',
+            '      2020-01-01 12:00:02: 50/150 IOPS r/w  2.00/12.50MB/s r/w'
+            '  qd 3.00  50.0% util  3.00ms await',
+            '      Average: 50/150 IOPS r/w  2.00/12.50MB/s r/w'
+            '  qd 3.00  50.0% util, peak 50.0% util'])
+
+    def test_report_overrun(self):
+        """ Test the Monitor Overruns section of a generated report. """
+        overrun = SweepOverrun(budget=1.0, elapsed=1.5, sampled=1,
+                               skipped=['Consumer_1'])
+
+        lines = self.generate([self.message('MONITOR_OVERRUN', overrun,
+                                            name='Monitor', seconds=10.0)])
+
+        self.assertEqual(self.section(lines, 'Monitor Overruns: 1'), [
+            '    2020-01-01 12:00:10: Monitor_0 1.500s of 1.000s budget, '
+            '1 sampled, 1 skipped (Consumer_1)'])
+
+    def test_rollover_throughput(self):
+        """ Test that the achieved throughput is measured over wall clock
+            time, including the time between files, rather than over the
+            time spent writing.
+        """
+        # Two 60MB files written at 60MB/s with 0.4s between them makes
+        # 120MB in 2.4s, which is the 50MB/s target
+        target = 50 * self.MEGABYTE
+        text = self.report_rollover([
+            self.rollover(0, start=0.0, elapsed=1.0, size=60 * self.MEGABYTE,
+                          target=target, client_target=2 * target),
+            self.rollover(0, start=1.4, elapsed=1.0, size=60 * self.MEGABYTE,
+                          target=target, client_target=2 * target)])
+
+        self.assertIn('      Throughput: 50.00MB/s achieved of 50.00MB/s target (100%)\n', text)
+        self.assertIn('      Write-time throughput: 60.00MB/s\n', text)
+
+    def test_rollover_client_throughput(self):
+        """ Test that the throughput of all consumers is their total bytes
+            over the wall clock span of all of their files.
+        """
+        text = self.report_rollover([
+            self.rollover(0, start=0.0, elapsed=1.0, size=40 * self.MEGABYTE),
+            self.rollover(1, start=1.0, elapsed=1.0, size=40 * self.MEGABYTE)])
+
+        # 80MB over 2s, although each consumer wrote at 40MB/s
+        self.assertIn('    All consumers throughput: 40.00MB/s achieved, unlimited\n', text)
+        self.assertIn('    All consumers write-time throughput: 80.00MB/s\n', text)
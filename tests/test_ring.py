@@ -0,0 +1,67 @@
+""" Contains the unittest class and methods that test the SampleRing
+    class.
+"""
+
+import unittest
+
+from client.ring import SampleRing
+
+
+class TestSampleRing(unittest.TestCase):
+    """The TestSampleRing contains the unittests that are used for testing
+       the SampleRing class.
+    """
+
+    def test_empty(self):
+        """ Test that an empty ring has no summary. """
+        dut = SampleRing(10)
+
+        self.assertEqual(len(dut), 0)
+        self.assertIsNone(dut.summary())
+
+    def test_summary(self):
+        """ Test the statistics of a ring holding 1 to 100. """
+        dut = SampleRing(100)
+        for n in xrange(1, 101):
+            dut.append(sample_time=1000.0 + n, value=float(n))
+
+        summary = dut.summary()
+
+        self.assertEqual(summary.count, 100)
+        self.assertEqual(summary.min, 1.0)
+        self.assertEqual(summary.mean, 50.5)
+        self.assertEqual(summary.max, 100.0)
+        self.assertEqual(summary.p99, 99.0)
+        self.assertEqual(summary.peak_time, 1100.0)
+
+    def test_peak_time(self):
+        """ Test that the peak time is that of the largest sample. """
+        dut = SampleRing(10)
+        for sample_time, value in ((1.0, 5.0), (2.0, 9.0), (3.0, 2.0)):
+            dut.append(sample_time, value)
+
+        self.assertEqual(dut.summary().peak_time, 2.0)
+
+    def test_overwrite(self):
+        """ Test that a full ring replaces its oldest samples. """
+        dut = SampleRing(3)
+        for n in xrange(5):
+            dut.append(sample_time=n, value=float(n))
+
+        summary = dut.summary()
+
+        self.assertEqual(len(dut), 3)
+        self.assertEqual(summary.min, 2.0)
+        self.assertEqual(summary.max, 4.0)
+        self.assertEqual(summary.mean, 3.0)
+
+    def test_clear(self):
+        """ Test that clear empties the ring for the next period. """
+        dut = SampleRing(3)
+        dut.append(1.0, 1.0)
+        dut.clear()
+
+        self.assertIsNone(dut.summary())
+
+        dut.append(2.0, 7.0)
+        self.assertEqual(dut.summary().min, 7.0)
@@ -1,10 +1,18 @@
 import unittest
+import cPickle as pickle
 
 from mock import MagicMock
 from multiprocessing import Event
 
 from server import Server, ClientData, Handler
-from shared import Message
+from shared import Message, LatencyHistogram
+from client import MonitorData, MonitorBatch
+from client.consumer import VerifyPayload
+from client.reader import ReadPayload
+from client.metadata import MetadataPayload
+from client.reclaim import ReclaimPayload
+from client.diskstats import DeviceStats
+from client.monitor import SweepOverrun
 
 
 class TestServer(unittest.TestCase):
@@ -62,6 +70,127 @@ class TestServer(unittest.TestCase):
         # Restore previously mocked methods
         self.dut.message_dispatch['START'] = _handle_start
 
+    def handle(self, type, payload, name='Consumer', id=0):
+        """ Pickle a message as the client does and pass it to the handler
+            for its type.
+
+            Returns:
+                The response string of the handler.
+        """
+        message = Message(name=name,
+                          id=id,
+                          date_time=None,
+                          type=type,
+                          payload=payload)
+        message = pickle.loads(pickle.dumps(message, pickle.HIGHEST_PROTOCOL))
+
+        return self.dut.message_dispatch[type](message=message,
+                                               client=self.MockClient())
+
+    def test_handle_read(self):
+        """ Test the response string of a READ message. """
+        payload = ReadPayload(path='./temp/Consumer_0_file_0',
+                              size=20000000,
+                              block=1000000,
+                              pattern='random',
+                              bytes_read=20000000,
+                              elapsed=0.5,
+                              latency=LatencyHistogram(),
+                              evicted=True)
+
+        self.assertEqual(self.handle('READ', payload),
+                         '; Consumer_0 read 20MB random in 0.500s - ./temp/Consumer_0_file_0')
+
+    def test_handle_metadata(self):
+        """ Test that the response string of a METADATA message has the
+            rate of each timed operation.
+        """
+        payload = MetadataPayload(files=100, dirs=4, size=0)
+        payload.elapsed = {'create': 0.5, 'stat': 0.25, 'unlink': 0.0}
+
+        self.assertEqual(self.handle('METADATA', payload, id=1),
+                         '; Consumer_1 100 files in 4 dirs: create 200/s, stat 400/s')
+
+    def test_handle_verify(self):
+        """ Test the response string of a VERIFY message. """
+        payload = VerifyPayload(path='./temp/Consumer_0_file_0',
+                                size=100000000,
+                                checksum='crc32',
+                                chunks=10,
+                                mismatches=1,
+                                elapsed=0.5)
+
+        self.assertEqual(self.handle('VERIFY', payload),
+                         '; Consumer_0 verified 10 crc32 chunks, 1 mismatched - '
+                         './temp/Consumer_0_file_0')
+
+    def test_handle_monitor_batch(self):
+        """ Test that _handle_monitor describes every sample of a
+            MONITOR_BATCH message.
+        """
+        class MockProcess(object):
+            def __init__(self, id):
+                self.id = id
+                self.pid = 100 + id
+                self.name = 'Consumer'
+
+        processes = [MonitorData(MockProcess(id)) for id in xrange(2)]
+        message = Message(name='Monitor',
+                          id=0,
+                          date_time=None,
+                          type='MONITOR_BATCH',
+                          payload=MonitorBatch(processes))
+
+        response = self.dut._handle_monitor(message=message,
+                                            client=self.MockClient())
+
+        self.assertEqual(response.count('Monitor_0 monitoring'), 2)
+        self.assertIn('Consumer_0: pid 100', response)
+        self.assertIn('Consumer_1: pid 101', response)
+
+    def test_handle_reclaim(self):
+        """ Test that the response string of a RECLAIM message has the total
+            unlink time.
+        """
+        payload = ReclaimPayload()
+        payload.files = 2
+        payload.size = 200000000
+        payload.latency.record(0.25)
+        payload.latency.record(0.5)
+
+        self.assertEqual(self.handle('RECLAIM', payload),
+                         '; Consumer_0 reclaimed 2 files/200MB in 0.750s')
+
+    def test_handle_device(self):
+        """ Test the response string of a DEVICE message, which only has an
+            await time for devices that had requests.
+        """
+        payload = [DeviceStats(device='sda1', paths=['./storage'], interval=2.0,
+                               read_iops=50.0, write_iops=150.0,
+                               read_rate=2000000.0, write_rate=12500000.0,
+                               queue_depth=3.0, utilization=50.0,
+                               await_time=3.0),
+                   DeviceStats(device='sdb1', paths=['./other'], interval=2.0,
+                               read_iops=0.0, write_iops=0.0,
+                               read_rate=0.0, write_rate=0.0,
+                               queue_depth=0.0, utilization=0.0,
+                               await_time=None)]
+
+        self.assertEqual(self.handle('DEVICE', payload, name='Monitor'),
+                         '; Monitor_0 device sda1: 50/150 IOPS r/w, 2.00/12.50MB/s r/w, '
+                         'qd 3.00, util 50.0%, await 3.00ms'
+                         '; Monitor_0 device sdb1: 0/0 IOPS r/w, 0.00/0.00MB/s r/w, '
+                         'qd 0.00, util 0.0%')
+
+    def test_handle_overrun(self):
+        """ Test the response string of a MONITOR_OVERRUN message. """
+        payload = SweepOverrun(budget=1.0, elapsed=1.5, sampled=3,
+                               skipped=['Consumer_3', 'Consumer_4'])
+
+        self.assertEqual(self.handle('MONITOR_OVERRUN', payload, name='Monitor'),
+                         '; Monitor_0 sweep took 1.500s of a 1.000s budget, 3 sampled, '
+                         'skipped Consumer_3, Consumer_4')
+
     def test_handle_stop(self):
         """ Test the _handle_stop method.
             Verify that the kill Event is set.
@@ -2,6 +2,7 @@
     class.
 """
 
+import time
 import unittest
 import multiprocessing
 import threading
@@ -9,6 +10,7 @@ import threading
 from Queue import Queue, Empty
 
 from client import StorageObject
+from client.liveness import LivenessBoard
 from shared import Message
 
 class TestObject(unittest.TestCase):
@@ -140,6 +142,66 @@ class TestObject(unittest.TestCase):
 
         self.check_heartbeat(response)
 
+    def test_wait_heartbeat_deadline(self):
+        """ Test that wait_heartbeat sleeps until the deadline when no
+            messages arrive.
+        """
+        start = time.time()
+
+        self.assertTrue(self.dut.wait_heartbeat(start + 0.2))
+
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_wait_heartbeat_response(self):
+        """ Test that wait_heartbeat answers a HEARTBEAT message as soon
+            as it arrives and keeps waiting.
+        """
+        timer = threading.Timer(0.1, self.send_heartbeat)
+        timer.start()
+
+        start = time.time()
+        self.assertTrue(self.dut.wait_heartbeat(start + 0.5))
+        timer.join()
+
+        self.assertGreaterEqual(time.time() - start, 0.5)
+        self.assertTrue(self.hb_master.poll())
+        self.check_heartbeat(self.hb_master.recv())
+
+    def test_wait_heartbeat_kill(self):
+        """ Test that wait_heartbeat returns as soon as a KILL message
+            arrives.
+        """
+        timer = threading.Timer(0.1, self.send_heartbeat_kill)
+        timer.start()
+
+        start = time.time()
+        self.assertFalse(self.dut.wait_heartbeat(start + 5))
+        timer.join()
+
+        self.assertLess(time.time() - start, 1)
+
+    def test_progress(self):
+        """ Test that progress and the start and stop messages are shown
+            on the liveness board.
+        """
+        board = LivenessBoard(2)
+        self.dut.attach_liveness(board, 1)
+
+        self.dut.send_start_message()
+        self.dut.progress(100)
+        self.dut.progress(50)
+
+        last_time, bytes, state = board.read()[1]
+        self.assertEqual(bytes, 150)
+        self.assertEqual(state, 'running')
+        self.assertAlmostEqual(last_time, time.time(), delta=1)
+
+        self.dut.send_stop_message()
+        self.assertEqual(board.read()[1][2], 'stopped')
+
+        # The other slot is untouched
+        self.assertEqual(board.read()[0], (0.0, 0, 'starting'))
+
     def run_test(self):
         """ Creates a thread to run along side the run() method.
             The thread is implemented in the child class.
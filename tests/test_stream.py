@@ -0,0 +1,63 @@
+""" Contains the unittest class and methods that test the WriteStream
+    class.
+"""
+
+import os
+import os.path
+import shutil
+import unittest
+
+from client.stream import WriteStream
+from shared import init_dir_path
+
+
+class TestWriteStream(unittest.TestCase):
+    """The TestWriteStream contains the unittests that are used for testing
+       the WriteStream class.
+    """
+
+    def setUp(self):
+        """ Create a directory for the stream files. """
+        self.path = init_dir_path('./temp/')
+
+    def tearDown(self):
+        """ Tear down the test by removing all files created during the test."""
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+
+    def test_open(self):
+        """ Test that opening a stream starts a new empty file. """
+        stream = WriteStream(index=0)
+        filepath = os.path.join(self.path, 'stream')
+
+        with open(filepath, 'wb') as f:
+            f.write('abc')
+
+        stream.open(filepath)
+        self.assertEqual(os.path.getsize(filepath), 0)
+        self.assertEqual(stream.offset, 0)
+        self.assertEqual(stream.latency.count, 0)
+
+        stream.close()
+        self.assertIsNone(stream.fd)
+
+    def test_round_robin(self):
+        """ Test that equally weighted streams are picked in turn. """
+        streams = [WriteStream(index=n) for n in xrange(3)]
+
+        picks = [WriteStream.pick(streams).index for _ in xrange(6)]
+
+        self.assertEqual(picks, [0, 1, 2, 0, 1, 2])
+
+    def test_weighted(self):
+        """ Test that streams are picked in proportion to their weights
+            and that the heavier stream's picks are spread out.
+        """
+        streams = [WriteStream(index=0, weight=3), WriteStream(index=1, weight=1)]
+
+        picks = [WriteStream.pick(streams).index for _ in xrange(8)]
+
+        self.assertEqual(picks.count(0), 6)
+        self.assertEqual(picks.count(1), 2)
+        # The light stream isn't starved until the end of a cycle
+        self.assertIn(1, picks[:4])